@@ -0,0 +1,140 @@
+"""Update rate tiers for entities, by distance from the viewport.
+
+Entities near the viewport update every frame. Further out they update
+every few frames with the time accumulated since their last update, and
+far away they sleep: they are skipped entirely and the time they sleep
+through is dropped. Anything woken, e.g. by being hit, stays at the full
+rate for a while wherever it is.
+"""
+import numpy as np
+
+TIER_ACTIVE = 0
+TIER_REDUCED = 1
+TIER_SLEEPING = 2
+TIER_NAMES = ("active", "reduced", "sleeping")
+
+
+class ActivityScheduler:
+    """Decides which entities update this frame and with how much time.
+
+    With an entity store, entities are its rows and are tiered on the
+    store's arrays, so sleepers cost no Python; without one, they are
+    tracked by registry handle. Either way a reused slot starts over
+    instead of inheriting its previous owner's time. Within activeMargin
+    pixels of the viewport an entity updates every frame, within
+    reducedMargin every reducedEvery frames (staggered by slot so they
+    don't all land on the same frame), and beyond that it sleeps.
+    """
+
+    def __init__(self, activeMargin: float, reducedMargin: float, reducedEvery: int, wakeTime: float, capacity: int = 64, store=None):
+        self.activeMargin = activeMargin
+        self.reducedMargin = reducedMargin
+        self.reducedEvery = reducedEvery
+        self.wakeTime = wakeTime
+        self.store = store
+        self.frame = 0
+        # per store row or registry slot: entity tracked, time owed, full rate time left
+        self.generations = np.full(capacity, -1, dtype=np.int64)
+        self.pending = np.zeros(capacity)
+        self.awake = np.zeros(capacity)
+        # entities per tier in the last schedule()
+        self.counts = [0, 0, 0]
+
+    def _grow(self, size: int):
+        capacity = len(self.generations)
+        while capacity < size:
+            capacity *= 2
+        extra = capacity - len(self.generations)
+        self.generations = np.concatenate((self.generations, np.full(extra, -1, dtype=np.int64)))
+        self.pending = np.concatenate((self.pending, np.zeros(extra)))
+        self.awake = np.concatenate((self.awake, np.zeros(extra)))
+
+    def _track(self, index: np.ndarray, generation: np.ndarray) -> np.ndarray:
+        """Starts over the slots in index whose entity isn't the one tracked there."""
+        if len(index) and index.max() >= len(self.generations):
+            self._grow(index.max() + 1)
+        fresh = self.generations[index] != generation
+        if fresh.any():
+            self.generations[index[fresh]] = generation[fresh]
+            self.pending[index[fresh]] = 0.0
+            self.awake[index[fresh]] = 0.0
+        return index
+
+    def _slots(self, handles) -> np.ndarray:
+        """Registry slots of handles."""
+        index = np.array([h.index for h in handles], dtype=np.intp)
+        generation = np.array([h.generation for h in handles], dtype=np.int64)
+        return self._track(index, generation)
+
+    def wake(self, obj):
+        """Keeps obj at the full update rate for wakeTime seconds."""
+        if self.store is not None and obj.stored:
+            index = self._track(np.array([obj._row], dtype=np.intp), self.store.serial[[obj._row]])
+        elif obj.handle is not None:
+            index = self._slots((obj.handle,))
+        else:
+            return
+        self.awake[index] = self.wakeTime
+
+    def _run(self, index: np.ndarray, x: np.ndarray, y: np.ndarray, viewport, deltaTime: float):
+        """Tiers the tracked entities at (x, y); returns (which run now, time owed to each)."""
+        outside = np.maximum.reduce((
+            viewport.x - x,
+            x - (viewport.x + viewport.w),
+            viewport.y - y,
+            y - (viewport.y + viewport.h),
+            np.zeros(len(x)),
+        ))
+
+        awake = self.awake[index]
+        tier = np.full(len(x), TIER_SLEEPING, dtype=np.uint8)
+        tier[outside < self.reducedMargin] = TIER_REDUCED
+        tier[(outside < self.activeMargin) | (awake > 0.0)] = TIER_ACTIVE
+        self.awake[index] = np.maximum(awake - deltaTime, 0.0)
+
+        # time owed: reduced entities save it up until their turn, sleepers drop it
+        pending = self.pending[index] + deltaTime
+        turn = (index + self.frame) % self.reducedEvery == 0
+        run = (tier == TIER_ACTIVE) | ((tier == TIER_REDUCED) & turn)
+        self.pending[index] = np.where(run | (tier == TIER_SLEEPING), 0.0, pending)
+        self.counts = np.bincount(tier, minlength=len(TIER_NAMES)).tolist()
+        return run, pending
+
+    def scheduleRows(self, rows: np.ndarray, viewport, deltaTime: float):
+        """Returns (rows due this frame, their time steps) for the store rows in viewport.
+
+        Due rows keep the order they are given in.
+        """
+        self.frame += 1
+        rows = np.asarray(rows, dtype=np.intp)
+        store = self.store
+        self._track(rows, store.serial[rows])
+        position = store.position[rows]
+        run, pending = self._run(rows, position[:, 0], position[:, 1], viewport, deltaTime)
+        return rows[run], pending[run]
+
+    def schedule(self, objects: list, viewport, deltaTime: float):
+        """Returns (objects due this frame, their time steps) for objects in viewport.
+
+        Objects without a handle are always due with deltaTime.
+        """
+        self.frame += 1
+        tracked = [obj for obj in objects if obj.handle is not None]
+        due = [obj for obj in objects if obj.handle is None]
+        steps = [deltaTime] * len(due)
+        if not tracked:
+            self.counts = [len(due), 0, 0]
+            return due, steps
+
+        index = self._slots([obj.handle for obj in tracked])
+        x = np.array([obj.position.x for obj in tracked])
+        y = np.array([obj.position.y for obj in tracked])
+        run, pending = self._run(index, x, y, viewport, deltaTime)
+        self.counts[TIER_ACTIVE] += len(due)
+        for i in np.flatnonzero(run).tolist():
+            due.append(tracked[i])
+            steps.append(float(pending[i]))
+        return due, steps
+
+    def stats(self) -> dict:
+        return dict(zip(TIER_NAMES, self.counts))
@@ -0,0 +1,177 @@
+"""Startup asset loading on a thread pool.
+
+Worker threads read asset files and decode them: images into SDL surfaces,
+sounds into mixer chunks. Textures can only be created on the thread that
+owns the renderer, so surfaces are handed back and uploaded there. Every
+asset gets a timeline entry with the time spent reading, decoding, waiting
+for the workers and uploading, to show which asset dominates startup.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import sdl3
+import sdl3.SDL_image as sdlimage
+
+
+class AssetTiming:
+    """Where one asset's load time went, in seconds since the loader started."""
+
+    __slots__ = ("path", "kind", "bytes", "start", "read", "decode", "wait", "upload")
+
+    def __init__(self, path: str, kind: str):
+        self.path = path
+        self.kind = kind
+        self.bytes = 0
+        self.start = 0.0
+        self.read = 0.0
+        self.decode = 0.0
+        # main thread blocked on the result
+        self.wait = 0.0
+        self.upload = 0.0
+
+    @property
+    def total(self) -> float:
+        return self.read + self.decode + self.upload
+
+    def __repr__(self):
+        return f"AssetTiming({self.path!r}, {self.total * 1000.0:.2f} ms)"
+
+
+class AssetLoader:
+    """Decodes asset files on worker threads, results picked up by path.
+
+    request*() queues a file; take*() returns its decoded result, waiting
+    for it if the workers aren't done yet, and queues it first if nobody
+    asked for it. Surfaces and chunks are handed over to the caller, and
+    uploads done with uploading() are charged to the asset's timeline.
+    """
+
+    def __init__(self, audio, workers: int = 4):
+        self.audio = audio
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="asset")
+        self.futures: dict = {}
+        # path -> timing, in request order
+        self.timings: dict[str, AssetTiming] = {}
+        self.started = time.perf_counter()
+        self.waited = 0.0
+        # seconds from creation to close()
+        self.elapsed = 0.0
+        self.lock = threading.Lock()
+
+    def _now(self) -> float:
+        return time.perf_counter() - self.started
+
+    def _timing(self, path: str, kind: str) -> AssetTiming:
+        with self.lock:
+            timing = self.timings.get(path)
+            if timing is None:
+                timing = self.timings[path] = AssetTiming(path, kind)
+            return timing
+
+    def _read(self, path: str, timing: AssetTiming) -> bytes:
+        timing.start = self._now()
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            data = b""
+        timing.bytes = len(data)
+        timing.read = self._now() - timing.start
+        return data
+
+    def _decodeImage(self, path: str, timing: AssetTiming):
+        data = self._read(path, timing)
+        start = self._now()
+        surface = None
+        if data:
+            # the stream reads straight from data, which outlives the call
+            stream = sdl3.SDL_IOFromConstMem(data, len(data))
+            surface = sdlimage.IMG_Load_IO(stream, True) or None
+        timing.decode = self._now() - start
+        return surface
+
+    def _decodeSound(self, path: str, timing: AssetTiming):
+        data = self._read(path, timing)
+        start = self._now()
+        chunk = self.audio.decode_sound(data, path) if data else None
+        timing.decode = self._now() - start
+        return chunk
+
+    def _submit(self, path: str, kind: str, decode):
+        if path not in self.futures:
+            self.futures[path] = self.pool.submit(decode, path, self._timing(path, kind))
+
+    def requestImages(self, paths):
+        for path in paths:
+            self._submit(path, "image", self._decodeImage)
+
+    def requestSounds(self, paths):
+        for path in paths:
+            self._submit(path, "sound", self._decodeSound)
+
+    def _take(self, path: str):
+        future = self.futures.pop(path)
+        start = time.perf_counter()
+        result = future.result()
+        waited = time.perf_counter() - start
+        self.timings[path].wait += waited
+        self.waited += waited
+        return result
+
+    def takeSurface(self, path: str):
+        """Decoded surface of path, owned by the caller from now on; None if it can't be loaded."""
+        self.requestImages((path,))
+        surface = self._take(path)
+        if surface is None:
+            print(f"Failed to load image: {path}")
+        return surface
+
+    def takeSound(self, path: str):
+        """Decoded chunk of path, owned by the caller from now on; None if it can't be loaded."""
+        self.requestSounds((path,))
+        return self._take(path)
+
+    @contextmanager
+    def uploading(self, path: str, kind: str = "texture"):
+        """Charges the main thread work in the block to path, minus time spent waiting on workers."""
+        timing = self._timing(path, kind)
+        waited = self.waited
+        start = time.perf_counter()
+        if not timing.start:
+            timing.start = self._now()
+        try:
+            yield timing
+        finally:
+            timing.upload += time.perf_counter() - start - (self.waited - waited)
+
+    def timeline(self) -> list:
+        return sorted(self.timings.values(), key=lambda t: t.start)
+
+    def close(self):
+        """Waits for the workers; results nobody took are freed."""
+        self.pool.shutdown(wait=True)
+        for path, future in self.futures.items():
+            result = future.result()
+            if result is None:
+                continue
+            if self.timings[path].kind == "image":
+                sdl3.SDL_DestroySurface(result)
+            else:
+                self.audio.free_sound(result)
+        self.futures.clear()
+        self.elapsed = self._now()
+
+
+def formatTimeline(timings, elapsed: float = None) -> str:
+    """Table of a load timeline, slowest asset first, times in milliseconds."""
+    lines = [f"{'asset':<40} {'kind':<8} {'KiB':>8} {'start':>8} {'read':>8} {'decode':>8} {'wait':>8} {'upload':>8}"]
+    for t in sorted(timings, key=lambda t: -t.total):
+        lines.append(
+            f"{t.path:<40} {t.kind:<8} {t.bytes / 1024:8.1f} {t.start * 1000:8.2f} {t.read * 1000:8.2f}"
+            f" {t.decode * 1000:8.2f} {t.wait * 1000:8.2f} {t.upload * 1000:8.2f}"
+        )
+    if elapsed is not None:
+        lines.append(f"{len(timings)} assets loaded in {elapsed * 1000:.2f} ms")
+    return "\n".join(lines)
@@ -0,0 +1,197 @@
+import json
+import os
+
+import sdl3
+import sdl3.SDL_image as sdlimage
+
+
+class AtlasRegion:
+    """A sprite's rectangle inside a texture, usually a shared atlas.
+
+    Game objects hold regions where they used to hold textures; w and h are
+    the sprite's own size, and u/v scale atlas pixels to texture coordinates.
+    """
+
+    __slots__ = ("texture", "name", "x", "y", "w", "h", "u", "v")
+
+    def __init__(self, texture, name: str, x: float, y: float, w: float, h: float, atlasW: float, atlasH: float):
+        self.texture = texture
+        self.name = name
+        self.x = x
+        self.y = y
+        self.w = w
+        self.h = h
+        self.u = 1.0 / atlasW if atlasW else 0.0
+        self.v = 1.0 / atlasH if atlasH else 0.0
+
+    @staticmethod
+    def whole(texture, name: str, w: float, h: float):
+        """Region covering all of a standalone texture."""
+        return AtlasRegion(texture, name, 0.0, 0.0, w, h, w, h)
+
+    def __repr__(self):
+        return f"AtlasRegion({self.name!r}, {self.x}, {self.y}, {self.w}x{self.h})"
+
+
+def nextPowerOfTwo(n: int) -> int:
+    p = 1
+    while p < n:
+        p *= 2
+    return p
+
+
+def packShelves(sizes, maxWidth: int, padding: int = 1):
+    """Packs (w, h) rectangles into rows, tallest first.
+
+    Returns the (x, y) of each rectangle in input order and the atlas size,
+    rounded up to powers of two.
+    """
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    positions = [None] * len(sizes)
+    x = y = shelfHeight = width = 0
+    for i in order:
+        w, h = sizes[i]
+        if w > maxWidth:
+            raise ValueError(f"Sprite of width {w} doesn't fit an atlas {maxWidth} wide")
+        if x + w > maxWidth:
+            y += shelfHeight + padding
+            x = shelfHeight = 0
+        positions[i] = (x, y)
+        x += w + padding
+        shelfHeight = max(shelfHeight, h)
+        width = max(width, x - padding)
+    return positions, nextPowerOfTwo(width), nextPowerOfTwo(y + shelfHeight)
+
+
+class TextureAtlas:
+    """One texture holding many sprite sheets, with a region per source file."""
+
+    def __init__(self, texture, width: int, height: int, rects: dict):
+        self.texture = texture
+        self.width = width
+        self.height = height
+        self.regions = {
+            name: AtlasRegion(texture, name, x, y, w, h, width, height)
+            for name, (x, y, w, h) in rects.items()
+        }
+
+    def __getitem__(self, name: str) -> AtlasRegion:
+        return self.regions[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.regions
+
+    @staticmethod
+    def sourceImages(paths, cacheDir: str = None) -> list:
+        """The image files build() will decode: the cached atlas if it is up to date, else paths."""
+        if cacheDir and TextureAtlas.cachedLayout(cacheDir, {p: sourceStamp(p) for p in paths}):
+            return [os.path.join(cacheDir, "atlas.png")]
+        return list(paths)
+
+    @staticmethod
+    def build(renderer, paths, cacheDir: str = None, maxWidth: int = 1024, loadImage=None):
+        """Packs the images at paths into one texture.
+
+        With cacheDir, the packed image and its layout are saved there and
+        reused on later runs as long as none of the sources changed.
+        loadImage(path) decodes an image to a surface the atlas takes over,
+        IMG_Load by default. Returns None if an image can't be loaded.
+        """
+        if loadImage is None:
+            loadImage = loadSurface
+        sources = {p: sourceStamp(p) for p in paths}
+        if cacheDir:
+            atlas = TextureAtlas.fromCache(renderer, cacheDir, sources, loadImage)
+            if atlas:
+                return atlas
+
+        surfaces = []
+        try:
+            for path in paths:
+                surface = loadImage(path)
+                if not surface:
+                    print(f"Failed to load atlas image: {path}")
+                    return None
+                surfaces.append(surface)
+
+            sizes = [(s.contents.w, s.contents.h) for s in surfaces]
+            positions, width, height = packShelves(sizes, maxWidth)
+            atlasSurface = sdl3.SDL_CreateSurface(width, height, sdl3.SDL_PIXELFORMAT_RGBA32)
+            if not atlasSurface:
+                print("Failed to create atlas surface:", sdl3.SDL_GetError().decode())
+                return None
+            rects = {}
+            for path, surface, (w, h), (x, y) in zip(paths, surfaces, sizes, positions):
+                # copy alpha as-is instead of blending onto the empty atlas
+                sdl3.SDL_SetSurfaceBlendMode(surface, sdl3.SDL_BLENDMODE_NONE)
+                sdl3.SDL_BlitSurface(surface, None, atlasSurface, sdl3.SDL_Rect(x, y, w, h))
+                rects[path] = (x, y, w, h)
+
+            if cacheDir:
+                saveCache(atlasSurface, cacheDir, width, height, rects, sources)
+            texture = sdl3.SDL_CreateTextureFromSurface(renderer, atlasSurface)
+            sdl3.SDL_DestroySurface(atlasSurface)
+        finally:
+            for surface in surfaces:
+                sdl3.SDL_DestroySurface(surface)
+
+        if not texture:
+            print("Failed to create atlas texture:", sdl3.SDL_GetError().decode())
+            return None
+        return TextureAtlas(texture, width, height, rects)
+
+    @staticmethod
+    def cachedLayout(cacheDir: str, sources: dict):
+        """The cached atlas layout if it was packed from exactly these sources, else None."""
+        try:
+            with open(os.path.join(cacheDir, "atlas.json")) as f:
+                layout = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if layout.get("sources") != sources:
+            return None
+        return layout
+
+    @staticmethod
+    def fromCache(renderer, cacheDir: str, sources: dict, loadImage=None):
+        """Loads a prebuilt atlas if it was packed from exactly these sources."""
+        layout = TextureAtlas.cachedLayout(cacheDir, sources)
+        if layout is None:
+            return None
+        surface = (loadImage or loadSurface)(os.path.join(cacheDir, "atlas.png"))
+        if not surface:
+            return None
+        texture = sdl3.SDL_CreateTextureFromSurface(renderer, surface)
+        sdl3.SDL_DestroySurface(surface)
+        if not texture:
+            return None
+        rects = {name: tuple(r) for name, r in layout["rects"].items()}
+        return TextureAtlas(texture, layout["width"], layout["height"], rects)
+
+
+def loadSurface(path: str):
+    return sdlimage.IMG_Load(path.encode("utf-8"))
+
+
+def sourceStamp(path: str):
+    """Size and modification time of a source image, to tell when a cached atlas is stale."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def saveCache(surface, cacheDir: str, width: int, height: int, rects: dict, sources: dict):
+    try:
+        os.makedirs(cacheDir, exist_ok=True)
+        if not sdlimage.IMG_SavePNG(surface, os.path.join(cacheDir, "atlas.png").encode("utf-8")):
+            return
+        with open(os.path.join(cacheDir, "atlas.json"), "w") as f:
+            json.dump(
+                {"width": width, "height": height, "rects": rects, "sources": sources},
+                f,
+                indent=1,
+            )
+    except OSError as e:
+        print(f"Failed to cache atlas: {e}")
@@ -0,0 +1,261 @@
+import struct
+
+
+class NullTexture:
+    """Stand-in for an SDL_Texture when running without a renderer.
+
+    Only the size is known; it is read from the PNG header so colliders that
+    depend on texture sizes match the real game.
+    """
+
+    def __init__(self, filepath: str, width: float = 0.0, height: float = 0.0):
+        self.filepath = filepath
+        self.width = width
+        self.height = height
+
+    @staticmethod
+    def from_file(filepath: str):
+        width, height = png_size(filepath)
+        return NullTexture(filepath, float(width), float(height))
+
+    def __bool__(self):
+        return True
+
+    def __repr__(self):
+        return f"NullTexture({self.filepath!r}, {self.width}x{self.height})"
+
+
+def png_size(filepath: str):
+    """Reads the pixel size from a PNG's IHDR chunk without decoding it."""
+    try:
+        with open(filepath, "rb") as f:
+            header = f.read(24)
+    except OSError:
+        return 0, 0
+    if len(header) < 24 or header[:8] != b"\x89PNG\r\n\x1a\n":
+        return 0, 0
+    return struct.unpack(">II", header[16:24])
+
+
+def wav_length(filepath: str) -> float:
+    """Playing time of a WAV file in seconds, from its fmt and data chunk headers."""
+    try:
+        with open(filepath, "rb") as f:
+            if f.read(12)[8:] != b"WAVE":
+                return 0.0
+            byteRate = 0
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    return 0.0
+                chunkId, size = struct.unpack("<4sI", header)
+                if chunkId == b"fmt ":
+                    byteRate = struct.unpack("<8xI", f.read(12))[0]
+                    f.seek(size - 12, 1)
+                elif chunkId == b"data":
+                    return size / byteRate if byteRate else 0.0
+                else:
+                    f.seek(size + (size & 1), 1)
+    except (OSError, struct.error):
+        return 0.0
+
+
+# Mixer channels: the first MUSIC_CHANNELS are reserved for crossfading
+# music tracks, sound effects play on the rest
+MUSIC_CHANNELS = (0, 1)
+EFFECT_CHANNELS = 8
+
+
+class MixerAudio:
+    """Audio backend playing through SDL2_mixer."""
+
+    MUSIC_CHANNELS = MUSIC_CHANNELS
+
+    def __init__(self):
+        import sdl2
+        import sdl2.sdlmixer as mixer
+
+        self.mixer = mixer
+        self.rwFromMemory = sdl2.SDL_RWFromConstMem
+
+    def open(self):
+        mixer = self.mixer
+        if mixer.Mix_Init(mixer.MIX_INIT_MP3) < 0:
+            print(
+                "SDL_mixer could not initialize! Error:", mixer.Mix_GetError().decode()
+            )
+            return False
+
+        if mixer.Mix_OpenAudio(44100, mixer.MIX_DEFAULT_FORMAT, 2, 2048) < 0:
+            print("SDL_mixer OpenAudio failed! Error:", mixer.Mix_GetError().decode())
+            return False
+        # decoded chunks are in the device format: 44.1 kHz, 16-bit, stereo
+        self.bytesPerSecond = 44100 * 2 * 2
+        mixer.Mix_AllocateChannels(len(MUSIC_CHANNELS) + EFFECT_CHANNELS)
+        # Mix_PlayChannel(-1, ...) never picks a reserved channel
+        mixer.Mix_ReserveChannels(len(MUSIC_CHANNELS))
+        return True
+
+    def close(self):
+        self.mixer.Mix_CloseAudio()
+
+    def load_sound(self, filepath: str):
+        chunk = self.mixer.Mix_LoadWAV(filepath.encode("utf-8"))
+        if not chunk:
+            print(f"Failed to load sound: {filepath} – {self.mixer.Mix_GetError().decode()}")
+        return chunk
+
+    def decode_sound(self, data: bytes, filepath: str):
+        """Decodes a sound file already read into data; safe to call off the main thread."""
+        chunk = self.mixer.Mix_LoadWAV_RW(self.rwFromMemory(data, len(data)), 1)
+        if not chunk:
+            print(f"Failed to load sound: {filepath} – {self.mixer.Mix_GetError().decode()}")
+            return None
+        return chunk
+
+    def load_music(self, filepath: str):
+        music = self.mixer.Mix_LoadMUS(filepath.encode("utf-8"))
+        if not bool(music):
+            print(f"Failed to load music: {filepath} – {self.mixer.Mix_GetError().decode()}")
+            return None
+        return music
+
+    def decode_music(self, filepath: str):
+        """Decodes a whole music file into a chunk, or returns None if the mixer can't.
+
+        Safe to call off the main thread.
+        """
+        chunk = self.mixer.Mix_LoadWAV(filepath.encode("utf-8"))
+        return chunk if chunk else None
+
+    def free_sound(self, chunk):
+        if chunk:
+            self.mixer.Mix_FreeChunk(chunk)
+
+    def free_music(self, music):
+        if music:
+            self.mixer.Mix_FreeMusic(music)
+
+    def play_sound(self, chunk, volume=128):
+        """Plays chunk on a free channel and returns it, or -1 if none is free."""
+        if not chunk:
+            return -1
+        channel = self.mixer.Mix_PlayChannel(-1, chunk, 0)
+        if channel >= 0:
+            self.mixer.Mix_Volume(channel, volume)
+        return channel
+
+    def stop_channel(self, channel):
+        self.mixer.Mix_HaltChannel(channel)
+
+    def sound_length(self, chunk) -> float:
+        return chunk.contents.alen / self.bytesPerSecond
+
+    def sound_bytes(self, chunk) -> int:
+        return chunk.contents.alen
+
+    def fade_in_channel(self, channel, chunk, ms, loops=-1):
+        self.mixer.Mix_FadeInChannel(channel, chunk, loops, ms)
+
+    def fade_out_channel(self, channel, ms):
+        self.mixer.Mix_FadeOutChannel(channel, ms)
+
+    def set_channel_volume(self, channel, volume):
+        self.mixer.Mix_Volume(channel, volume)
+
+    def is_playing(self, channel) -> bool:
+        return self.mixer.Mix_Playing(channel) != 0
+
+    def play_music(self, music, loops=-1):
+        if music:
+            self.mixer.Mix_PlayMusic(music, loops)
+
+    def fade_in_music(self, music, ms, loops=-1):
+        if music:
+            self.mixer.Mix_FadeInMusic(music, loops, ms)
+
+    def halt_music(self):
+        self.mixer.Mix_HaltMusic()
+
+    def set_music_volume(self, volume):
+        self.mixer.Mix_VolumeMusic(volume)
+
+
+class NullAudio:
+    """Audio backend that accepts every call and plays nothing.
+
+    Sounds are still "loaded" as their file path so gameplay code that checks
+    for a loaded chunk behaves the same as with real audio.
+    """
+
+    MUSIC_CHANNELS = MUSIC_CHANNELS
+
+    def __init__(self):
+        self.played = 0
+        self.lengths = {}
+
+    def open(self):
+        return True
+
+    def close(self):
+        pass
+
+    def load_sound(self, filepath: str):
+        return filepath
+
+    def decode_sound(self, data: bytes, filepath: str):
+        return filepath
+
+    def load_music(self, filepath: str):
+        return filepath
+
+    def decode_music(self, filepath: str):
+        return filepath
+
+    def free_sound(self, chunk):
+        pass
+
+    def free_music(self, music):
+        pass
+
+    def play_sound(self, chunk, volume=128):
+        if not chunk:
+            return -1
+        self.played += 1
+        return self.played
+
+    def stop_channel(self, channel):
+        pass
+
+    def sound_length(self, chunk) -> float:
+        length = self.lengths.get(chunk)
+        if length is None:
+            length = self.lengths[chunk] = wav_length(chunk)
+        return length
+
+    def sound_bytes(self, chunk) -> int:
+        return 0
+
+    def fade_in_channel(self, channel, chunk, ms, loops=-1):
+        pass
+
+    def fade_out_channel(self, channel, ms):
+        pass
+
+    def set_channel_volume(self, channel, volume):
+        pass
+
+    def is_playing(self, channel) -> bool:
+        return False
+
+    def play_music(self, music, loops=-1):
+        pass
+
+    def fade_in_music(self, music, ms, loops=-1):
+        pass
+
+    def halt_music(self):
+        pass
+
+    def set_music_volume(self, volume):
+        pass
@@ -0,0 +1,370 @@
+"""Benchmark suite for the simulation and rendering hot paths.
+
+Runs scripted scenarios headless and reports per-frame and per-function
+timings (mean, p95, p99) as JSON:
+
+    python3 benchmark.py --output results.json
+    python3 benchmark.py --save baseline.json
+    python3 benchmark.py --compare baseline.json --threshold 0.10
+
+Rendering scenarios need SDL's offscreen video driver and are skipped with
+--no-render (or automatically if no renderer can be created).
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import numpy as np
+import sdl3
+
+import game
+import headless
+from game import Resources
+
+# Functions timed on every call, looked up on the game module at call time
+TIMED_FUNCTIONS = (
+    "simulateFrame",
+    "drawFrame",
+    "updateObjects",
+    "updatePass",
+    "steerEnemies",
+    "update",
+    "updateBehaviour",
+    "resolveCollisions",
+    "checkcollision",
+    "collisionResponse",
+    "generateLevelChunk",
+    "cleanupDistantObjects",
+    "playQueuedSounds",
+    "drawObject",
+)
+
+SEED = 1234
+
+
+class Timings:
+    """Collects call durations of the game functions in TIMED_FUNCTIONS."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self._originals = {}
+
+    def install(self):
+        for name in TIMED_FUNCTIONS:
+            fn = getattr(game, name, None)
+            if fn is None:
+                continue
+            self._originals[name] = fn
+            setattr(game, name, self._wrap(name, fn))
+
+    def uninstall(self):
+        for name, fn in self._originals.items():
+            setattr(game, name, fn)
+        self._originals.clear()
+
+    def _wrap(self, name, fn):
+        samples = self.samples[name]
+        clock = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                samples.append(clock() - start)
+
+        return timed
+
+    def summary(self):
+        return {name: summarize(s) for name, s in self.samples.items() if s}
+
+
+def summarize(samples):
+    """Mean, p95 and p99 of a list of durations in seconds, reported in milliseconds."""
+    a = np.asarray(samples) * 1000.0
+    return {
+        "calls": len(a),
+        "mean_ms": float(a.mean()),
+        "p95_ms": float(np.percentile(a, 95)),
+        "p99_ms": float(np.percentile(a, 99)),
+        "total_ms": float(a.sum()),
+    }
+
+
+def seedEverything():
+    random.seed(SEED)
+    sdl3.SDL_srand(SEED)
+
+
+def runFrames(state, gs, frames, script=None, render=False, immortal=True):
+    """Steps the world frame by frame, returning each frame's duration."""
+    deltaTime = 1.0 / game.TICK_RATE
+    frameTimes = []
+    clock = time.perf_counter
+    for frame in range(frames):
+        start = clock()
+        if script:
+            script(frame, state, gs)
+        if immortal and gs.player:
+            gs.player.data.player.hp = gs.player.data.player.max_hp
+        game.snapshotPositions(gs)
+        game.simulateFrame(state, gs, Resources, deltaTime)
+        game.playQueuedSounds(gs, deltaTime)
+        if render:
+            game.drawFrame(state, gs, Resources, deltaTime)
+            sdl3.SDL_RenderPresent(state.renderer)
+        frameTimes.append(clock() - start)
+    return frameTimes
+
+
+def spawnEnemyRow(state, gs, count):
+    """Lines enemies up on the ground ahead of the player, generating chunks as needed."""
+    spacing = 16
+    ground_y = state.logicalh - 2 * Resources.TILE_SIZE
+    x = gs.player.position.x + 64
+    while gs.last_chunk_end < x + count * spacing:
+        game.generateLevelChunk(gs, state, Resources, gs.last_chunk_end)
+    for i in range(count):
+        game.spawnEnemy(gs, Resources, x + i * spacing, ground_y)
+
+
+@contextmanager
+def scenarioWorld(state, **kwargs):
+    """A fresh world for one scenario, its chunk store closed once the scenario is done."""
+    gs = headless.createWorld(state, **kwargs)
+    try:
+        yield gs
+    finally:
+        gs.chunkStore.close()
+
+
+# Scenarios: each takes (state, frames, render) and returns per-frame durations,
+# or (durations, counters) to report what the run did alongside its timings
+def scenarioEnemies(count):
+    def run(state, frames, render):
+        with scenarioWorld(state) as gs:
+            spawnEnemyRow(state, gs, count)
+            return runFrames(state, gs, frames, render=render)
+
+    return run
+
+
+def scenarioBulletSpam(state, frames, render):
+    with scenarioWorld(state, maxBullets=512, weaponCooldown=0.0) as gs:
+        return runFrames(state, gs, frames, headless.RunAndGun(jumpEvery=0), render=render)
+
+
+def scenarioChunks(state, frames, render):
+    """Generates chunk after chunk, cleaning up behind like a fast runner would."""
+    frameTimes = []
+    clock = time.perf_counter
+    with scenarioWorld(state) as gs:
+        for _ in range(frames):
+            start = clock()
+            game.generateLevelChunk(gs, state, Resources, gs.last_chunk_end)
+            game.cleanupDistantObjects(gs, gs.last_chunk_end - 3 * gs.chunk_width)
+            frameTimes.append(clock() - start)
+    return frameTimes
+
+
+def scenarioPregenerate(state, frames, render):
+    """Generates chunk layouts in batches of 100, the way stress runs pregenerate levels."""
+    frameTimes = []
+    clock = time.perf_counter
+    with scenarioWorld(state) as gs:
+        for batch in range(frames):
+            start = clock()
+            gs.levelGen.generate(range(batch * 100, (batch + 1) * 100))
+            frameTimes.append(clock() - start)
+    return frameTimes
+
+
+class Teleport:
+    """Runs another script and moves the player a chunk ahead every few frames.
+
+    Scripted running gets stuck on platforms, so the player is carried
+    forward instead: chunks keep being generated ahead and evicted behind.
+    """
+
+    def __init__(self, script, every: int):
+        self.script = script
+        self.every = every
+
+    def __call__(self, frame: int, state, gs):
+        self.script(frame, state, gs)
+        if frame and frame % self.every == 0 and gs.player:
+            # drop in from the top row, clear of the platforms
+            gs.player.position.x += gs.chunk_width
+            gs.player.position.y = state.logicalh - Resources.MAP_ROWS * Resources.TILE_SIZE
+            gs.player.velocity.y = 0.0
+
+
+def scenarioLongRun(state, frames, render):
+    """Runs far enough that chunks are evicted to the chunk store over and over."""
+    with scenarioWorld(state) as gs:
+        frameTimes = runFrames(state, gs, frames, Teleport(headless.RunAndGun(jumpEvery=30), 120), render=render)
+        counters = {
+            "chunks_generated": gs.generated_chunks,
+            "chunks_evicted": gs.generated_chunks - len(gs.tiles.chunks),
+            "chunks_stored": len(gs.chunkStore),
+            "chunks_dropped": gs.chunkStore.dropped,
+            "player_x": float(gs.player.position.x),
+        }
+    return frameTimes, counters
+
+
+# name -> (scenario, frames, needs a renderer)
+SCENARIOS = {
+    "enemies_10": (scenarioEnemies(10), 600, False),
+    "enemies_100": (scenarioEnemies(100), 600, False),
+    "enemies_1000": (scenarioEnemies(1000), 300, False),
+    "bullet_spam": (scenarioBulletSpam, 1200, False),
+    "chunks_500": (scenarioChunks, 500, False),
+    "pregenerate_5000": (scenarioPregenerate, 50, False),
+    "long_run": (scenarioLongRun, 20000, False),
+    "render_enemies_100": (scenarioEnemies(100), 600, True),
+    "render_bullet_spam": (scenarioBulletSpam, 600, True),
+}
+
+
+def runSuite(names, render=True, scale=1.0):
+    """Runs the selected scenarios and returns the JSON-ready results."""
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "tick_rate": game.TICK_RATE,
+            "entity_store": game.USE_ENTITY_STORE,
+            "seed": SEED,
+        },
+        "scenarios": {},
+    }
+
+    # Resources are global: load them for one state at a time, unloading in between
+    for needs_render in (False, True):
+        group = [n for n in names if SCENARIOS[n][2] == needs_render]
+        if not group or (needs_render and not render):
+            continue
+        try:
+            state = headless.createHeadlessState(render=needs_render)
+        except RuntimeError as e:
+            if not needs_render:
+                raise
+            print(f"Skipping render scenarios: {e}", file=sys.stderr)
+            continue
+        prefix = "render_" if needs_render else ""
+        results["meta"][prefix + "textures"] = Resources.textures.stats()
+        results["meta"][prefix + "asset_load_ms"] = Resources.loadSeconds * 1000.0
+        try:
+            for name in group:
+                entry = results["scenarios"][name] = runScenario(name, state, scale)
+                report = "".join(f" {k}={v}" for k, v in entry.get("counters", {}).items())
+                print(f"{name}: {entry['frame']['mean_ms']:.3f} ms/frame{report}", file=sys.stderr)
+        finally:
+            Resources.unload()
+            if needs_render:
+                game.cleanup(state)
+    return results
+
+
+def runScenario(name, state, scale=1.0):
+    scenario, frames, needs_render = SCENARIOS[name]
+    frames = max(1, int(frames * scale))
+    seedEverything()
+    timings = Timings()
+    timings.install()
+    try:
+        result = scenario(state, frames, needs_render)
+    finally:
+        timings.uninstall()
+    frameTimes, counters = result if isinstance(result, tuple) else (result, None)
+    entry = {
+        "frames": len(frameTimes),
+        "frame": summarize(frameTimes),
+        "functions": timings.summary(),
+    }
+    if counters:
+        entry["counters"] = counters
+    return entry
+
+
+def compare(results, baseline, threshold):
+    """Prints changes against a baseline; returns the list of regressions."""
+    regressions = []
+    for name, current in results["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            print(f"{name}: no baseline")
+            continue
+        rows = [("frame", current["frame"], base["frame"])]
+        rows += [
+            (fn, stats, base["functions"][fn])
+            for fn, stats in current["functions"].items()
+            if fn in base["functions"]
+        ]
+        for label, cur, old in rows:
+            for metric in ("mean_ms", "p95_ms", "p99_ms"):
+                if old[metric] <= 0:
+                    continue
+                ratio = cur[metric] / old[metric]
+                flag = ""
+                if ratio > 1.0 + threshold:
+                    flag = "  REGRESSION"
+                    regressions.append((name, label, metric, ratio))
+                print(
+                    f"{name:20} {label:22} {metric:8} "
+                    f"{old[metric]:10.4f} -> {cur[metric]:10.4f}  x{ratio:5.2f}{flag}"
+                )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark simulation and rendering hot paths.")
+    parser.add_argument("scenarios", nargs="*", help=f"scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument("--output", help="write results JSON to this file (default: stdout)")
+    parser.add_argument("--save", help="write results as a baseline file")
+    parser.add_argument("--compare", help="baseline file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown before flagging a regression")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every scenario's frame count")
+    parser.add_argument("--no-render", action="store_true", help="skip scenarios that need a renderer")
+    args = parser.parse_args(argv)
+
+    names = args.scenarios or list(SCENARIOS)
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    # file arguments are relative to where we were started, assets to the game directory
+    for attr in ("output", "save", "compare"):
+        if getattr(args, attr):
+            setattr(args, attr, os.path.abspath(getattr(args, attr)))
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    results = runSuite(names, render=not args.no_render, scale=args.scale)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    elif not args.compare and not args.save:
+        print(text)
+    if args.save:
+        with open(args.save, "w") as f:
+            f.write(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+class BulletPool:
+    """Fixed-capacity pool of preallocated bullets.
+
+    Free bullets sit on a free list and active ones in a dense list, so
+    acquiring, releasing and counting active bullets are all O(1).
+    Iterating the pool yields only the active bullets.
+    """
+
+    def __init__(self, capacity: int, factory):
+        self.capacity = capacity
+        self.bullets = [factory() for _ in range(capacity)]
+        self.active = []
+        # pool slot -> position in self.active, -1 while free
+        self._activeSlot = [-1] * capacity
+        self._poolSlot = {id(b): i for i, b in enumerate(self.bullets)}
+        self.free = list(range(capacity - 1, -1, -1))
+
+    @property
+    def activeCount(self) -> int:
+        return len(self.active)
+
+    def __len__(self) -> int:
+        return len(self.active)
+
+    def __iter__(self):
+        return iter(self.active)
+
+    def acquire(self):
+        """Returns a free bullet marked as active, or None if the pool is exhausted."""
+        if not self.free:
+            return None
+        i = self.free.pop()
+        bullet = self.bullets[i]
+        self._activeSlot[i] = len(self.active)
+        self.active.append(bullet)
+        return bullet
+
+    def release(self, bullet):
+        """Puts an active bullet back on the free list."""
+        i = self._poolSlot[id(bullet)]
+        slot = self._activeSlot[i]
+        if slot < 0:
+            return
+        last = self.active.pop()
+        if last is not bullet:
+            self.active[slot] = last
+            self._activeSlot[self._poolSlot[id(last)]] = slot
+        self._activeSlot[i] = -1
+        self.free.append(i)
@@ -0,0 +1,152 @@
+"""Compact on-disk storage for level chunks that scrolled out of the world.
+
+Every evicted chunk is one fixed-size record in a memory-mapped file: its
+uint8 tile grids and the state of the enemies that were standing in it.
+Records are written on eviction and read back when the player returns, so
+the chunk comes back exactly as it was left instead of being regenerated.
+The file has a fixed number of records; once they are all in use the
+chunk stored longest ago is dropped, so an endless run stays bounded.
+Like levelgen, this module must not import SDL.
+"""
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+
+# Grids kept per chunk, in record order
+GRID_TILES = 0
+GRID_FOREGROUND = 1
+GRID_BACKGROUND = 2
+
+# Enemies beyond this many in one chunk are not kept
+MAX_ENEMIES = 32
+
+ENEMY_STATES = ("shambling", "damage", "dead")
+
+# float64 like the entity store, so positions far into a run come back exactly
+ENEMY_DTYPE = np.dtype([
+    ("x", "<f8"),
+    ("y", "<f8"),
+    ("vx", "<f8"),
+    ("vy", "<f8"),
+    ("damageTime", "<f8"),
+    ("hp", "<i2"),
+    ("direction", "i1"),
+    ("state", "u1"),
+])
+
+
+def recordDtype(rows: int, cols: int) -> np.dtype:
+    return np.dtype([
+        ("index", "<i8"),
+        ("grids", "u1", (3, rows, cols)),
+        ("enemyCount", "<u2"),
+        ("enemies", ENEMY_DTYPE, (MAX_ENEMIES,)),
+    ])
+
+
+class ChunkStore:
+    """Evicted chunks by index, in a memory-mapped file of capacity fixed-size records.
+
+    Slots of restored chunks are reused. When every slot holds a chunk,
+    saving another one drops the chunk stored longest ago, which then has
+    to be regenerated if the player ever returns. The file is temporary
+    unless a path is given.
+    """
+
+    def __init__(self, rows: int, cols: int, capacity: int = 64, path: str = None):
+        self.rows = rows
+        self.cols = cols
+        self.capacity = capacity
+        self.dtype = recordDtype(rows, cols)
+        self.file = open(path, "w+b") if path else tempfile.TemporaryFile()
+        self.file.truncate(capacity * self.dtype.itemsize)
+        self.records = np.memmap(self.file, dtype=self.dtype, mode="r+", shape=(capacity,))
+        # chunk index -> slot, stored longest ago first
+        self.slots: OrderedDict[int, int] = OrderedDict()
+        # slots are handed out lowest first
+        self.free: list[int] = list(range(capacity - 1, -1, -1))
+        # chunks dropped to make room
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def __contains__(self, index: int) -> bool:
+        return index in self.slots
+
+    @property
+    def fileBytes(self) -> int:
+        return self.capacity * self.dtype.itemsize
+
+    def save(self, index: int, tiles, foreground, background, enemies=()) -> int:
+        """Stores a chunk's grids and enemy records; returns how many enemies were kept.
+
+        enemies is a sequence of (x, y, vx, vy, damageTime, hp, direction, state)
+        tuples, state being an index into ENEMY_STATES.
+        """
+        slot = self.slots.get(index)
+        if slot is None:
+            if not self.free:
+                _, oldest = self.slots.popitem(last=False)
+                self.free.append(oldest)
+                self.dropped += 1
+            slot = self.free.pop()
+            self.slots[index] = slot
+        records = self.records
+        records["index"][slot] = index
+        grids = records["grids"][slot]
+        grids[GRID_TILES] = tiles
+        grids[GRID_FOREGROUND] = foreground
+        grids[GRID_BACKGROUND] = background
+        kept = list(enemies)[:MAX_ENEMIES]
+        records["enemyCount"][slot] = len(kept)
+        if kept:
+            records["enemies"][slot, : len(kept)] = np.array(kept, dtype=ENEMY_DTYPE)
+        return len(kept)
+
+    def addEnemies(self, index: int, enemies) -> int:
+        """Appends enemy records to a chunk that is already stored."""
+        slot = self.slots[index]
+        records = self.records
+        count = int(records["enemyCount"][slot])
+        kept = list(enemies)[: MAX_ENEMIES - count]
+        if kept:
+            records["enemies"][slot, count : count + len(kept)] = np.array(kept, dtype=ENEMY_DTYPE)
+            records["enemyCount"][slot] = count + len(kept)
+        return len(kept)
+
+    def load(self, index: int):
+        """Removes chunk index from the store and returns (tiles, foreground, background, enemies).
+
+        The grids are copies; enemies is a structured array of ENEMY_DTYPE.
+        """
+        slot = self.slots.pop(index)
+        self.free.append(slot)
+        records = self.records
+        grids = np.array(records["grids"][slot])
+        enemies = np.array(records["enemies"][slot, : int(records["enemyCount"][slot])])
+        return grids[GRID_TILES], grids[GRID_FOREGROUND], grids[GRID_BACKGROUND], enemies
+
+    def discard(self, index: int):
+        slot = self.slots.pop(index, None)
+        if slot is not None:
+            self.free.append(slot)
+
+    def clear(self):
+        for index in list(self.slots):
+            self.discard(index)
+
+    def stats(self) -> dict:
+        return {
+            "stored": len(self.slots),
+            "capacity": self.capacity,
+            "dropped": self.dropped,
+            "file_bytes": self.fileBytes,
+        }
+
+    def close(self):
+        if self.records is not None:
+            self.records.flush()
+            self.records = None
+        self.file.close()
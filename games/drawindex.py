@@ -0,0 +1,73 @@
+import math
+from bisect import bisect_left, bisect_right
+
+
+class DrawIndex:
+    """Static renderables bucketed by x range, each bucket sorted by x.
+
+    Finding what lies in a horizontal range is a couple of binary searches
+    per bucket instead of a pass over every object. margin is the widest
+    renderable, so objects that start left of the range but reach into it
+    are included.
+    """
+
+    def __init__(self, bucketWidth: float, margin: float):
+        self.bucketWidth = bucketWidth
+        self.margin = margin
+        # bucket index -> (sorted x positions, objects in the same order)
+        self.buckets: dict[int, tuple[list, list]] = {}
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def bucketAt(self, x: float) -> int:
+        return math.floor(x / self.bucketWidth)
+
+    def insert(self, obj):
+        x = obj.position.x
+        xs, objs = self.buckets.setdefault(self.bucketAt(x), ([], []))
+        i = bisect_right(xs, x)
+        xs.insert(i, x)
+        objs.insert(i, obj)
+        self.count += 1
+
+    def remove(self, obj):
+        x = obj.position.x
+        index = self.bucketAt(x)
+        bucket = self.buckets.get(index)
+        if bucket is None:
+            return
+        xs, objs = bucket
+        i = bisect_left(xs, x)
+        while i < len(xs) and xs[i] == x:
+            if objs[i] is obj:
+                del xs[i]
+                del objs[i]
+                self.count -= 1
+                if not xs:
+                    del self.buckets[index]
+                return
+            i += 1
+
+    def removeBucket(self, index: int) -> int:
+        """Drops every object in bucket index at once; returns how many there were."""
+        bucket = self.buckets.pop(index, None)
+        if bucket is None:
+            return 0
+        self.count -= len(bucket[0])
+        return len(bucket[0])
+
+    def query(self, left: float, right: float):
+        """Yields objects whose x lies in [left - margin, right], in x order."""
+        start = left - self.margin
+        for index in range(self.bucketAt(start), self.bucketAt(right) + 1):
+            bucket = self.buckets.get(index)
+            if bucket is None:
+                continue
+            xs, objs = bucket
+            yield from objs[bisect_left(xs, start) : bisect_right(xs, right)]
+
+    def clear(self):
+        self.buckets.clear()
+        self.count = 0
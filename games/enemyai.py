@@ -0,0 +1,46 @@
+import numpy as np
+
+
+def steerShamblers(
+    position: np.ndarray,
+    collider: np.ndarray,
+    direction: np.ndarray,
+    playerPos,
+    tiles,
+    aggroMin: float,
+    aggroMax: float,
+    speed: float,
+):
+    """Shambling AI for many enemies in one pass; returns (direction, vx) arrays.
+
+    position is (N, 2), collider (N, 4) and direction (N,), one row per
+    enemy. An enemy whose distance to playerPos is inside the aggro band
+    walks towards the player at speed, unless the tile grid has no ground
+    at its sensor, one pixel below its collider, in which case it turns
+    around. Enemies outside the band stand still and keep their direction.
+    """
+    # float32 like the glm vectors enemies were steered with one by one,
+    # so aggro starts on the same tick and old recordings still replay
+    offsetX = np.float32(playerPos[0]) - position[:, 0].astype(np.float32)
+    offsetY = np.float32(playerPos[1]) - position[:, 1].astype(np.float32)
+    distance = np.hypot(offsetX, offsetY)
+    aggro = (distance > aggroMin) & (distance < aggroMax)
+
+    direction = direction.copy()
+    vx = np.zeros(len(direction))
+    if not aggro.any():
+        return direction, vx
+
+    # 1x1 sensor just below the collider, half its width from the collider's
+    # left edge in the walking direction: under the centre walking right,
+    # half a width out past the left edge walking left, like the per-enemy code
+    dirA = direction[aggro]
+    colA = collider[aggro]
+    sensorX = position[aggro, 0] + colA[:, 0] + (colA[:, 2] / 2) * dirA
+    sensorY = position[aggro, 1] + colA[:, 1] + colA[:, 3] + 1
+    groundAhead = tiles.solidInRects(sensorX, sensorY, 1.0, 1.0)
+
+    towardsPlayer = np.where(offsetX[aggro] > 0, 1.0, -1.0)
+    direction[aggro] = np.where(groundAhead, towardsPlayer, -dirA)
+    vx[aggro] = speed * direction[aggro]
+    return direction, vx
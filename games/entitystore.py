@@ -0,0 +1,261 @@
+import numpy as np
+from pyglm import glm
+
+
+class Vec2View:
+    """glm.vec2 look-alike reading and writing one row of an (N, 2) store array."""
+
+    __slots__ = ("a",)
+
+    def __init__(self, row: np.ndarray):
+        self.a = row
+
+    @property
+    def x(self) -> float:
+        return self.a[0]
+
+    @x.setter
+    def x(self, value):
+        self.a[0] = value
+
+    @property
+    def y(self) -> float:
+        return self.a[1]
+
+    @y.setter
+    def y(self, value):
+        self.a[1] = value
+
+    def vec(self) -> glm.vec2:
+        return glm.vec2(self.a[0], self.a[1])
+
+    def set(self, value):
+        self.a[0] = value.x
+        self.a[1] = value.y
+
+    def __iadd__(self, other):
+        self.a[0] += other.x
+        self.a[1] += other.y
+        return self
+
+    def __isub__(self, other):
+        self.a[0] -= other.x
+        self.a[1] -= other.y
+        return self
+
+    def __add__(self, other):
+        return self.vec() + (other.vec() if isinstance(other, Vec2View) else other)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return self.vec() - (other.vec() if isinstance(other, Vec2View) else other)
+
+    def __rsub__(self, other):
+        return other - self.vec()
+
+    def __mul__(self, other):
+        return self.vec() * other
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        return self.vec() / other
+
+    def __neg__(self):
+        return -self.vec()
+
+    def __len__(self):
+        return 2
+
+    def __getitem__(self, i):
+        return self.a[i]
+
+    def __iter__(self):
+        return iter((self.a[0], self.a[1]))
+
+    def __repr__(self):
+        return f"Vec2View({self.a[0]}, {self.a[1]})"
+
+
+class RectView:
+    """SDL_FRect look-alike over one row of an (N, 4) collider array."""
+
+    __slots__ = ("a",)
+
+    def __init__(self, row: np.ndarray):
+        self.a = row
+
+    @property
+    def x(self) -> float:
+        return self.a[0]
+
+    @x.setter
+    def x(self, value):
+        self.a[0] = value
+
+    @property
+    def y(self) -> float:
+        return self.a[1]
+
+    @y.setter
+    def y(self, value):
+        self.a[1] = value
+
+    @property
+    def w(self) -> float:
+        return self.a[2]
+
+    @w.setter
+    def w(self, value):
+        self.a[2] = value
+
+    @property
+    def h(self) -> float:
+        return self.a[3]
+
+    @h.setter
+    def h(self, value):
+        self.a[3] = value
+
+    def set(self, rect):
+        self.a[:] = (rect.x, rect.y, rect.w, rect.h)
+
+    def __repr__(self):
+        return f"RectView({self.a[0]}, {self.a[1]}, {self.a[2]}, {self.a[3]})"
+
+
+class EntityStore:
+    """Structure-of-arrays storage for dynamic entities.
+
+    Attached GameObjects keep working as before, but their position, velocity,
+    acceleration, collider, direction and flags live in rows of these arrays so
+    gravity, speed clamping and integration can run as one NumPy pass.
+    """
+
+    def __init__(self, capacity: int = 256, gravity: float = 500.0):
+        self.gravity = gravity
+        self.capacity = 0
+        self.size = 0  # rows handed out so far (high-water mark)
+        self.free: list[int] = []
+        self.owners: list = []
+        self.position = np.zeros((0, 2))
+        self.previous = np.zeros((0, 2))
+        self.velocity = np.zeros((0, 2))
+        self.acceleration = np.zeros((0, 2))
+        self.collider = np.zeros((0, 4))
+        self.direction = np.zeros(0)
+        self.maxSpeedX = np.zeros(0)
+        self.active = np.zeros(0, dtype=bool)
+        self.dynamic = np.zeros(0, dtype=bool)
+        self.grounded = np.zeros(0, dtype=bool)
+        # this frame's time step per row, for integrate(); 0 leaves a row where it is
+        self.stepDt = np.zeros(0)
+        # per row, a number taken when its entity was attached or reactivated:
+        # tells a new occupant from the old one and orders rows by spawn
+        self.serial = np.zeros(0, dtype=np.int64)
+        self.nextSerial = 1
+        self._grow(capacity)
+
+    def __len__(self) -> int:
+        return self.size - len(self.free)
+
+    def _grow(self, capacity: int):
+        def grown(a):
+            b = np.zeros((capacity,) + a.shape[1:], dtype=a.dtype)
+            b[: len(a)] = a
+            return b
+
+        self.position = grown(self.position)
+        self.previous = grown(self.previous)
+        self.velocity = grown(self.velocity)
+        self.acceleration = grown(self.acceleration)
+        self.collider = grown(self.collider)
+        self.direction = grown(self.direction)
+        self.maxSpeedX = grown(self.maxSpeedX)
+        self.active = grown(self.active)
+        self.dynamic = grown(self.dynamic)
+        self.grounded = grown(self.grounded)
+        self.stepDt = grown(self.stepDt)
+        self.serial = grown(self.serial)
+        self.owners.extend([None] * (capacity - self.capacity))
+        self.capacity = capacity
+        # Views point at the old arrays, rebind them to the new rows
+        for row, obj in enumerate(self.owners[: self.size]):
+            if obj is not None:
+                obj._bindRow(self, row)
+
+    def attach(self, obj) -> int:
+        """Moves obj's state into a free row and turns obj into a view over it."""
+        if obj._store is not None:
+            return obj._row
+        if self.free:
+            row = self.free.pop()
+        else:
+            if self.size == self.capacity:
+                self._grow(max(16, self.capacity * 2))
+            row = self.size
+            self.size += 1
+        self.position[row] = (obj.position.x, obj.position.y)
+        self.previous[row] = self.position[row]
+        self.velocity[row] = (obj.velocity.x, obj.velocity.y)
+        self.acceleration[row] = (obj.acceleration.x, obj.acceleration.y)
+        c = obj.collider
+        self.collider[row] = (c.x, c.y, c.w, c.h)
+        self.direction[row] = obj.direction
+        self.maxSpeedX[row] = obj.maxSpeedX
+        self.dynamic[row] = obj.dynamic
+        self.grounded[row] = obj.grounded
+        self.active[row] = True
+        self._newSerial(row)
+        self.owners[row] = obj
+        obj._bindRow(self, row)
+        return row
+
+    def _newSerial(self, row: int):
+        self.serial[row] = self.nextSerial
+        self.nextSerial += 1
+
+    def release(self, obj):
+        """Copies obj's state back onto the object and frees its row."""
+        if obj._store is not self:
+            return
+        row = obj._row
+        obj._unbindRow()
+        self.active[row] = False
+        self.owners[row] = None
+        self.free.append(row)
+
+    def setActive(self, obj, active: bool):
+        if obj._store is self:
+            if active and not self.active[obj._row]:
+                self._newSerial(obj._row)
+            self.active[obj._row] = active
+
+    def snapshot(self):
+        """Remembers every row's position as the previous tick's, for render interpolation."""
+        self.previous[: self.size] = self.position[: self.size]
+
+    def integrate(self, deltaTime, rows=None):
+        """Gravity, maxSpeedX clamp and position integration for every active row.
+
+        deltaTime is one time step for all rows, or an array of per-row steps
+        such as stepDt. rows, a mask over the store, limits the pass to the
+        rows set in it; the others aren't touched at all.
+        """
+        n = self.size
+        active = self.active[:n]
+        if rows is not None:
+            active = active & rows[:n]
+        velocity = self.velocity[:n]
+        deltaTime = deltaTime[:n] if np.ndim(deltaTime) else np.full(n, deltaTime)
+
+        falling = active & self.dynamic[:n] & ~self.grounded[:n]
+        velocity[falling, 1] += self.gravity * deltaTime[falling]
+
+        vx = velocity[:, 0]
+        limit = self.maxSpeedX[:n]
+        over = active & (np.abs(vx) > limit)
+        vx[over] = np.sign(vx[over]) * limit[over]
+
+        self.position[:n][active] += velocity[active] * deltaTime[active, None]
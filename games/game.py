@@ -1,60 +1,238 @@
 import sys
 import sdl3
-from sdl3 import SDL_Texture, SDL_FRect, SDL_Renderer
-import sdl2.sdlmixer as mixer 
-import sdl3.SDL_image as sdlimage
+from sdl3 import SDL_FRect
 import ctypes
 from pyglm import glm
 import numpy as np
 import random
+import time
+from itertools import chain
 from gameobject import (
     Animation,
     GameObject,
     ObjectType,
     PlayerState,
-    Timer,
-    BulletState,
-    EnemyState,
 )
-import tracemalloc
+from spatial import SpatialHash
+from tilegrid import TileGrid
+from entitystore import EntityStore
+from bulletpool import BulletPool
+from backends import MixerAudio, NullAudio
+from timestep import FixedTimestep
+from profiler import PHASES, FrameProfiler
+from spritebatch import SpriteBatch
+from atlas import AtlasRegion, TextureAtlas
+from drawindex import DrawIndex
+from textures import TextureRegistry
+from handles import EntityRegistry
+from recording import InputRecorder
+from soundqueue import SoundQueue
+from chunkstore import ChunkStore, ENEMY_STATES
+from music import MusicManager
+from assetloader import AssetLoader, formatTimeline
+from enemyai import steerShamblers
+from activity import ActivityScheduler
+from sweep import castTiles, sweepBox
+from levelgen import (
+    ChunkPrefetcher,
+    LevelGenerator,
+    TILE_GROUND,
+    TILE_PANEL,
+    TILE_ENEMY,
+    TILE_PLAYER,
+    TILE_GRASS,
+    TILE_BRICK,
+)
+
+# Shared libraries the bindings can't locate on their own, per platform
+NATIVE_LIBRARIES = {
+    "win32": ("libSDL3.dll", "libSDL3_image.dll", "libSDL2_mixer.dll"),
+}
 
-#Load SDL3 core and image libraries 
-try:
-    ctypes.CDLL("libSDL3.dll", mode=ctypes.RTLD_GLOBAL)
-    ctypes.CDLL("libSDL3_image.dll", mode=ctypes.RTLD_GLOBAL)
-    ctypes.CDLL("libSDL2_mixer.dll", mode=ctypes.RTLD_GLOBAL)
-except OSError as e:
-    print("Error: SDL library not found.")
-    print(e)
-    sys.exit(1)
+
+def load_native_libraries():
+    """Loads SDL3 core, image and mixer libraries. Returns False if one is missing."""
+    try:
+        for name in NATIVE_LIBRARIES.get(sys.platform, ()):
+            ctypes.CDLL(name, mode=ctypes.RTLD_GLOBAL)
+    except OSError as e:
+        print("Error: SDL library not found.")
+        print(e)
+        return False
+    return True
 
 
-LAYER_IDX_LEVEL = 0
-LAYER_IDX_CHARACTERS = 1
+# Keep dynamic entities in a NumPy structure-of-arrays store and integrate them in one pass
+USE_ENTITY_STORE = True
+# Bullet pool sizing; raise the caps and lower the cooldown for stress tests
+BULLET_POOL_CAPACITY = 64
+MAX_ACTIVE_BULLETS = 6
+WEAPON_COOLDOWN = 0.1
+# Shambling enemies walk towards a player this far away (exclusive), at this speed
+ENEMY_AGGRO_MIN = 50.0
+ENEMY_AGGRO_MAX = 200.0
+ENEMY_WALK_SPEED = 50.0
+# Update rate tiers by distance outside the viewport: every tick within
+# ACTIVE_MARGIN, every REDUCED_EVERY ticks within REDUCED_MARGIN, asleep
+# beyond; enemies that are hit stay at the full rate for WAKE_TIME seconds
+ACTIVE_MARGIN = 64.0
+REDUCED_MARGIN = 640.0
+REDUCED_EVERY = 4
+WAKE_TIME = 2.0
+# Fixed-timestep simulation; rendering interpolates between the last two ticks
+FIXED_TIMESTEP = True
+TICK_RATE = 60
+MAX_CATCHUP_STEPS = 5
+# Sound mixing: voices playing at once, in total and of one sound, and how far
+# off screen a sound can be heard (it fades out over that distance)
+MAX_VOICES = 8
+VOICES_PER_SOUND = 3
+SOUND_CULL_DISTANCE = 320.0
+# Priorities deciding which sounds keep a voice when all are busy
+SOUND_PRIORITY_WALL_HIT = 0
+SOUND_PRIORITY_SHOOT = 1
+SOUND_PRIORITY_ENEMY_HIT = 2
+SOUND_PRIORITY_ENEMY_DIE = 3
+# Background music, played in order with M; tracks are decoded on a worker
+# thread and as many stay in memory as fit in MUSIC_MEMORY_CAP bytes
+MUSIC_TRACKS = (
+    "audio/bgmusic/converted_theme2.mp3",
+    "audio/bgmusic/converted_theme3.mp3",
+    "audio/bgmusic/converted_theme4.mp3",
+    "audio/bgmusic/converted_theme5.mp3",
+)
+MUSIC_MEMORY_CAP = 96 * 1024 * 1024
+MUSIC_FADE_MS = 1500
+# Chunk layouts the generation worker keeps ready ahead of the player
+PREFETCH_DEPTH = 4
+# Evicted chunks kept in the chunk store; older ones are regenerated on revisit
+CHUNK_STORE_CAPACITY = 128
+# Level seed; None picks a new one every run (shown in debug mode to reproduce a level)
+LEVEL_SEED = None
 # Audio constants
 MIX_MAX_VOLUME = 128
 MIX_DEFAULT_VOLUME = 64
+# Sprite sheets and tiles packed into one atlas texture at load time; backgrounds stay separate
+ATLAS_SPRITES = (
+    "idle.png",
+    "run.png",
+    "slide.png",
+    "shoot.png",
+    "shoot_run.png",
+    "slide_shoot.png",
+    "bullet.png",
+    "bullet_hit.png",
+    "enemy.png",
+    "enemy_hit.png",
+    "enemy_die.png",
+    "tiles/brick.png",
+    "tiles/grass.png",
+    "tiles/ground.png",
+    "tiles/panel.png",
+)
+ATLAS_CACHE_DIR = "atlas_cache"
+# Parallax background layers, loaded as standalone textures
+BACKGROUND_LAYERS = (
+    "Backgroung/bg_layer1.png",
+    "Backgroung/bg_layer2.png",
+    "Backgroung/bg_layer3.png",
+    "Backgroung/bg_layer4.png",
+)
+# Sound effects: shoot, shoot hit, enemy hit, enemy die, wall hit
+SOUND_FILES = (
+    "audio/pop1.wav",
+    "audio/audio_shoot_hit.wav",
+    "audio/audio_enemy_hit.wav",
+    "audio/audio_monster_die.wav",
+    "audio/audio_wall_hit.wav",
+)
+# Threads decoding images and sounds at startup; print where the load time went
+ASSET_LOADER_THREADS = 4
+PRINT_LOAD_TIMELINE = False
+# Vertex colour of objects flashing after a hit
+FLASH_TINT = (1.0, 1.0, 2.55, 1.0)
 
 
 class Gamestate:
     """Manages the overall state of the game world."""
-    def __init__(self, state):
-        self.layers = [[], []]
-        self.playerIndex = 0
-        self.player = None
+    def __init__(self, state, maxBullets=None, weaponCooldown=None, seed=None):
+        # player and enemies, as an insertion ordered set; level tiles belong to their chunk
+        self.characters = {}
+        # generational handles for characters and live bullets, destroyed in one flush per frame
+        self.registry = EntityRegistry()
+        # the player is only reached through its handle, see player
+        self.playerHandle = None
+        # writes inputs and checksums per tick while a session is recorded
+        self.recorder = None
+        # sound effects asked for during a frame, played once it is simulated
+        self.sounds = SoundQueue(MAX_VOICES, VOICES_PER_SOUND, SOUND_CULL_DISTANCE)
         self.mapViewport = SDL_FRect(x=0, y=0, w=state.logicalw, h=state.logicalh)
         self.bg2Scroll = 0
         self.bg3Scroll = 0
         self.bg4Scroll = 0
-        self.backgroundTiles = []
-        self.foregroundTiles = []
-        self.bullets = []
+        self.maxBullets = MAX_ACTIVE_BULLETS if maxBullets is None else maxBullets
+        self.weaponCooldown = WEAPON_COOLDOWN if weaponCooldown is None else weaponCooldown
         self.debugMode = False
-        self.deadEnemy = []
         self.playerDead = False
         self.generated_chunks = 0
         self.last_chunk_end = 0
         self.chunk_width = 20 * Resources.TILE_SIZE
+        # broadphase for moving objects, static level tiles live in the tile grid
+        self.spatial = SpatialHash(2 * Resources.TILE_SIZE)
+        self.tiles = TileGrid(
+            Resources.TILE_SIZE,
+            Resources.MAP_ROWS,
+            self.chunk_width // Resources.TILE_SIZE,
+            state.logicalh - Resources.MAP_ROWS * Resources.TILE_SIZE,
+        )
+        # x-sorted static renderables, so drawing only visits what is on screen;
+        # one bucket per chunk, so an evicted chunk's tiles are dropped in one go
+        self.levelIndex = DrawIndex(self.chunk_width, Resources.TILE_SIZE)
+        self.backgroundIndex = DrawIndex(self.chunk_width, Resources.TILE_SIZE)
+        self.foregroundIndex = DrawIndex(self.chunk_width, Resources.TILE_SIZE)
+        self.visibleCount = 0
+        self.totalCount = 0
+        self.entities = EntityStore() if USE_ENTITY_STORE else None
+        # picks which entities update each tick and with how much time
+        self.activity = ActivityScheduler(
+            ACTIVE_MARGIN, REDUCED_MARGIN, REDUCED_EVERY, WAKE_TIME, store=self.entities
+        )
+        # chunk layouts depend only on (seed, chunk index); the seed reproduces a level
+        if seed is None:
+            seed = LEVEL_SEED if LEVEL_SEED is not None else random.getrandbits(32)
+        self.seed = seed
+        self.levelGen = LevelGenerator(
+            seed, Resources.MAP_ROWS, self.chunk_width // Resources.TILE_SIZE
+        )
+        # worker process generating upcoming chunk layouts, started by the game loop
+        self.prefetch = None
+        # chunks evicted behind the player, restored when they come back into range
+        self.chunkStore = ChunkStore(
+            Resources.MAP_ROWS, self.chunk_width // Resources.TILE_SIZE, CHUNK_STORE_CAPACITY
+        )
+        self.bullets = BulletPool(
+            max(BULLET_POOL_CAPACITY, self.maxBullets),
+            lambda: createBullet(Resources),
+        )
+        self.profiler = FrameProfiler()
+        self.batch = SpriteBatch()
+        # draw static tiles from per-chunk render targets instead of tile by tile
+        self.bakeChunks = True
+        # health bars and debug colliders, drawn over the sprites once the batch is flushed
+        self.healthBars = []
+        self.debugColliders = []
+        # pooled bullets keep their store row for life, inactive while free
+        self.bulletRows = None
+        if self.entities is not None:
+            for bullet in self.bullets.bullets:
+                self.entities.attach(bullet)
+                self.entities.setActive(bullet, False)
+            self.bulletRows = np.array([bullet._row for bullet in self.bullets.bullets], dtype=np.intp)
+
+    @property
+    def player(self):
+        """The player, looked up by handle; None before it spawns or once it is destroyed."""
+        return self.registry.get(self.playerHandle)
 
 
 class Resources:
@@ -87,9 +265,11 @@ class Resources:
     chunkEnemyHit = None
     chunkWallHit = None
     chunkEnemyDie = None
-    chunkBackground = None
+    music = None
 
-    textures = []
+    # every SDL texture the game owns, with cached size and reference counts
+    textures = TextureRegistry()
+    atlas = None
     texIdle = None
     texRun = None
     texBrick = None
@@ -110,49 +290,85 @@ class Resources:
     texEnemyHit = None
     texEnemyDie = None
 
+    # audio backend, MixerAudio or NullAudio
+    audio = None
+    # decodes files on worker threads while load() runs
+    loader = None
+    # per-asset AssetTiming of the last load() and its wall time in seconds
+    loadTimeline = []
+    loadSeconds = 0.0
+
     @staticmethod
     def load_sound(filepath: str):
         """Loads a sound effect from file."""
-
-        chunk = mixer.Mix_LoadWAV(filepath.encode("utf-8"))
-        if not chunk:
-            print(f"Failed to load sound: {filepath} – {sdl3.SDL_GetError().decode()}")
-        return chunk
+        if Resources.loader is not None:
+            return Resources.loader.takeSound(filepath)
+        return Resources.audio.load_sound(filepath)
 
     @staticmethod
     def load_music(filepath: str):
         """Loads background music from file."""
-        music = mixer.Mix_LoadMUS(filepath.encode("utf-8"))
-        if not bool(music):
-            print(f"Failed to load music: {filepath} – {mixer.Mix_GetError().decode()}")
-            return None
-        return music
+        return Resources.audio.load_music(filepath)
 
 
     @staticmethod
     def load_texture(renderer, filepath: str):
-        """Loads a texture from file and stores it in the textures list."""
-        tex = sdlimage.IMG_LoadTexture(renderer, filepath.encode("utf-8"))
-        if not tex:
-            print(f"Failed to load texture: {filepath}")
-        sdl3.SDL_SetTextureScaleMode(tex, sdl3.SDL_SCALEMODE_NEAREST)
-        Resources.textures.append(tex)
-        return tex
+        """Loads a standalone texture through the registry and returns a region covering it."""
+        loader = Resources.loader
+        if loader is None or renderer is None:
+            info = Resources.textures.load(renderer, filepath)
+        else:
+            surface = loader.takeSurface(filepath)
+            with loader.uploading(filepath):
+                info = Resources.textures.load(renderer, filepath, surface=surface)
+        if info is None:
+            return None
+        return AtlasRegion.whole(info.handle, filepath, info.width, info.height)
+
+    @staticmethod
+    def load_sprite(renderer, filepath: str):
+        """Returns filepath's region in the sprite atlas, or a standalone texture if it isn't packed."""
+        if Resources.atlas is not None and filepath in Resources.atlas:
+            return Resources.atlas[filepath]
+        return Resources.load_texture(renderer, filepath)
+
+    @staticmethod
+    def load_atlas(renderer):
+        """Packs ATLAS_SPRITES into one texture, reusing the cached atlas when it is up to date."""
+        Resources.atlas = None
+        if renderer is None:
+            return
+        loader = Resources.loader
+        if loader is None:
+            atlas = TextureAtlas.build(renderer, ATLAS_SPRITES, ATLAS_CACHE_DIR)
+        else:
+            with loader.uploading(ATLAS_CACHE_DIR, "atlas"):
+                atlas = TextureAtlas.build(
+                    renderer, ATLAS_SPRITES, ATLAS_CACHE_DIR, loadImage=loader.takeSurface
+                )
+        if atlas is None:
+            print("Falling back to separate sprite textures")
+            if loader is not None:
+                loader.requestImages(ATLAS_SPRITES)
+            return
+        Resources.textures.register(atlas.texture, atlas.width, atlas.height)
+        Resources.atlas = atlas
 
     @staticmethod
     def load(state):
         """Load all game resources."""
-        # Initialize SDL2_mixer
-        if mixer.Mix_Init(mixer.MIX_INIT_MP3) < 0:
-            print(
-                "SDL_mixer could not initialize! Error:", mixer.Mix_GetError().decode()
-            )
+        # Initialize the audio backend
+        Resources.audio = NullAudio() if state.headless else MixerAudio()
+        if not Resources.audio.open():
             return False
 
-        if mixer.Mix_OpenAudio(44100, mixer.MIX_DEFAULT_FORMAT, 2, 2048) < 0:
-            print("SDL_mixer OpenAudio failed! Error:", mixer.Mix_GetError().decode())
-            return False
-        
+        # queue every file up front: workers decode while this thread uploads
+        Resources.loader = loader = AssetLoader(Resources.audio, ASSET_LOADER_THREADS)
+        if state.renderer is not None:
+            loader.requestImages(TextureAtlas.sourceImages(ATLAS_SPRITES, ATLAS_CACHE_DIR))
+            loader.requestImages(BACKGROUND_LAYERS)
+        loader.requestSounds(SOUND_FILES)
+
         # Prepare player animations list
         Resources.playerAnims = [None] * 5
         Resources.playerAnims[Resources.ANIM_PLAYER_IDLE] = Animation(8, 1.6)
@@ -168,44 +384,45 @@ class Resources:
         Resources.enemyAnims[Resources.ANIM_ENEMY] = Animation(8, 1.0)
         Resources.enemyAnims[Resources.ANIM_ENEMY_HIT] = Animation(8, 1.0)
         Resources.enemyAnims[Resources.ANIM_ENEMY_DIE] = Animation(18, 2.0)
-        Resources.texIdle = Resources.load_texture(state.renderer, "idle.png")
-        Resources.texRun = Resources.load_texture(state.renderer, "run.png")
-        Resources.texslide = Resources.load_texture(state.renderer, "slide.png")
-        Resources.texBrick = Resources.load_texture(state.renderer, "tiles/brick.png")
-        Resources.texGrass = Resources.load_texture(state.renderer, "tiles/grass.png")
-        Resources.texGround = Resources.load_texture(state.renderer, "tiles/ground.png")
-        Resources.texPanel = Resources.load_texture(state.renderer, "tiles/panel.png")
-        Resources.texBg1 = Resources.load_texture(
-            state.renderer, "Backgroung/bg_layer1.png"
-        )
-        Resources.texBg2 = Resources.load_texture(
-            state.renderer, "Backgroung/bg_layer2.png"
+        Resources.load_atlas(state.renderer)
+        Resources.texIdle = Resources.load_sprite(state.renderer, "idle.png")
+        Resources.texRun = Resources.load_sprite(state.renderer, "run.png")
+        Resources.texslide = Resources.load_sprite(state.renderer, "slide.png")
+        Resources.texBrick = Resources.load_sprite(state.renderer, "tiles/brick.png")
+        Resources.texGrass = Resources.load_sprite(state.renderer, "tiles/grass.png")
+        Resources.texGround = Resources.load_sprite(state.renderer, "tiles/ground.png")
+        Resources.texPanel = Resources.load_sprite(state.renderer, "tiles/panel.png")
+        Resources.texBg1, Resources.texBg2, Resources.texBg3, Resources.texBg4 = (
+            Resources.load_texture(state.renderer, path) for path in BACKGROUND_LAYERS
         )
-        Resources.texBg3 = Resources.load_texture(
-            state.renderer, "Backgroung/bg_layer3.png"
-        )
-        Resources.texBg4 = Resources.load_texture(
-            state.renderer, "Backgroung/bg_layer4.png"
-        )
-        Resources.texBullet = Resources.load_texture(state.renderer, "bullet.png")
-        Resources.texBulletHit = Resources.load_texture(
+        Resources.texBullet = Resources.load_sprite(state.renderer, "bullet.png")
+        Resources.texBulletHit = Resources.load_sprite(
             state.renderer, "bullet_hit.png"
         )
-        Resources.texShoot = Resources.load_texture(state.renderer, "shoot.png")
-        Resources.texRunShoot = Resources.load_texture(state.renderer, "shoot_run.png")
-        Resources.texSlideShoot = Resources.load_texture(
+        Resources.texShoot = Resources.load_sprite(state.renderer, "shoot.png")
+        Resources.texRunShoot = Resources.load_sprite(state.renderer, "shoot_run.png")
+        Resources.texSlideShoot = Resources.load_sprite(
             state.renderer, "slide_shoot.png"
         )
-        Resources.texEnemy = Resources.load_texture(state.renderer, "enemy.png")
-        Resources.texEnemyHit = Resources.load_texture(state.renderer, "enemy_hit.png")
-        Resources.texEnemyDie = Resources.load_texture(state.renderer, "enemy_die.png")
-        Resources.chunkShoot = Resources.load_sound("audio/pop1.wav")
-        Resources.chunkShootHit = Resources.load_sound("audio/audio_shoot_hit.wav")
-        Resources.chunkEnemyHit = Resources.load_sound("audio/audio_enemy_hit.wav")
-        Resources.chunkEnemyDie = Resources.load_sound("audio/audio_monster_die.wav")
-        Resources.chunkWallHit = Resources.load_sound("audio/audio_wall_hit.wav")
-        Resources.chunkBackground = Resources.load_music(
-            "audio/bgmusic/converted_theme2.mp3"
+        Resources.texEnemy = Resources.load_sprite(state.renderer, "enemy.png")
+        Resources.texEnemyHit = Resources.load_sprite(state.renderer, "enemy_hit.png")
+        Resources.texEnemyDie = Resources.load_sprite(state.renderer, "enemy_die.png")
+        (
+            Resources.chunkShoot,
+            Resources.chunkShootHit,
+            Resources.chunkEnemyHit,
+            Resources.chunkEnemyDie,
+            Resources.chunkWallHit,
+        ) = (Resources.load_sound(path) for path in SOUND_FILES)
+
+        loader.close()
+        Resources.loader = None
+        Resources.loadTimeline = loader.timeline()
+        Resources.loadSeconds = loader.elapsed
+        if PRINT_LOAD_TIMELINE:
+            print(formatTimeline(Resources.loadTimeline, Resources.loadSeconds))
+        Resources.music = MusicManager(
+            Resources.audio, MUSIC_TRACKS, MUSIC_MEMORY_CAP, MUSIC_FADE_MS, MIX_DEFAULT_VOLUME
         )
 
         return True
@@ -214,60 +431,69 @@ class Resources:
     def unload():
         """Unload all loaded resources."""
         # Destroy all loaded textures
-        for tex in Resources.textures:
-            sdl3.SDL_DestroyTexture(tex)
         Resources.textures.clear()
+        Resources.atlas = None
 
         # Unload sounds
-        if Resources.chunkShoot:
-            mixer.Mix_FreeChunk(Resources.chunkShoot)
-        if Resources.chunkShootHit:
-            mixer.Mix_FreeChunk(Resources.chunkShootHit)
-        if Resources.chunkEnemyHit:
-            mixer.Mix_FreeChunk(Resources.chunkEnemyHit)
-        if Resources.chunkEnemyDie:
-            mixer.Mix_FreeChunk(Resources.chunkEnemyDie)
-        if Resources.chunkWallHit:
-            mixer.Mix_FreeChunk(Resources.chunkWallHit)
-        if Resources.chunkBackground:
-            mixer.Mix_FreeMusic(Resources.chunkBackground)
+        audio = Resources.audio
+        audio.free_sound(Resources.chunkShoot)
+        audio.free_sound(Resources.chunkShootHit)
+        audio.free_sound(Resources.chunkEnemyHit)
+        audio.free_sound(Resources.chunkEnemyDie)
+        audio.free_sound(Resources.chunkWallHit)
+        Resources.music.close()
 
         # Close audio
-        mixer.Mix_CloseAudio()
+        audio.close()
 
 
 class SDLstate:
     """Keeps track of SDL window and renderer state."""
 
-    def __init__(self):
+    def __init__(self, headless=False):
         self.window = None
         self.renderer = None
         self.width = None
         self.height = None
         self.logicalw = None
         self.logicalh = None
-        # Get keyboard state
-        self.keys = sdl3.SDL_GetKeyboardState(None)
+        # headless runs have no window, renderer or audio device
+        self.headless = headless
+        # Get keyboard state; headless runs get a plain array scripts can write to
+        if headless:
+            self.keys = [False] * sdl3.SDL_SCANCODE_COUNT
+        else:
+            self.keys = sdl3.SDL_GetKeyboardState(None)
         self.fullscreen = False
 
 
 # helper functions
 def play_sound(chunk, volume=128):
     """Play a sound effect with specified volume (0-128)."""
-    if chunk:
-        mixer.Mix_VolumeChunk(chunk, volume)
-        mixer.Mix_PlayChannel(-1, chunk, 0)
+    Resources.audio.play_sound(chunk, volume)
+
+
+def queueSound(gs: Gamestate, chunk, priority: int, obj: GameObject = None, volume=128):
+    """Queues a sound effect for the end of the frame, fading it out if obj is off screen."""
+    if obj is None:
+        gs.sounds.post(chunk, volume, priority)
+    else:
+        gs.sounds.post(chunk, volume, priority, obj.position.x, obj.position.y, gs.mapViewport)
+
+
+def playQueuedSounds(gs: Gamestate, elapsed: float):
+    """Plays the sounds queued since the last call; once per frame."""
+    gs.sounds.flush(Resources.audio, elapsed)
 
 
 def play_music(music, loops=-1):
     """Play background music (loops=-1 for infinite looping)."""
-    if music:
-        mixer.Mix_PlayMusic(music, loops)
+    Resources.audio.play_music(music, loops)
 
 
 def set_music_volume(volume):
     """Set music volume (0-128)."""
-    mixer.Mix_VolumeMusic(volume)
+    Resources.audio.set_music_volume(volume)
 
 
 def initialize(state):
@@ -304,8 +530,14 @@ def cleanup(state):
     if state.window:
         sdl3.SDL_DestroyWindow(state.window)
     sdl3.SDL_Quit()
-def window_creation():
-    """Main SDL loop that creates a window and runs the game."""
+def window_creation(recordPath=None):
+    """Main SDL loop that creates a window and runs the game.
+
+    With recordPath, the session's inputs are recorded there for replay.
+    """
+    if not load_native_libraries():
+        return False
+
     state = SDLstate()
     state.width = 1600
     state.height = 900
@@ -327,46 +559,17 @@ def window_creation():
 
     # Setup game state
     gs = Gamestate(state)
-    print(f"Failed to load music: {Resources.chunkBackground} – {mixer.Mix_GetError().decode()}")
-
-    gs = Gamestate(state)
-    def debug_load_music(filepath, fallback=None):
-        music = Resources.load_music(filepath)
-        if music:
-            print("Music loaded successfully")
-            music_type = mixer.Mix_GetMusicType(music)
-            music_types = {
-                mixer.MUS_NONE: "NONE",
-                mixer.MUS_CMD: "CMD",
-                mixer.MUS_WAV: "WAV",
-                mixer.MUS_MOD: "MOD",
-                mixer.MUS_MID: "MID",
-                mixer.MUS_OGG: "OGG",
-                mixer.MUS_MP3: "MP3",
-                mixer.MUS_FLAC: "FLAC",
-                mixer.MUS_OPUS: "OPUS"
-            }
-            print(f"Music type: {music_types.get(music_type, 'UNKNOWN')}")
-            return music
-        else:
-            print(f"Failed to load music file: {filepath}")
-            if fallback:
-                print(f"Trying fallback: {fallback}")
-                return debug_load_music(fallback)
-            else:
-                print("No fallback music available")
-                return None
 
-    Resources.chunkBackground = debug_load_music("audio/bgmusic/converted_theme2.mp3", fallback="audio/bgmusic/fallback.mp3")
-
-    # Generate initial chunks
-    generateLevelChunk(gs, state, Resources, 0, spawn_player=True)
-
-    assert gs.player is not None, "Player failed to spawn in initial chunk!"
-
-    generateLevelChunk(gs, state, Resources, gs.last_chunk_end)
-    generateLevelChunk(gs, state, Resources, gs.last_chunk_end)
+    # Generate initial chunks, then let a worker prepare the ones after them
+    startWorld(state, gs, Resources)
+    gs.prefetch = startPrefetch(gs)
 
+    timestep = FixedTimestep(TICK_RATE, MAX_CATCHUP_STEPS)
+    if recordPath:
+        if FIXED_TIMESTEP:
+            startRecording(gs, recordPath, timestep.dt)
+        else:
+            print("Recording needs FIXED_TIMESTEP, not recording")
     previousTime = sdl3.SDL_GetTicks()
     running = True
     event = sdl3.SDL_Event()
@@ -376,12 +579,12 @@ def window_creation():
 
     # swap buffers and present
     sdl3.SDL_RenderPresent(state.renderer)
-    set_music_volume(64)
-    play_music(Resources.chunkBackground, -1)
+    Resources.music.play(0)
 
     while running:
         nowTime = sdl3.SDL_GetTicks()
         deltaTime = (nowTime - previousTime) / 1000.0
+        gs.profiler.beginFrame()
 
         # Handle Events
         while sdl3.SDL_PollEvent(event):
@@ -392,9 +595,15 @@ def window_creation():
                 state.width = event.window.data1
                 state.height = event.window.data2
 
+            elif event.type == sdl3.SDL_EVENT_RENDER_TARGETS_RESET:
+                # render target contents are lost, bake the chunks again
+                releaseAllChunkLayers(gs)
+
             elif event.type in (sdl3.SDL_EVENT_KEY_DOWN, sdl3.SDL_EVENT_KEY_UP):
                 key_down = event.type == sdl3.SDL_EVENT_KEY_DOWN
                 scancode = event.key.scancode
+                if key_down and gs.recorder is not None:
+                    gs.recorder.keyDown(scancode)
 
                 # Special keys
                 if not key_down and scancode == sdl3.SDL_SCANCODE_F12:
@@ -404,110 +613,310 @@ def window_creation():
                 elif not key_down and scancode == sdl3.SDL_SCANCODE_F11:
                     state.fullscreen = not state.fullscreen
                     sdl3.SDL_SetWindowFullscreen(state.window, state.fullscreen)
+                elif not key_down and scancode == sdl3.SDL_SCANCODE_F9:
+                    dumpProfile(gs)
+                elif not key_down and scancode == sdl3.SDL_SCANCODE_M:
+                    Resources.music.next()
 
                 # Player controls
                 if gs.player:
                     handleKeyInputs(state, gs, gs.player, scancode, key_down)
+        gs.profiler.lap("events")
+
+        if FIXED_TIMESTEP:
+            for _ in range(timestep.advance(deltaTime)):
+                snapshotPositions(gs)
+                if gs.recorder is not None:
+                    gs.recorder.beginTick(state.keys)
+                simulateFrame(state, gs, Resources, timestep.dt)
+                if gs.recorder is not None:
+                    gs.recorder.endTick(gs)
+            alpha = timestep.alpha
+        else:
+            simulateFrame(state, gs, Resources, deltaTime)
+            alpha = 1.0
+        playQueuedSounds(gs, deltaTime)
+        Resources.music.update()
+        drawFrame(state, gs, Resources, deltaTime, alpha)
+        sdl3.SDL_RenderPresent(state.renderer)
+        gs.profiler.lap("present")
+        gs.profiler.endFrame()
+        previousTime = nowTime
 
-        # Generate new level chunks as player moves forward
-        if gs.player and gs.player.position.x > gs.last_chunk_end - (state.logicalw * 1.5):
-            generateLevelChunk(gs, state, Resources, gs.last_chunk_end)
+    #Cleanup
+    gs.prefetch.close()
+    gs.chunkStore.close()
+    if gs.recorder is not None:
+        gs.recorder.close()
+    Resources.unload()
+    cleanup(state)
+    return True
 
-        #Update game objects
-        for layer in gs.layers:
-            for obj in layer:
-                update(state, gs, Resources, obj, deltaTime)
+def startPrefetch(gs: Gamestate) -> ChunkPrefetcher:
+    """Starts a worker generating the chunks after the ones already in the world."""
+    return ChunkPrefetcher(
+        gs.seed,
+        gs.levelGen.rows,
+        gs.levelGen.cols,
+        gs.tiles.chunkIndexAt(gs.last_chunk_end),
+        PREFETCH_DEPTH,
+    )
 
-        for bullet in gs.bullets[:]:  
-            update(state, gs, Resources, bullet, deltaTime)
-            if bullet.currentAnimation != -1:
-                bullet.animations[bullet.currentAnimation].step(deltaTime)
 
-            if bullet.position.x < -1000 or bullet.position.x > 10000:
-                gs.bullets.remove(bullet)
+def startRecording(gs: Gamestate, path: str, dt: float, immortal: bool = False):
+    """Seeds SDL_rand and starts recording the session's inputs to path."""
+    # SDL_srand(0) would pick a time based seed, so never pass the seed as-is
+    randSeed = gs.seed + 1
+    sdl3.SDL_srand(randSeed)
+    gs.recorder = InputRecorder(path, dt, gs, randSeed, immortal)
 
-        # Viewport scrolling
-        if gs.player:
-            gs.mapViewport.x = (
-                gs.player.position.x + Resources.TILE_SIZE / 2
-            ) - gs.mapViewport.w / 2
 
-        # Clean up far-off objects 
-        if gs.player:
-            cleanupDistantObjects(gs, gs.player.position.x - state.logicalw * 2)
+def startWorld(state: SDLstate, gs: Gamestate, res: Resources):
+    """Generates the first chunks and spawns the player."""
+    # animations are shared by every object using them: start them over so a
+    # world doesn't depend on what ran before it (replays need that)
+    for anim in chain(res.playerAnims, res.bulletAnims, res.enemyAnims):
+        anim.reset()
+    generateLevelChunk(gs, state, res, 0, spawn_player=True)
 
-        # Draw Pass
-        sdl3.SDL_SetRenderDrawColor(state.renderer, 20, 10, 20, 255)
-        sdl3.SDL_RenderClear(state.renderer)
+    assert gs.player is not None, "Player failed to spawn in initial chunk!"
 
-        sdl3.SDL_RenderTexture(state.renderer, Resources.texBg1, None, None)
+    generateLevelChunk(gs, state, res, gs.last_chunk_end)
+    generateLevelChunk(gs, state, res, gs.last_chunk_end)
 
-        if gs.player:
-            speed_x = gs.player.velocity.x
-        else:
-            speed_x = 0
-
-        gs.bg4Scroll = drawParalaxBackground(state.renderer, Resources.texBg4, speed_x, gs.bg4Scroll, 0.075, deltaTime)
-        gs.bg3Scroll = drawParalaxBackground(state.renderer, Resources.texBg3, speed_x, gs.bg3Scroll, 0.150, deltaTime)
-        gs.bg2Scroll = drawParalaxBackground(state.renderer, Resources.texBg2, speed_x, gs.bg2Scroll, 0.300, deltaTime)
-
-        for obj in gs.backgroundTiles:
-            dst = SDL_FRect(
-                x=obj.position.x - gs.mapViewport.x,
-                y=obj.position.y,
-                w=float(get_texture_size(obj.texture)[0]),
-                h=float(get_texture_size(obj.texture)[1]),
-            )
-            sdl3.SDL_RenderTexture(state.renderer, obj.texture, None, dst)
-
-        for layer in gs.layers:
-            for obj in layer:
-                drawObject(state, gs, obj, Resources.TILE_SIZE, Resources.TILE_SIZE, deltaTime)
-
-        for bullet in gs.bullets:
-            if not bullet.data.bullet.inactive:
-                drawObject(state, gs, bullet, bullet.collider.w, bullet.collider.h, deltaTime)
-
-        for obj in gs.foregroundTiles:
-            dst = SDL_FRect(
-                x=obj.position.x - gs.mapViewport.x,
-                y=obj.position.y,
-                w=float(get_texture_size(obj.texture)[0]),
-                h=float(get_texture_size(obj.texture)[1]),
-            )
-            sdl3.SDL_RenderTexture(state.renderer, obj.texture, None, dst)
-
-        # Debug Info
-        if gs.debugMode and gs.player:
-            sdl3.SDL_SetRenderDrawColor(state.renderer, 255, 255, 255, 255)
-
-            player_state = gs.player.data.player
-            if player_state.idle:
-                state_str = "idle"
-            elif player_state.running:
-                state_str = "running"
-            elif player_state.jumping:
-                state_str = "jumping"
-            elif player_state.sliding:
-                state_str = "sliding"
-            else:
-                state_str = "unknown"
 
-            text = f"S:{state_str}, B:{len(gs.bullets)}, G:{getattr(gs.player, 'grounded', False)}"
-            sdl3.SDL_RenderDebugTextFormat(state.renderer, 5, 5, text.encode("utf-8"))
+def simulateFrame(state: SDLstate, gs: Gamestate, res: Resources, deltaTime: float):
+    """Advances the world by one frame; shared by the windowed and headless loops."""
+    prof = gs.profiler
 
-        #Removing dead enemies
-        for layer in gs.layers:
-            layer[:] = [obj for obj in layer if not (obj.type.enemy and obj.data.enemy.hitPoints <= 0)]
+    #Removing what was destroyed last tick. With the fixed timestep a frame
+    #may run several ticks, so it may not have been drawn since; flushing per
+    #tick rather than per rendered frame keeps replays independent of frame rate
+    flushDestroyed(gs)
+    prof.lap("cleanup")
 
-     
-        sdl3.SDL_RenderPresent(state.renderer)
-        previousTime = nowTime
+    # Generate new level chunks as player moves forward
+    if gs.player and gs.player.position.x > gs.last_chunk_end - (state.logicalw * 1.5):
+        generateLevelChunk(gs, state, res, gs.last_chunk_end)
+    # Bring back stored chunks as the player walks back towards them
+    if gs.player:
+        restoreChunks(
+            gs,
+            state,
+            res,
+            gs.player.position.x - state.logicalw * 1.5,
+            gs.player.position.x + state.logicalw * 1.5,
+        )
+    prof.lap("chunks")
 
-    #Cleanup
-    Resources.unload()
-    cleanup(state)
-    return True
+    #Update game objects (static level tiles have nothing to update)
+    gs.spatial.resetCounters()
+    updateObjects(state, gs, res, deltaTime)
+
+    for bullet in gs.bullets.active:
+        if bullet.currentAnimation != -1:
+            bullet.animations[bullet.currentAnimation].step(deltaTime)
+
+        # Deactivated bullets go back to the pool with the next flush
+        if bullet.data.bullet.inactive:
+            destroyEntity(gs, bullet)
+    prof.lap("bullets")
+
+    # Viewport scrolling
+    if gs.player:
+        gs.mapViewport.x = (
+            gs.player.position.x + res.TILE_SIZE / 2
+        ) - gs.mapViewport.w / 2
+
+    # Clean up far-off objects 
+    if gs.player:
+        cleanupDistantObjects(
+            gs,
+            gs.player.position.x - state.logicalw * 2,
+            gs.player.position.x + state.logicalw * 3,
+        )
+    prof.lap("cleanup")
+
+
+def snapshotPositions(gs: Gamestate):
+    """Saves positions of moving objects before a tick so drawing can interpolate."""
+    if gs.entities is not None:
+        gs.entities.snapshot()
+        return
+    for obj in gs.characters:
+        obj.savePosition()
+    for bullet in gs.bullets:
+        bullet.savePosition()
+
+
+def drawFrame(
+    state: SDLstate, gs: Gamestate, res: Resources, deltaTime: float, alpha: float = 1.0
+):
+    """Draws the world alpha of the way from the previous tick to the current one.
+
+    The caller presents the frame.
+    """
+    prof = gs.profiler
+
+    # Interpolating the camera along with the player it follows
+    viewportX = gs.mapViewport.x
+    if gs.player and alpha < 1.0:
+        gs.mapViewport.x = (
+            gs.player.lerpPosition(alpha).x + res.TILE_SIZE / 2
+        ) - gs.mapViewport.w / 2
+
+    sdl3.SDL_SetRenderDrawColor(state.renderer, 20, 10, 20, 255)
+    sdl3.SDL_RenderClear(state.renderer)
+
+    batch = gs.batch
+    batch.begin(state.renderer)
+    if gs.bakeChunks:
+        bakeChunkLayers(state, gs)
+    batch.draw(res.texBg1, 0, 0, state.logicalw, state.logicalh)
+
+    if gs.player:
+        speed_x = gs.player.velocity.x
+    else:
+        speed_x = 0
+
+    gs.bg4Scroll = drawParalaxBackground(batch, res.texBg4, speed_x, gs.bg4Scroll, 0.075, deltaTime)
+    gs.bg3Scroll = drawParalaxBackground(batch, res.texBg3, speed_x, gs.bg3Scroll, 0.150, deltaTime)
+    gs.bg2Scroll = drawParalaxBackground(batch, res.texBg2, speed_x, gs.bg2Scroll, 0.300, deltaTime)
+
+    prof.lap("background")
+
+    # Only what overlaps the viewport is submitted
+    left = gs.mapViewport.x
+    right = left + gs.mapViewport.w
+    gs.visibleCount = 0
+    gs.totalCount = len(gs.characters) + gs.bullets.activeCount
+
+    if gs.bakeChunks:
+        drawChunkLayers(gs, "backLayer")
+        if gs.debugMode:
+            for obj in gs.levelIndex.query(left, right):
+                queueDebugCollider(gs, obj, obj.position)
+    else:
+        gs.totalCount += len(gs.backgroundIndex) + len(gs.levelIndex) + len(gs.foregroundIndex)
+        for obj in gs.backgroundIndex.query(left, right):
+            tex = obj.texture
+            batch.draw(tex, obj.position.x - left, obj.position.y, tex.w, tex.h)
+            gs.visibleCount += 1
+        for obj in gs.levelIndex.query(left, right):
+            drawObject(state, gs, obj, res.TILE_SIZE, res.TILE_SIZE, deltaTime, alpha)
+            gs.visibleCount += 1
+    prof.lap("tiles")
+
+    # characters sit in the spatial hash; its query keeps their spawn order for layering
+    for obj in gs.spatial.queryOrdered(left, 0, gs.mapViewport.w, gs.mapViewport.h):
+        drawObject(state, gs, obj, res.TILE_SIZE, res.TILE_SIZE, deltaTime, alpha)
+        gs.visibleCount += 1
+
+    for bullet in gs.bullets:
+        x = bullet.position.x
+        if not bullet.data.bullet.inactive and left - bullet.collider.w < x < right:
+            drawObject(state, gs, bullet, bullet.collider.w, bullet.collider.h, deltaTime, alpha)
+            gs.visibleCount += 1
+    prof.lap("draw")
+
+    if gs.bakeChunks:
+        drawChunkLayers(gs, "frontLayer")
+    else:
+        for obj in gs.foregroundIndex.query(left, right):
+            tex = obj.texture
+            batch.draw(tex, obj.position.x - left, obj.position.y, tex.w, tex.h)
+            gs.visibleCount += 1
+    batch.end()
+    prof.lap("tiles")
+
+    drawOverlays(state, gs)
+
+    # Debug Info
+    if gs.debugMode and gs.player:
+        sdl3.SDL_SetRenderDrawColor(state.renderer, 255, 255, 255, 255)
+
+        player_state = gs.player.data.player
+        if player_state.idle:
+            state_str = "idle"
+        elif player_state.running:
+            state_str = "running"
+        elif player_state.jumping:
+            state_str = "jumping"
+        elif player_state.sliding:
+            state_str = "sliding"
+        else:
+            state_str = "unknown"
+
+        text = f"S:{state_str}, B:{len(gs.bullets)}, G:{getattr(gs.player, 'grounded', False)}"
+        sdl3.SDL_RenderDebugTextFormat(state.renderer, 5, 5, text.encode("utf-8"))
+        text = f"Pairs:{gs.spatial.candidatePairs} Hits:{gs.spatial.overlaps} Seed:{gs.seed}"
+        sdl3.SDL_RenderDebugTextFormat(state.renderer, 5, 15, text.encode("utf-8"))
+        text = f"Draws:{batch.sprites} Batched:{batch.drawCalls}"
+        sdl3.SDL_RenderDebugTextFormat(state.renderer, 5, 25, text.encode("utf-8"))
+        text = f"Visible:{gs.visibleCount}/{gs.totalCount}"
+        sdl3.SDL_RenderDebugTextFormat(state.renderer, 5, 35, text.encode("utf-8"))
+        text = f"Tex:{len(res.textures)} {res.textures.memoryBytes / (1024 * 1024):.1f}MB"
+        sdl3.SDL_RenderDebugTextFormat(state.renderer, 5, 45, text.encode("utf-8"))
+        if gs.prefetch is not None:
+            text = f"Prefetch:{gs.prefetch.readyDepth}/{gs.prefetch.depth}"
+            sdl3.SDL_RenderDebugTextFormat(state.renderer, 5, 55, text.encode("utf-8"))
+        sounds = gs.sounds
+        text = f"Voices:{len(sounds.voices)}/{sounds.maxVoices} Merged:{sounds.merged} Culled:{sounds.culled}"
+        sdl3.SDL_RenderDebugTextFormat(state.renderer, 5, 65, text.encode("utf-8"))
+        tiers = gs.activity.counts
+        text = f"Active:{tiers[0]} Reduced:{tiers[1]} Sleeping:{tiers[2]}"
+        sdl3.SDL_RenderDebugTextFormat(state.renderer, 5, 75, text.encode("utf-8"))
+        drawProfilerOverlay(state, gs)
+    prof.lap("overlay")
+
+    gs.mapViewport.x = viewportX
+
+
+def drawProfilerOverlay(state: SDLstate, gs: Gamestate):
+    """Draws per-phase average and worst-frame times plus a frame-time graph."""
+    prof = gs.profiler
+    if not len(prof):
+        return
+    averages = prof.averages() * 1000.0
+    worst = prof.worstFrame() * 1000.0
+
+    x = state.logicalw - 165
+    y = 5
+    sdl3.SDL_SetRenderDrawColor(state.renderer, 255, 255, 255, 255)
+    sdl3.SDL_RenderDebugText(state.renderer, x, y, b"phase        avg  worst")
+    for i, phase in enumerate(PHASES):
+        y += 10
+        text = f"{phase:<10}{averages[i]:6.2f}{worst[i]:7.2f}"
+        sdl3.SDL_RenderDebugText(state.renderer, x, y, text.encode("utf-8"))
+    y += 10
+    text = f"{'frame':<10}{averages.sum():6.2f}{worst.sum():7.2f}"
+    sdl3.SDL_RenderDebugText(state.renderer, x, y, text.encode("utf-8"))
+
+    # Frame-time graph: one bar per frame, full height is two 60 Hz frames
+    graph_w, graph_h = 160, 40
+    graph_x, graph_y = x, y + 14
+    times = prof.frameTimes()[-graph_w:] * 1000.0
+    heights = np.minimum(times / 33.3, 1.0) * graph_h
+    bars = (SDL_FRect * len(heights))(
+        *(
+            SDL_FRect(graph_x + i, graph_y + graph_h - h, 1, h)
+            for i, h in enumerate(heights)
+        )
+    )
+    sdl3.SDL_SetRenderDrawColor(state.renderer, 0, 200, 255, 255)
+    sdl3.SDL_RenderFillRects(state.renderer, bars, len(heights))
+    # 16.7 ms budget line
+    sdl3.SDL_SetRenderDrawColor(state.renderer, 255, 80, 80, 255)
+    sdl3.SDL_RenderLine(
+        state.renderer, graph_x, graph_y + graph_h / 2, graph_x + graph_w, graph_y + graph_h / 2
+    )
+
+
+def dumpProfile(gs: Gamestate):
+    """Writes the profiler's ring buffer to a timestamped CSV in the working directory."""
+    filepath = f"profile_{time.strftime('%Y%m%d_%H%M%S')}.csv"
+    frames = gs.profiler.dumpCSV(filepath)
+    print(f"Wrote {frames} frames to {filepath}")
 
 # Draw Object Function
 def drawObject(
@@ -517,51 +926,261 @@ def drawObject(
     width: float,
     height: float,
     deltaTime: float,
+    alpha: float = 1.0,
 ):
+    # position between the last two simulation ticks
+    pos = obj.lerpPosition(alpha)
+
     # calculating source rectangle based on animation
     srcX = (
         obj.animations[obj.currentAnimation].currentFrame() * width
         if obj.currentAnimation != -1
         else (obj.spriteframe - 1) * width
     )
-    scr = SDL_FRect(srcX, 0, width, height)
-    dst = SDL_FRect(obj.position.x - gs.mapViewport.x, obj.position.y, width, height)
-
-    # determining flip mode
-    flipmode = sdl3.SDL_FLIP_HORIZONTAL if obj.direction == -1 else sdl3.SDL_FLIP_NONE
+    flip = obj.direction == -1
     if not obj.shouldFlash:
-        sdl3.SDL_RenderTextureRotated(
-            state.renderer, obj.texture, scr, dst, 0, None, flipmode
+        gs.batch.draw(
+            obj.texture, pos.x - gs.mapViewport.x, pos.y, width, height, (srcX, 0, width, height), flip
         )
     else:
         # flashing obj with bules tint
-        sdl3.SDL_SetTextureColorModFloat(obj.texture, 1.0, 1.0, 2.55)
-        sdl3.SDL_RenderTextureRotated(
-            state.renderer, obj.texture, scr, dst, 0, None, flipmode
+        gs.batch.draw(
+            obj.texture, pos.x - gs.mapViewport.x, pos.y, width, height, (srcX, 0, width, height), flip, FLASH_TINT
         )
-        sdl3.SDL_SetTextureColorModFloat(obj.texture, 1, 1.0, 1.0)
         if obj.flashTimer.step(deltaTime):
             obj.shouldFlash = False
 
-    #  health bar for enemies and player
+    #  health bar for enemies and player, drawn after the sprites
     if obj.type.enemy or obj.type.player:
-        drawHealthBar(state, gs, obj, obj.type.player)
+        gs.healthBars.append((obj, obj.type.player, pos))
 
     if gs.debugMode:
-        rectA = SDL_FRect(
-            x=obj.position.x + obj.collider.x - gs.mapViewport.x,
-            y=obj.position.y + obj.collider.y,
-            w=obj.collider.w,
-            h=obj.collider.h,
+        queueDebugCollider(gs, obj, pos)
+
+
+def queueDebugCollider(gs: Gamestate, obj: GameObject, pos):
+    gs.debugColliders.append(SDL_FRect(
+        x=pos.x + obj.collider.x - gs.mapViewport.x,
+        y=pos.y + obj.collider.y,
+        w=obj.collider.w,
+        h=obj.collider.h,
+    ))
+
+
+def bakeChunkLayers(state: SDLstate, gs: Gamestate):
+    """Bakes the static tiles of chunks that have no layer textures yet.
+
+    Bricks and level tiles go into the back layer, grass into the front
+    layer, so each can be drawn as one quad on its side of the characters.
+    """
+    for chunk in gs.tiles.chunks.values():
+        if chunk.backLayer is not None:
+            continue
+        chunk.backLayer = bakeTiles(
+            state, gs, chunk, chain(chunk.background, chunk.objects.values()), "back"
         )
+        chunk.frontLayer = bakeTiles(state, gs, chunk, chunk.foreground, "front")
+        if chunk.backLayer is None or chunk.frontLayer is None:
+            # no render-target support: go back to drawing tile by tile
+            releaseAllChunkLayers(gs)
+            gs.bakeChunks = False
+            return
+
+
+def bakeTiles(state: SDLstate, gs: Gamestate, chunk, objects, name: str):
+    """Renders objects into a transparent texture covering the chunk's tile rows."""
+    tiles = gs.tiles
+    w, h = tiles.chunkWidth, tiles.rows * tiles.tileSize
+    tex = sdl3.SDL_CreateTexture(
+        state.renderer, sdl3.SDL_PIXELFORMAT_RGBA8888, sdl3.SDL_TEXTUREACCESS_TARGET, w, h
+    )
+    if not tex:
+        print("Failed to create chunk layer texture:", sdl3.SDL_GetError().decode())
+        return None
+    sdl3.SDL_SetTextureBlendMode(tex, sdl3.SDL_BLENDMODE_BLEND)
+    Resources.textures.register(tex, w, h)
+
+    batch = gs.batch
+    batch.flush()
+    target = sdl3.SDL_GetRenderTarget(state.renderer)
+    sdl3.SDL_SetRenderTarget(state.renderer, tex)
+    sdl3.SDL_SetRenderDrawColor(state.renderer, 0, 0, 0, 0)
+    sdl3.SDL_RenderClear(state.renderer)
+    for obj in objects:
+        region = obj.texture
+        batch.draw(
+            region, obj.position.x - chunk.startX, obj.position.y - tiles.originY, region.w, region.h
+        )
+    batch.flush()
+    sdl3.SDL_SetRenderTarget(state.renderer, target)
+    return AtlasRegion.whole(tex, f"chunk{chunk.index}/{name}", w, h)
+
+
+def drawChunkLayers(gs: Gamestate, layer: str):
+    """Draws one baked layer of every chunk overlapping the viewport."""
+    left = gs.mapViewport.x
+    right = left + gs.mapViewport.w
+    for chunk in gs.tiles.chunks.values():
+        region = getattr(chunk, layer)
+        if region is None or chunk.endX < left or chunk.startX > right:
+            continue
+        gs.batch.draw(region, chunk.startX - left, gs.tiles.originY, region.w, region.h)
+
+
+def releaseChunkLayers(chunk):
+    """Destroys a chunk's baked textures; it is rebaked the next time it is drawn."""
+    for layer in (chunk.backLayer, chunk.frontLayer):
+        if layer is not None:
+            Resources.textures.release(Resources.textures.info(layer.texture))
+    chunk.backLayer = None
+    chunk.frontLayer = None
+
+
+def releaseAllChunkLayers(gs: Gamestate):
+    for chunk in gs.tiles.chunks.values():
+        releaseChunkLayers(chunk)
+
+
+def drawOverlays(state: SDLstate, gs: Gamestate):
+    """Draws the health bars and debug colliders queued by drawObject."""
+    for obj, is_player, pos in gs.healthBars:
+        drawHealthBar(state, gs, obj, is_player, pos)
+    gs.healthBars.clear()
+
+    if gs.debugColliders:
+        rects = (SDL_FRect * len(gs.debugColliders))(*gs.debugColliders)
         sdl3.SDL_SetRenderDrawBlendMode(state.renderer, sdl3.SDL_BLENDMODE_BLEND)
         sdl3.SDL_SetRenderDrawColor(state.renderer, 255, 0, 0, 100)
-        sdl3.SDL_RenderFillRect(state.renderer, rectA)
+        sdl3.SDL_RenderFillRects(state.renderer, rects, len(gs.debugColliders))
         sdl3.SDL_SetRenderDrawBlendMode(state.renderer, sdl3.SDL_BLENDMODE_NONE)
+        gs.debugColliders.clear()
+
+def updateObjects(state: SDLstate, gs: Gamestate, res: Resources, deltaTime: float):
+    """Updates characters, then live bullets, integrating store-backed ones in vectorized passes.
+
+    Only objects the activity scheduler picks are updated, each with its own
+    time step. Shambling enemies are steered all at once first, from where
+    everything stood at the start of the tick, player included. The two
+    passes are profiled as the "entities" and "bullets" phases.
+    """
+    objects, steps = scheduleObjects(gs, deltaTime)
+    steerEnemies(gs, objects)
+    characters = [(obj, step) for obj, step in zip(objects, steps) if not obj.type.bullet]
+    bullets = [(obj, step) for obj, step in zip(objects, steps) if obj.type.bullet]
+    store = gs.entities
+    bulletRows = None
+    if store is not None:
+        # every active row is integrated once per tick: due bullets in their
+        # own pass, all other rows (those not due with a step of 0) with the
+        # characters, which never collide with bullets
+        store.stepDt[:] = 0.0
+        bulletRows = np.zeros(store.size, dtype=bool)
+        bulletRows[[obj._row for obj, _ in bullets]] = True
+    updatePass(state, gs, res, characters, None if bulletRows is None else ~bulletRows)
+    gs.profiler.lap("entities")
+    updatePass(state, gs, res, bullets, bulletRows)
+
+
+def updatePass(state: SDLstate, gs: Gamestate, res: Resources, scheduled: list, rows=None):
+    """Behaviour, movement and collisions for (object, time step) pairs.
+
+    rows is the mask of store rows integrated along with them.
+    """
+    if gs.entities is None:
+        for obj, step in scheduled:
+            update(state, gs, res, obj, step)
+        return
+
+    store = gs.entities
+    stepDt = store.stepDt
+    alive = []
+    for obj, step in scheduled:
+        if obj.stored:
+            stepDt[obj._row] = step
+        if updateBehaviour(state, gs, res, obj, step):
+            alive.append((obj, step))
+    store.integrate(stepDt, rows)
+    for obj, step in alive:
+        resolveCollisions(state, gs, res, obj, step)
+
+
+def scheduleObjects(gs: Gamestate, deltaTime: float):
+    """Characters, then live bullets, that are due an update this frame, with their time steps."""
+    store = gs.entities
+    if store is None:
+        return gs.activity.schedule(list(gs.characters) + gs.bullets.active, gs.mapViewport, deltaTime)
+
+    # characters are the store's active rows that aren't bullets; ordering them
+    # by serial lists them in spawn order like gs.characters, without
+    # touching the ones that sleep
+    characters = store.active[: store.size].copy()
+    characters[gs.bulletRows] = False
+    characters = np.flatnonzero(characters)
+    characters = characters[np.argsort(store.serial[characters], kind="stable")]
+    bullets = np.array([bullet._row for bullet in gs.bullets.active], dtype=np.intp)
+    rows, steps = gs.activity.scheduleRows(np.concatenate((characters, bullets)), gs.mapViewport, deltaTime)
+    owners = store.owners
+    return [owners[row] for row in rows.tolist()], steps.tolist()
+
+
+def steerEnemies(gs: Gamestate, objects: list):
+    """Runs the shambling AI of every shambling enemy in objects as one NumPy pass.
+
+    This runs before any object is updated, so enemies react to where the
+    player was at the start of the tick. Steered one by one during the
+    update, enemies after the player saw it where it had just moved to.
+    """
+    if gs.player is None:
+        return
+    enemies = [obj for obj in objects if obj.type.enemy and obj.data.enemy.state == "shambling"]
+    if not enemies:
+        return
+    player = gs.player.position
+    store = gs.entities
+    # objects outside the store have row -1
+    rows = np.array([obj._row for obj in enemies], dtype=np.intp)
+    if store is not None and rows.min() >= 0:
+        direction, vx = steerShamblers(
+            store.position[rows],
+            store.collider[rows],
+            store.direction[rows],
+            (player.x, player.y),
+            gs.tiles,
+            ENEMY_AGGRO_MIN,
+            ENEMY_AGGRO_MAX,
+            ENEMY_WALK_SPEED,
+        )
+        store.direction[rows] = direction
+        store.velocity[rows, 0] = vx
+        return
+
+    direction, vx = steerShamblers(
+        np.array([(obj.position.x, obj.position.y) for obj in enemies]),
+        np.array([(obj.collider.x, obj.collider.y, obj.collider.w, obj.collider.h) for obj in enemies]),
+        np.array([obj.direction for obj in enemies], dtype=float),
+        (player.x, player.y),
+        gs.tiles,
+        ENEMY_AGGRO_MIN,
+        ENEMY_AGGRO_MAX,
+        ENEMY_WALK_SPEED,
+    )
+    for obj, d, v in zip(enemies, direction.tolist(), vx.tolist()):
+        obj.direction = int(d)
+        obj.velocity.x = v
+
 
 def update(
     state: SDLstate, gs: Gamestate, res: Resources, obj: GameObject, deltaTime: float
 ):
+    """Fully updates a single object: behaviour, movement and collisions."""
+    if updateBehaviour(state, gs, res, obj, deltaTime):
+        resolveCollisions(state, gs, res, obj, deltaTime)
+
+
+def updateBehaviour(
+    state: SDLstate, gs: Gamestate, res: Resources, obj: GameObject, deltaTime: float
+) -> bool:
+    """Input, AI and animation for one object. Returns False if the object stopped updating."""
     # Handling player damage cooldown
     if obj.type.player and obj.data.player.damage_cooldown > 0:
         obj.data.player.damage_cooldown -= 1
@@ -571,36 +1190,30 @@ def update(
         # Seting player state to dead and stop movement
         obj.data.player.state = "dead"
         obj.velocity = glm.vec2(0, 0)
+        obj.dynamic = False
         gs.playerDead = True
         sdl3.SDL_Quit()
-        return 
+        return False
 
     def handleshooting(tex_normal, tex_shoot, anim_normal, anim_shoot):
         if state.keys[sdl3.SDL_SCANCODE_J] and obj.data.player.weaponTimer.is_timeout():  
             obj.texture = tex_shoot
             obj.currentAnimation = anim_shoot
 
-            # Counting active bullets
-            active_bullets = sum(not b.data.bullet.inactive for b in gs.bullets)
-            if active_bullets < 6:
+            # Taking a recycled bullet from the pool
+            bullet = None
+            if gs.bullets.activeCount < gs.maxBullets:
+                bullet = spawnBullet(gs)
+            if bullet is not None:
                 obj.data.player.weaponTimer.reset()
 
-                bullet = GameObject()
-                bullet.data.bullet = BulletState()
-                bullet.type = ObjectType(bullet=True)
                 bullet.direction = obj.direction
                 bullet.texture = res.texBullet
                 bullet.currentAnimation = res.ANIM_BULLET_MOVING
-                bullet.animations = res.bulletAnims
-
-                tw, th = get_texture_size(res.texBullet)
-                bullet.collider = sdl3.SDL_FRect(x=0, y=0, w=float(tw), h=float(th))
-                bullet.acceleration = glm.vec2(0, 0)
 
                 yVariation = 40
                 yVelocity = sdl3.SDL_rand(yVariation) - yVariation / 2.0
                 bullet.velocity = glm.vec2(600.0 * obj.direction, yVelocity)
-                bullet.maxSpeedX = 999.0
 
                 left = 4
                 right = 24
@@ -611,22 +1224,14 @@ def update(
                     obj.position.x + xOffset,
                     obj.position.y + res.TILE_SIZE / 2,
                 )
+                # no interpolation from wherever the recycled bullet was last
+                bullet.savePosition()
 
-                bullet.dynamic = False
                 bullet.data.bullet.inactive = False
+                bullet.data.bullet.colliding = False
                 bullet.data.bullet.moving = True
 
-                # append bullet
-                foundInactive = False
-                for i in range(len(gs.bullets)):
-                    if gs.bullets[i].data.bullet.inactive:
-                        gs.bullets[i] = bullet
-                        foundInactive = True
-                        break
-                if not foundInactive:
-                    gs.bullets.append(bullet)
-
-                play_sound(res.chunkShoot)
+                queueSound(gs, res.chunkShoot, SOUND_PRIORITY_SHOOT, obj)
         else:
             obj.texture = tex_normal
             obj.currentAnimation = anim_normal
@@ -637,7 +1242,8 @@ def update(
         obj.animations[obj.currentAnimation].step(deltaTime)
 
     # Applying gravity to dynamic objects that aren't grounded
-    if obj.dynamic and not obj.grounded:
+    # (store-backed objects get it in EntityStore.integrate)
+    if obj.dynamic and not obj.grounded and not obj.stored:
         obj.velocity += glm.vec2(0, 500) * deltaTime
 
     currentDirection: float = 0.0
@@ -730,47 +1336,8 @@ def update(
     elif obj.type.enemy:
         # Only process enemy AI if player exists
         if gs.player is not None:
-            if obj.data.enemy.shambling:
-                playerDir = glm.vec2(gs.player.position - obj.position)
-                distance = glm.length(playerDir)
-
-                if distance < 200 and distance > 50:
-                    # Checking if ground exists ahead
-                    sensor_x_offset = (obj.collider.w / 2) * obj.direction
-                    sensor = sdl3.SDL_FRect(
-                        x=obj.position.x + obj.collider.x + sensor_x_offset,
-                        y=obj.position.y + obj.collider.y + obj.collider.h + 1,
-                        w=1.0,
-                        h=1.0,
-                    )
-
-                    is_grounded_ahead = False
-                    for layer in gs.layers:
-                        for objB in layer:
-                            if obj is objB or not objB.type.level:
-                                continue
-                            rectB = sdl3.SDL_FRect(
-                                x=objB.position.x + objB.collider.x,
-                                y=objB.position.y + objB.collider.y,
-                                w=objB.collider.w,
-                                h=objB.collider.h,
-                            )
-                            if sdl3.SDL_HasRectIntersectionFloat(sensor, rectB):
-                                is_grounded_ahead = True
-                                break
-                        if is_grounded_ahead:
-                            break
-
-                    if not is_grounded_ahead:
-                        obj.direction *= -1
-                    else:
-                        obj.direction = 1 if playerDir.x > 0 else -1
-
-                    obj.velocity.x = 50.0 * obj.direction
-                else:
-                    obj.velocity.x = 0
-
-            elif obj.data.enemy.damage:
+            # shambling enemies were steered for the whole batch by steerEnemies
+            if obj.data.enemy.damage:
                 if obj.data.enemy.damageTimer.step(deltaTime):
                     obj.data.enemy.state = "shambling"
                     obj.texture = res.texEnemy
@@ -800,31 +1367,51 @@ def update(
                 obj.animations[obj.currentAnimation].timeout):
                 obj.data.bullet.inactive = True
 
-    # Applying velocity limits
-    if hasattr(obj, 'maxSpeedX') and abs(obj.velocity.x) > obj.maxSpeedX:
-        obj.velocity.x = np.sign(obj.velocity.x) * obj.maxSpeedX
-
-    obj.position += obj.velocity * deltaTime
-
-    # Checking for collisions with solid objects
-    if obj.dynamic or obj.type.bullet:
-        for layer in gs.layers:
-            for other_obj in layer:
-                if obj is other_obj:
-                    continue
-                # Skip dead enemies
-                if (other_obj.type.enemy and 
-                    hasattr(other_obj.data.enemy, 'hitPoints') and 
-                    other_obj.data.enemy.hitPoints <= 0):
-                    continue
-                # Checking against level objects OR enemies
-                if other_obj.type.level or other_obj.type.enemy:
-                    checkcollision(state, gs, res, obj, other_obj, deltaTime)
-                    if obj.type.bullet and obj.data.bullet.colliding:
-                        break
-            if obj.type.bullet and obj.data.bullet.colliding:
-                obj.velocity = glm.vec2(0, 0)
-                obj.data.bullet.moving = False
+    # Applying velocity limits and moving, unless the entity store does it for us
+    if not obj.stored:
+        if hasattr(obj, 'maxSpeedX') and abs(obj.velocity.x) > obj.maxSpeedX:
+            obj.velocity.x = np.sign(obj.velocity.x) * obj.maxSpeedX
+
+        obj.position += obj.velocity * deltaTime
+
+    return True
+
+
+def resolveCollisions(
+    state: SDLstate, gs: Gamestate, res: Resources, obj: GameObject, deltaTime: float
+):
+    """Collision, damage and ground checks for one object after it moved."""
+    # Flying bullets are swept along this step's motion so they can't skip
+    # over a tile or an enemy on a long step
+    if obj.type.bullet and obj.data.bullet.moving:
+        if sweepBullet(state, gs, res, obj, deltaTime):
+            obj.velocity = glm.vec2(0, 0)
+            obj.data.bullet.moving = False
+    # Checking for collisions with level tiles under the collider, then with
+    # moving objects in neighbouring cells only
+    elif obj.dynamic or obj.type.bullet:
+        level_objs = tuple(gs.tiles.objectsInRect(
+            obj.position.x + obj.collider.x,
+            obj.position.y + obj.collider.y,
+            obj.collider.w,
+            obj.collider.h,
+        ))
+        for other_obj in chain(level_objs, gs.spatial.neighbours(obj)):
+            # Skip dead enemies
+            if (other_obj.type.enemy and 
+                hasattr(other_obj.data.enemy, 'hitPoints') and 
+                other_obj.data.enemy.hitPoints <= 0):
+                continue
+            # Checking against level objects OR enemies
+            if other_obj.type.level or other_obj.type.enemy:
+                gs.spatial.candidatePairs += 1
+                if checkcollision(state, gs, res, obj, other_obj, deltaTime):
+                    gs.spatial.overlaps += 1
+                if obj.type.bullet and obj.data.bullet.colliding:
+                    break
+        if obj.type.bullet and obj.data.bullet.colliding:
+            obj.velocity = glm.vec2(0, 0)
+            obj.data.bullet.moving = False
     
 
     if obj.type.player and gs.player is not None:
@@ -835,72 +1422,41 @@ def update(
             h=obj.collider.h,
         )
 
-        for layer in gs.layers:
-            for enemy in layer:
-                if not enemy.type.enemy:
-                    continue
-                if enemy.data.enemy.hitPoints <= 0:
-                    continue
-
-                enemy_rect = sdl3.SDL_FRect(
-                    x=enemy.position.x + enemy.collider.x,
-                    y=enemy.position.y + enemy.collider.y,
-                    w=enemy.collider.w,
-                    h=enemy.collider.h,
-                )
+        for enemy in gs.spatial.neighbours(obj):
+            if not enemy.type.enemy:
+                continue
+            if enemy.data.enemy.hitPoints <= 0:
+                continue
 
-                if sdl3.SDL_HasRectIntersectionFloat(player_rect, enemy_rect):
-                    if obj.data.player.damage_cooldown <= 0:
-                        obj.data.player.TakeDamage(10)
-                        print(f"Player HP: {obj.data.player.hp}")
-                        obj.data.player.damage_cooldown = 1.0  # Cooldown in seconds
+            enemy_rect = sdl3.SDL_FRect(
+                x=enemy.position.x + enemy.collider.x,
+                y=enemy.position.y + enemy.collider.y,
+                w=enemy.collider.w,
+                h=enemy.collider.h,
+            )
 
-                        if obj.data.player.hp <= 0 and obj.data.player.state != "dead":
-                            obj.data.player.state = "dead"
-                            obj.velocity = glm.vec2(0, 0)
-                            print("Player has died!")
+            gs.spatial.candidatePairs += 1
+            if sdl3.SDL_HasRectIntersectionFloat(player_rect, enemy_rect):
+                gs.spatial.overlaps += 1
+                if obj.data.player.damage_cooldown <= 0:
+                    obj.data.player.TakeDamage(10)
+                    print(f"Player HP: {obj.data.player.hp}")
+                    obj.data.player.damage_cooldown = 1.0  # Cooldown in seconds
 
+                    if obj.data.player.hp <= 0 and obj.data.player.state != "dead":
+                        obj.data.player.state = "dead"
+                        obj.velocity = glm.vec2(0, 0)
+                        print("Player has died!")
 
-    # Handling grounded detection
-    FoundGround = False
-    ground_obj = None
 
+    # Handling grounded detection against the tile grid
+    sensor_y = obj.position.y + obj.collider.y + obj.collider.h
     if obj.type.player:
-        player_bottom = obj.position.y + obj.collider.y + obj.collider.h
-        sensor = sdl3.SDL_FRect(
-            x=obj.position.x + obj.collider.x,
-            y=player_bottom + 1.0,
-            w=obj.collider.w,
-            h=1.0,
-        )
-    else:
-        sensor = sdl3.SDL_FRect(
-            x=obj.position.x + obj.collider.x,
-            y=obj.position.y + obj.collider.y + obj.collider.h,
-            w=obj.collider.w,
-            h=1.0,
-        )
-
-    for layer in gs.layers:
-        for objB in layer:
-            if obj is objB:
-                continue
-            if not objB.type.level:
-                continue
-
-            rectB = sdl3.SDL_FRect(
-                x=objB.position.x + objB.collider.x,
-                y=objB.position.y + objB.collider.y,
-                w=objB.collider.w,
-                h=objB.collider.h,
-            )
-            
-            if sdl3.SDL_HasRectIntersectionFloat(sensor, rectB):
-                FoundGround = True
-                ground_obj = objB
-                break
-        if FoundGround:
-            break
+        sensor_y += 1.0
+    ground_cell = gs.tiles.firstSolidInRect(
+        obj.position.x + obj.collider.x, sensor_y, obj.collider.w, 1.0
+    )
+    FoundGround = ground_cell is not None
 
     # Updating grounded state
     if obj.grounded != FoundGround:
@@ -908,8 +1464,8 @@ def update(
         if FoundGround and obj.type.player:
             obj.data.player.state = "running"
             obj.velocity.y = 0
-            if ground_obj is not None:
-                ground_top = ground_obj.position.y + ground_obj.collider.y
+            if ground_cell is not None:
+                ground_top = gs.tiles.cellTop(ground_cell[1])
                 player_bottom = obj.position.y + obj.collider.y + obj.collider.h
                 if player_bottom <= ground_top + 1.0:
                     obj.position.y = ground_top - obj.collider.y - obj.collider.h
@@ -919,14 +1475,74 @@ def update(
         if FoundGround:
             obj.grounded = True
             obj.velocity.y = 0
-            if ground_obj is not None:
-                ground_top = ground_obj.position.y + ground_obj.collider.y
+            if ground_cell is not None:
+                ground_top = gs.tiles.cellTop(ground_cell[1])
                 obj_bottom = obj.position.y + obj.collider.y + obj.collider.h
                 if obj_bottom <= ground_top + 1.0:
                     obj.position.y = ground_top - obj.collider.y - obj.collider.h
         else:
             obj.grounded = False
+
+    # Keeping the broadphase cell in sync with the final position
+    if obj.dynamic:
+        gs.spatial.move(obj)
          
+def sweepBullet(
+    state: SDLstate, gs: Gamestate, res: Resources, bullet: GameObject, deltaTime: float
+) -> bool:
+    """Finds the first tile or live enemy the bullet touched during its last move.
+
+    On a hit the bullet is put back at the time of impact and the hit is
+    handled like any bullet collision. Returns True on a hit.
+    """
+    c = bullet.collider
+    dx = bullet.velocity.x * deltaTime
+    dy = bullet.velocity.y * deltaTime
+    # collider at the start of the move
+    x = bullet.position.x + c.x - dx
+    y = bullet.position.y + c.y - dy
+
+    first = None
+    other = None
+    hit = castTiles(gs.tiles, x, y, c.w, c.h, dx, dy)
+    if hit is not None:
+        other = gs.tiles.objectAt(hit[1], hit[2])
+        if other is not None:
+            first = hit[0]
+
+    # enemies are tested where they stand after their own move this step
+    for enemy in gs.spatial.query(min(x, x + dx), min(y, y + dy), c.w + abs(dx), c.h + abs(dy)):
+        if not enemy.type.enemy or enemy.data.enemy.hitPoints <= 0:
+            continue
+        if enemy.data.enemy.state in ("dead", "removed"):
+            continue
+        e = enemy.collider
+        gs.spatial.candidatePairs += 1
+        t = sweepBox(
+            x, y, c.w, c.h, dx, dy,
+            enemy.position.x + e.x, enemy.position.y + e.y, e.w, e.h,
+        )
+        if t is not None and (first is None or t < first):
+            first, other = t, enemy
+
+    if other is None:
+        return False
+    gs.spatial.overlaps += 1
+    bullet.position.x = x - c.x + dx * first
+    bullet.position.y = y - c.y + dy * first
+    rectA = SDL_FRect(x=x + dx * first, y=y + dy * first, w=c.w, h=c.h)
+    rectB = SDL_FRect(
+        x=other.position.x + other.collider.x,
+        y=other.position.y + other.collider.y,
+        w=other.collider.w,
+        h=other.collider.h,
+    )
+    rectC = SDL_FRect(0)
+    sdl3.SDL_GetRectIntersectionFloat(rectA, rectB, rectC)
+    collisionResponse(state, gs, res, rectA, rectB, rectC, bullet, other, deltaTime)
+    return True
+
+
 def collisionResponse(
     state: SDLstate,
     gs: Gamestate,
@@ -972,7 +1588,7 @@ def collisionResponse(
             objA.data.bullet.colliding = True
             objA.currentAnimation = res.ANIM_BULLET_HIT
             objA.texture = res.texBulletHit
-            play_sound(res.chunkWallHit)
+            queueSound(gs, res.chunkWallHit, SOUND_PRIORITY_WALL_HIT, objA)
         elif objB.type.enemy:
             if not objB.data.enemy.state == "dead":
                 # Bullet hit enemy
@@ -983,18 +1599,20 @@ def collisionResponse(
               
                 objB.data.enemy.state = "damage"
                 objB.data.enemy.hitPoints -= 1
+                gs.activity.wake(objB)
                 objB.direction = -objA.direction
                 objB.shouldFlash = True
                 objB.flashTimer.reset()
                 objB.texture = res.texEnemyHit
                 objB.currentAnimation = res.ANIM_ENEMY_HIT
-                play_sound(res.chunkEnemyHit)
+                queueSound(gs, res.chunkEnemyHit, SOUND_PRIORITY_ENEMY_HIT, objB)
 
                 if objB.data.enemy.hitPoints <= 0:
+                    destroyEntity(gs, objB)
                     objB.data.enemy.state = "dead"
                     objB.texture = res.texEnemyDie
                     objB.currentAnimation = res.ANIM_ENEMY_DIE
-                    play_sound(res.chunkEnemyDie)
+                    queueSound(gs, res.chunkEnemyDie, SOUND_PRIORITY_ENEMY_DIE, objB)
 
 
 def checkcollision(
@@ -1013,7 +1631,7 @@ def checkcollision(
         b.type.enemy
         and (b.data.enemy.state == "dead" or b.data.enemy.state == "removed")
     ):
-        return
+        return False
     rectA = SDL_FRect(
         x=a.position.x + a.collider.x,
         y=a.position.y + a.collider.y,
@@ -1034,137 +1652,174 @@ def checkcollision(
         if a.type.bullet and b.type.level and a.data.bullet.moving:
             a.data.bullet.moving = False
             a.data.bullet.inactive = True
+        return True
+    return False
 
 def generateLevelChunk(gs: Gamestate, state: SDLstate, res: Resources, start_x: int, spawn_player: bool = False):
     """Generates a random level chunk starting at start_x"""
     chunk_width = 20  # Width in tiles
     rows, cols = res.MAP_ROWS, chunk_width
     
-    # Create empty chunk arrays
-    tile_map = np.zeros((rows, cols), dtype=int)
-    foreground = np.zeros((rows, cols), dtype=int)
-    background = np.zeros((rows, cols), dtype=int)
-    
-    # Always having ground at the bottom
-    tile_map[4, :] = 1
-    if spawn_player:
-        tile_map[3, 1] = 4
-    # Generating platforms
-    platform_types = [
-        (1, 4, 6),   # (row, min_length, max_length)
-        (2, 3, 5),
-        (3, 2, 4)
-    ]
-    
-    x_pos = 0
-    while x_pos < cols:
-        # Randomly deciding if we place a platform
-        if random.random() < 0.7 and x_pos < cols - 3:  # 70% chance to place platform
-            platform_type = random.choice(platform_types)
-            row, min_len, max_len = platform_type
-            length = random.randint(min_len, max_len)
-            
-            # Making sure platform fits
-            if x_pos + length >= cols:
-                length = cols - x_pos - 1
-                
-
-            tile_map[row, x_pos:x_pos+length] = 2
-            
-
-            if random.random() < 0.4 and length > 2:  # 40% chance for enemy
-                enemy_pos = x_pos + random.randint(1, length-1)
-                tile_map[row-1, enemy_pos] = 3  # Enemy on platform
-            
-            x_pos += length + random.randint(1, 3)  # Skiping some space
-        else:
-            x_pos += 1
-            
-    # Adding decorative elements
-    for x in range(cols):
-        # Add some grass on ground
-        if random.random() < 0.2 and tile_map[3, x] == 0:  # 20% chance
-            foreground[3, x] = 5
-            
-        # Adding some background bricks
-        if random.random() < 0.1 and x % 2 == 0:  # 10% chance
-            background[random.randint(0, 2), x] = 6
-    
-    # Converting tile positions to actual game objects
-    def createObject(r, c, tex, obj_type, x_offset=0):
-        o = GameObject()
-        o.type = obj_type
-        o.position = glm.vec2(
-            start_x + c * Resources.TILE_SIZE,
-            state.logicalh - (Resources.MAP_ROWS - r) * Resources.TILE_SIZE,
-        )
-        o.texture = tex
-        o.collider = SDL_FRect(x=0, y=0, w=Resources.TILE_SIZE, h=Resources.TILE_SIZE)
-        return o
-
-    # Creating objects from the generated chunk
-    for r in range(rows):
-        for c in range(cols):
-            tile = tile_map[r][c]
-            if tile == 1:  # ground - SOLID
-                gs.layers[LAYER_IDX_LEVEL].append(
-                    createObject(r, c, Resources.texGround, ObjectType(level=True))
-                )
-            elif tile == 2:  # panel - SOLID
-                gs.layers[LAYER_IDX_LEVEL].append(
-                    createObject(r, c, Resources.texPanel, ObjectType(level=True))
-                )
-            elif tile == 3:  # enemy
-                o = GameObject()
-                o.type = ObjectType(enemy=True)
-                o.position = glm.vec2(
-                    start_x + c * Resources.TILE_SIZE,
-                    state.logicalh - (Resources.MAP_ROWS - r) * Resources.TILE_SIZE,
-                )
-                o.texture = Resources.texEnemy
-                o.data.enemy.state = "shambling"
-                o.maxSpeedX = 15
-                o.dynamic = True
-                o.animations = Resources.enemyAnims
-                o.collider = SDL_FRect(x=10, y=4, w=12, h=20)
-                o.data.enemy.hitPoints = 30
-                gs.layers[LAYER_IDX_CHARACTERS].append(o)
-            elif tile == 4:  # player 
-                if gs.player is None:
-                    player = GameObject()
-                    player.type = ObjectType(player=True)
-                    player.position = glm.vec2(
-                        start_x + c * Resources.TILE_SIZE,
-                        state.logicalh - (Resources.MAP_ROWS - r) * Resources.TILE_SIZE,
-                    )
-                    player.texture = Resources.texIdle
-                    player.animations = Resources.playerAnims
-                    player.currentAnimation = Resources.ANIM_PLAYER_IDLE
-                    player.acceleration = glm.vec2(300, 0)
-                    player.maxSpeedX = 100
-                    player.dynamic = True
-                    player.collider = SDL_FRect(x=11, y=6, w=10, h=26)
-                    gs.player = player
-                    gs.layers[LAYER_IDX_CHARACTERS].append(player)
-                    gs.playerIndex = len(gs.layers[LAYER_IDX_CHARACTERS]) - 1
-    
-    # Add decorative tiles
-    for r in range(rows):
-        for c in range(cols):
-            tile = foreground[r][c]
-            if tile == 5:  # grass - decoration
-                o = createObject(r, c, Resources.texGrass, ObjectType(level=False))
-                gs.foregroundTiles.append(o)
-                
-            tile = background[r][c]
-            if tile == 6:  # bricks - decoration
-                o = createObject(r, c, Resources.texBrick, ObjectType(level=False))
-                gs.backgroundTiles.append(o)
-    
+    chunk = gs.tiles.createChunk(start_x)
+
+    # Layouts come ready-made from the prefetch worker when it has one
+    layout = None
+    if gs.prefetch is not None and not spawn_player:
+        layout = gs.prefetch.take(chunk.index)
+    if layout is None:
+        layout = gs.levelGen.layout(chunk.index, spawn_player)
+    tile_map, foreground, background = layout
+
+    populateChunk(gs, state, chunk, tile_map, foreground, background)
+
+    # Spawning the characters placed in the chunk
+    for r, c in np.argwhere((tile_map == TILE_ENEMY) | (tile_map == TILE_PLAYER)).tolist():
+        x = start_x + c * Resources.TILE_SIZE
+        y = state.logicalh - (Resources.MAP_ROWS - r) * Resources.TILE_SIZE
+        if tile_map[r][c] == TILE_ENEMY:  # enemy
+            spawnEnemy(gs, Resources, x, y)
+        elif gs.player is None:  # player
+            player = GameObject()
+            player.type = ObjectType(player=True)
+            player.position = glm.vec2(x, y)
+            player.data.player = PlayerState(weaponCooldown=gs.weaponCooldown)
+            player.texture = Resources.texIdle
+            player.animations = Resources.playerAnims
+            player.currentAnimation = Resources.ANIM_PLAYER_IDLE
+            player.acceleration = glm.vec2(300, 0)
+            player.maxSpeedX = 100
+            player.dynamic = True
+            player.collider = SDL_FRect(x=11, y=6, w=10, h=26)
+            gs.characters[player] = None
+            attachEntity(gs, player)
+            gs.spatial.insert(player)
+            player.handle = gs.registry.create(player)
+            gs.playerHandle = player.handle
+
     # Updating the last chunk position
     gs.last_chunk_end = start_x + cols * Resources.TILE_SIZE
     gs.generated_chunks += 1
    
+def createTile(state: SDLstate, start_x: float, r: int, c: int, tex, obj_type) -> GameObject:
+    """Creates the static object for tile (r, c) of the chunk starting at start_x."""
+    o = GameObject()
+    o.type = obj_type
+    o.position = glm.vec2(
+        start_x + c * Resources.TILE_SIZE,
+        state.logicalh - (Resources.MAP_ROWS - r) * Resources.TILE_SIZE,
+    )
+    o.texture = tex
+    o.collider = SDL_FRect(x=0, y=0, w=Resources.TILE_SIZE, h=Resources.TILE_SIZE)
+    return o
+
+
+def populateChunk(gs: Gamestate, state: SDLstate, chunk, tile_map, foreground, background):
+    """Creates a chunk's level tiles and decorations from its tile grids."""
+    start_x = chunk.startX
+    for r, c in np.argwhere(tile_map).tolist():
+        tile = tile_map[r][c]
+        if tile == TILE_GROUND:  # ground - SOLID
+            tex = Resources.texGround
+        elif tile == TILE_PANEL:  # panel - SOLID
+            tex = Resources.texPanel
+        else:
+            continue
+        o = createTile(state, start_x, r, c, tex, ObjectType(level=True))
+        gs.levelIndex.insert(o)
+        chunk.tiles[r, c] = tile
+        chunk.objects[(r, c)] = o
+
+    # Add decorative tiles
+    for r, c in np.argwhere(foreground == TILE_GRASS).tolist():  # grass - decoration
+        o = createTile(state, start_x, r, c, Resources.texGrass, ObjectType(level=False))
+        gs.foregroundIndex.insert(o)
+        chunk.foreground.append(o)
+    for r, c in np.argwhere(background == TILE_BRICK).tolist():  # bricks - decoration
+        o = createTile(state, start_x, r, c, Resources.texBrick, ObjectType(level=False))
+        gs.backgroundIndex.insert(o)
+        chunk.background.append(o)
+
+
+def restoreChunks(gs: Gamestate, state: SDLstate, res: Resources, min_x: float, max_x: float):
+    """Restores the evicted chunks overlapping min_x..max_x."""
+    generated = gs.tiles.chunkIndexAt(gs.last_chunk_end)
+    for index in range(max(gs.tiles.chunkIndexAt(min_x), 0), min(gs.tiles.chunkIndexAt(max_x) + 1, generated)):
+        if index in gs.tiles.chunks:
+            continue
+        if index in gs.chunkStore:
+            restoreChunk(gs, state, res, index)
+        else:
+            regenerateChunk(gs, state, res, index)
+
+
+def restoreChunk(gs: Gamestate, state: SDLstate, res: Resources, index: int):
+    """Rebuilds a chunk and its enemies from the chunk store, without regenerating it."""
+    tiles, foreground, background, enemies = gs.chunkStore.load(index)
+    chunk = gs.tiles.createChunk(index * gs.chunk_width)
+    populateChunk(gs, state, chunk, tiles, foreground, background)
+    for e in enemies:
+        o = spawnEnemy(gs, res, float(e["x"]), float(e["y"]))
+        # spawnEnemy goes through a float32 glm vector; the record has the exact position
+        o.position.x = float(e["x"])
+        o.position.y = float(e["y"])
+        o.velocity.x = float(e["vx"])
+        o.velocity.y = float(e["vy"])
+        o.direction = int(e["direction"])
+        o.data.enemy.hitPoints = int(e["hp"])
+        o.data.enemy.state = ENEMY_STATES[e["state"]]
+        if o.data.enemy.damage:
+            o.data.enemy.damageTimer.time = float(e["damageTime"])
+            o.texture = res.texEnemyHit
+            o.currentAnimation = res.ANIM_ENEMY_HIT
+    return chunk
+
+
+def regenerateChunk(gs: Gamestate, state: SDLstate, res: Resources, index: int):
+    """Rebuilds a chunk the chunk store had to drop, as it was first generated."""
+    tile_map, foreground, background = gs.levelGen.layout(index)
+    chunk = gs.tiles.createChunk(index * gs.chunk_width)
+    populateChunk(gs, state, chunk, tile_map, foreground, background)
+    for r, c in np.argwhere(tile_map == TILE_ENEMY).tolist():
+        x = chunk.startX + c * res.TILE_SIZE
+        y = state.logicalh - (res.MAP_ROWS - r) * res.TILE_SIZE
+        spawnEnemy(gs, res, x, y)
+    return chunk
+
+
+def enemyRecord(obj: GameObject) -> tuple:
+    """An enemy's state as a chunk store record."""
+    enemy = obj.data.enemy
+    return (
+        obj.position.x,
+        obj.position.y,
+        obj.velocity.x,
+        obj.velocity.y,
+        enemy.damageTimer.time,
+        enemy.hitPoints,
+        obj.direction,
+        ENEMY_STATES.index(enemy.state),
+    )
+
+
+def spawnEnemy(gs: Gamestate, res: Resources, x: float, y: float) -> GameObject:
+    """Creates a shambling enemy at (x, y) and adds it to the world."""
+    o = GameObject()
+    o.type = ObjectType(enemy=True)
+    o.position = glm.vec2(x, y)
+    o.texture = res.texEnemy
+    o.data.enemy.state = "shambling"
+    o.maxSpeedX = 15
+    o.dynamic = True
+    o.animations = res.enemyAnims
+    o.collider = SDL_FRect(x=10, y=4, w=12, h=20)
+    o.data.enemy.hitPoints = 30
+    gs.characters[o] = None
+    attachEntity(gs, o)
+    gs.spatial.insert(o)
+    o.handle = gs.registry.create(o)
+    return o
+
+
 def handleKeyInputs(
     state: SDLstate, gs: Gamestate, obj: GameObject, key: sdl3.SDL_Scancode, keydown
 ):
@@ -1191,19 +1846,21 @@ sdl3.SDL_GetTextureSize.argtypes = [
 sdl3.SDL_GetTextureSize.restype = None
 
 
-def get_texture_size(texture: SDL_Texture):
+def get_texture_size(texture):
+    """Size of a sprite region or registered texture, without asking SDL."""
     if not texture:
         raise ValueError("Texture is NULL or invalid!")
-
-    w = ctypes.c_float()
-    h = ctypes.c_float()
-    sdl3.SDL_GetTextureSize(texture, ctypes.byref(w), ctypes.byref(h))
-    return w.value, h.value
+    if isinstance(texture, AtlasRegion):
+        return texture.w, texture.h
+    info = Resources.textures.info(texture)
+    if info is None:
+        raise ValueError("Texture is not registered!")
+    return info.width, info.height
 
 
 def drawParalaxBackground(
-    renderer: SDL_Renderer,
-    texture: SDL_Texture,
+    batch: SpriteBatch,
+    texture: AtlasRegion,
     xVelocity: float,
     scrollposition: float,
     scrollFactor: float,
@@ -1221,53 +1878,134 @@ def drawParalaxBackground(
         scrollposition -= texture_w
 
     # drawing first copy
-    dst = SDL_FRect(x=scrollposition, y=30, w=float(texture_w), h=float(texture_h))
-    sdl3.SDL_RenderTexture(renderer, texture, None, dst)
+    batch.draw(texture, scrollposition, 30, texture_w, texture_h)
     # drawing second copy (tile horizontally)
-    dst2 = SDL_FRect(
-        x=scrollposition + float(texture_w),
-        y=30,
-        w=float(texture_w),
-        h=float(texture_h),
-    )
-    sdl3.SDL_RenderTexture(renderer, texture, None, dst2)
+    batch.draw(texture, scrollposition + texture_w, 30, texture_w, texture_h)
 
     # returning updated scroll so caller can store it
     return scrollposition
-def cleanupDistantObjects(gs: Gamestate, min_x: float):
-    """Remove objects that are far behind the player to save memory"""
-    # Cleaning up level objects
-    for layer in gs.layers:
-        i = 0
-        while i < len(layer):
-            obj = layer[i]
-            if obj.position.x + obj.collider.w < min_x:
-                layer.pop(i)
-            else:
-                i += 1
-                
-    # Cleaning up background tiles
-    i = 0
-    while i < len(gs.backgroundTiles):
-        obj = gs.backgroundTiles[i]
-        if obj.position.x + Resources.TILE_SIZE < min_x:
-            gs.backgroundTiles.pop(i)
-        else:
-            i += 1
-            
-    # Cleaning up foreground tiles
-    i = 0
-    while i < len(gs.foregroundTiles):
-        obj = gs.foregroundTiles[i]
-        if obj.position.x + Resources.TILE_SIZE < min_x:
-            gs.foregroundTiles.pop(i)
-        else:
-            i += 1
+def createBullet(res: Resources) -> GameObject:
+    """Builds a pooled bullet; spawning only resets its per-shot fields."""
+    bullet = GameObject()
+    bullet.type = ObjectType(bullet=True)
+    bullet.texture = res.texBullet
+    bullet.currentAnimation = res.ANIM_BULLET_MOVING
+    bullet.animations = res.bulletAnims
+
+    tw, th = get_texture_size(res.texBullet)
+    bullet.collider = sdl3.SDL_FRect(x=0, y=0, w=float(tw), h=float(th))
+    bullet.maxSpeedX = 999.0
+    bullet.dynamic = False
+    return bullet
+
+
+def spawnBullet(gs: Gamestate):
+    """Takes a bullet from the pool, or returns None when the pool is exhausted."""
+    bullet = gs.bullets.acquire()
+    if bullet is None:
+        return None
+    if gs.entities is not None:
+        gs.entities.setActive(bullet, True)
+    bullet.handle = gs.registry.create(bullet)
+    return bullet
+
+
+def recycleBullet(gs: Gamestate, bullet: GameObject):
+    """Returns a deactivated bullet to the pool."""
+    bullet.data.bullet.inactive = True
+    bullet.data.bullet.moving = False
+    bullet.data.bullet.colliding = False
+    gs.bullets.release(bullet)
+    if gs.entities is not None:
+        gs.entities.setActive(bullet, False)
+
+
+def destroyEntity(gs: Gamestate, obj: GameObject):
+    """Queues obj for removal at the start of the next tick."""
+    if obj.handle is not None:
+        gs.registry.destroy(obj.handle)
+
+
+def flushDestroyed(gs: Gamestate):
+    gs.registry.flush(lambda obj: removeEntity(gs, obj))
+
+
+def removeEntity(gs: Gamestate, obj: GameObject):
+    """Takes a destroyed object out of the world; bullets go back to the pool."""
+    obj.handle = None
+    if obj.type.bullet:
+        recycleBullet(gs, obj)
+        return
+    gs.characters.pop(obj, None)
+    gs.spatial.remove(obj)
+    releaseEntity(gs, obj)
+
+
+def attachEntity(gs: Gamestate, obj: GameObject):
+    """Moves a dynamic object into the entity store, if one is in use."""
+    if gs.entities is not None:
+        gs.entities.attach(obj)
+
 
-def drawHealthBar(state: SDLstate, gs: Gamestate, obj: GameObject, is_player: bool = False):
+def releaseEntity(gs: Gamestate, obj: GameObject):
+    """Frees an object's entity store row, leaving the object usable on its own."""
+    if gs.entities is not None:
+        gs.entities.release(obj)
+
+
+def cleanupDistantObjects(gs: Gamestate, min_x: float, max_x: float = None):
+    """Moves chunks far from the player, with the enemies in them, into the chunk store"""
+    tiles = gs.tiles
+    evicted = tiles.removeChunksBefore(min_x)
+    if max_x is not None:
+        evicted += tiles.removeChunksAfter(max_x)
+    if not evicted:
+        return
+    evictedIndices = [chunk.index for chunk in evicted]
+    store = gs.chunkStore
+
+    # Enemies no longer over a resident chunk go with the one they stand in, or the nearest evicted one
+    enemies = {index: [] for index in evictedIndices}
+    for obj in gs.characters:
+        if obj.type.player:
+            continue
+        index = tiles.chunkIndexAt(obj.position.x + obj.collider.x + obj.collider.w / 2)
+        if index in tiles.chunks:
+            continue
+        destroyEntity(gs, obj)
+        # dying enemies are not worth keeping
+        if not obj.type.enemy or obj.data.enemy.dead:
+            continue
+        if index in store:
+            store.addEnemies(index, [enemyRecord(obj)])
+        else:
+            enemies[min(evictedIndices, key=lambda i: abs(i - index))].append(enemyRecord(obj))
+
+    for chunk in evicted:
+        foreground = np.zeros_like(chunk.tiles)
+        background = np.zeros_like(chunk.tiles)
+        for grid, objects, tile in (
+            (foreground, chunk.foreground, TILE_GRASS),
+            (background, chunk.background, TILE_BRICK),
+        ):
+            for obj in objects:
+                col, row = tiles.cellAt(obj.position.x, obj.position.y)
+                grid[row, col - chunk.index * tiles.cols] = tile
+        store.save(chunk.index, chunk.tiles, foreground, background, enemies[chunk.index])
+
+        # the draw indexes bucket by chunk, so a chunk's tiles go in one step
+        gs.levelIndex.removeBucket(chunk.index)
+        gs.foregroundIndex.removeBucket(chunk.index)
+        gs.backgroundIndex.removeBucket(chunk.index)
+        releaseChunkLayers(chunk)
+
+
+def drawHealthBar(state: SDLstate, gs: Gamestate, obj: GameObject, is_player: bool = False, pos=None):
     """Draws a health bar above an object with color coding"""
     if not obj or not hasattr(obj, 'data'):
         return
+    if pos is None:
+        pos = obj.position
     
 
     if is_player and hasattr(obj.data, 'player'):
@@ -1289,8 +2027,8 @@ def drawHealthBar(state: SDLstate, gs: Gamestate, obj: GameObject, is_player: bo
     health_percentage = current_hp / max_hp
     
     # Calculating position (above the object)
-    bar_x = obj.position.x + obj.collider.x - gs.mapViewport.x
-    bar_y = obj.position.y + obj.collider.y - 8  # 8 pixels above the object
+    bar_x = pos.x + obj.collider.x - gs.mapViewport.x
+    bar_y = pos.y + obj.collider.y - 8  # 8 pixels above the object
     
     # Draw background (red)
     bg_rect = SDL_FRect(x=bar_x, y=bar_y, w=bar_width, h=bar_height)
@@ -1358,6 +2096,11 @@ def drawPlayerHealthBar(state: SDLstate, gs: Gamestate):
     sdl3.SDL_RenderDebugTextFormat(state.renderer, bar_x + 5, bar_y + 5, hp_text.encode("utf-8"))
 
 if __name__ == "__main__":
-   
-    window_creation()  # Run the game
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the game.")
+    parser.add_argument("--record", metavar="PATH", help="record the session's inputs for replay")
+    args = parser.parse_args()
+
+    window_creation(args.record)  # Run the game
 
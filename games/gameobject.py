@@ -2,6 +2,7 @@ import sdl3
 from pyglm import glm
 from Animation import Animation
 from TImer import Timer
+from entitystore import Vec2View, RectView
 class PlayerState:
     def __init__(self, weaponCooldown=0.1,hp=100,max_hp=100):
         self.state = "idle"  
@@ -89,19 +90,175 @@ class ObjectType:
 
 class GameObject:
     def __init__(self):
+        # set when the object is attached to an EntityStore row
+        self._store = None
+        self._row = -1
+        # generational handle while registered with the entity registry
+        self.handle = None
         self.type = ObjectType(level=True)
         self.data = ObjectData()
-        self.direction = 1
-        self.maxSpeedX: float = 0.0
-        self.position = glm.vec2(0.0, 0.0)
-        self.velocity = glm.vec2(0.0, 0.0)
-        self.acceleration = glm.vec2(0.0, 0.0)
+        self._direction = 1
+        self._maxSpeedX: float = 0.0
+        self._position = glm.vec2(0.0, 0.0)
+        # position at the start of the current simulation tick, None until saved
+        self._previousPosition = None
+        self._velocity = glm.vec2(0.0, 0.0)
+        self._acceleration = glm.vec2(0.0, 0.0)
         self.animations: list[Animation] = []
         self.currentAnimation = -1
         self.texture = None
-        self.dynamic = False
-        self.grounded = False
-        self.collider = sdl3.SDL_FRect(x=0, y=0, w=0, h=0)
+        self._dynamic = False
+        self._grounded = False
+        self._collider = sdl3.SDL_FRect(x=0, y=0, w=0, h=0)
         self.flashTimer=Timer(0.05)
         self.shouldFlash=False
-        self.spriteframe=1
\ No newline at end of file
+        self.spriteframe=1
+
+    # Store binding, called by EntityStore
+    def _bindRow(self, store, row):
+        self._store = store
+        self._row = row
+        self._position = Vec2View(store.position[row])
+        self._previousPosition = Vec2View(store.previous[row])
+        self._velocity = Vec2View(store.velocity[row])
+        self._acceleration = Vec2View(store.acceleration[row])
+        self._collider = RectView(store.collider[row])
+
+    def _unbindRow(self):
+        store, row = self._store, self._row
+        self._direction = int(store.direction[row])
+        self._maxSpeedX = float(store.maxSpeedX[row])
+        self._dynamic = bool(store.dynamic[row])
+        self._grounded = bool(store.grounded[row])
+        self._position = self._position.vec()
+        self._previousPosition = self._previousPosition.vec()
+        self._velocity = self._velocity.vec()
+        self._acceleration = self._acceleration.vec()
+        c = store.collider[row]
+        self._collider = sdl3.SDL_FRect(x=c[0], y=c[1], w=c[2], h=c[3])
+        self._store = None
+        self._row = -1
+
+    @property
+    def stored(self) -> bool:
+        return self._store is not None
+
+    # Vector and rect fields: views are written in place so the store stays in sync
+    @property
+    def position(self):
+        return self._position
+
+    @position.setter
+    def position(self, value):
+        if self._store is None:
+            self._position = value
+        else:
+            self._position.set(value)
+
+    @property
+    def velocity(self):
+        return self._velocity
+
+    @velocity.setter
+    def velocity(self, value):
+        if self._store is None:
+            self._velocity = value
+        else:
+            self._velocity.set(value)
+
+    @property
+    def acceleration(self):
+        return self._acceleration
+
+    @acceleration.setter
+    def acceleration(self, value):
+        if self._store is None:
+            self._acceleration = value
+        else:
+            self._acceleration.set(value)
+
+    @property
+    def collider(self):
+        return self._collider
+
+    @collider.setter
+    def collider(self, value):
+        if self._store is None:
+            self._collider = value
+        else:
+            self._collider.set(value)
+
+    @property
+    def previousPosition(self):
+        return self._previousPosition
+
+    def savePosition(self):
+        """Records the current position as the start of the tick."""
+        if self._store is None:
+            self._previousPosition = glm.vec2(self._position.x, self._position.y)
+        else:
+            self._previousPosition.set(self._position)
+
+    def lerpPosition(self, alpha: float):
+        """Position interpolated between the previous and the current tick."""
+        prev = self._previousPosition
+        if prev is None or alpha >= 1.0:
+            return self._position
+        pos = self._position
+        return glm.vec2(
+            prev.x + (pos.x - prev.x) * alpha,
+            prev.y + (pos.y - prev.y) * alpha,
+        )
+
+    # Scalar fields
+    @property
+    def direction(self):
+        if self._store is None:
+            return self._direction
+        return int(self._store.direction[self._row])
+
+    @direction.setter
+    def direction(self, value):
+        if self._store is None:
+            self._direction = value
+        else:
+            self._store.direction[self._row] = value
+
+    @property
+    def maxSpeedX(self) -> float:
+        if self._store is None:
+            return self._maxSpeedX
+        return self._store.maxSpeedX[self._row]
+
+    @maxSpeedX.setter
+    def maxSpeedX(self, value):
+        if self._store is None:
+            self._maxSpeedX = value
+        else:
+            self._store.maxSpeedX[self._row] = value
+
+    @property
+    def dynamic(self) -> bool:
+        if self._store is None:
+            return self._dynamic
+        return bool(self._store.dynamic[self._row])
+
+    @dynamic.setter
+    def dynamic(self, value):
+        if self._store is None:
+            self._dynamic = value
+        else:
+            self._store.dynamic[self._row] = value
+
+    @property
+    def grounded(self) -> bool:
+        if self._store is None:
+            return self._grounded
+        return bool(self._store.grounded[self._row])
+
+    @grounded.setter
+    def grounded(self, value):
+        if self._store is None:
+            self._grounded = value
+        else:
+            self._store.grounded[self._row] = value
\ No newline at end of file
@@ -0,0 +1,79 @@
+from typing import NamedTuple
+
+
+class Handle(NamedTuple):
+    """Reference to an entity: its registry slot and the slot's generation at creation."""
+
+    index: int
+    generation: int
+
+
+class EntityRegistry:
+    """Live entities by generational handle, with destruction deferred to a flush.
+
+    Destroying an entity frees its slot for reuse and bumps the slot's
+    generation, so handles to it stop resolving instead of pointing at
+    whatever is created in the slot next. destroy() only queues the entity;
+    flush() removes everything queued in one go, so nothing disappears
+    from under a loop that is still running.
+    """
+
+    def __init__(self):
+        self.objects: list = []
+        self.generations: list[int] = []
+        # slot is queued for destruction
+        self.dying: list[bool] = []
+        self.free: list[int] = []
+        self.pending: list[Handle] = []
+
+    def __len__(self) -> int:
+        return len(self.objects) - len(self.free)
+
+    def create(self, obj) -> Handle:
+        if self.free:
+            index = self.free.pop()
+            self.objects[index] = obj
+        else:
+            index = len(self.objects)
+            self.objects.append(obj)
+            self.generations.append(0)
+            self.dying.append(False)
+        return Handle(index, self.generations[index])
+
+    def isAlive(self, handle: Handle) -> bool:
+        return (
+            handle is not None
+            and handle.index < len(self.generations)
+            and self.generations[handle.index] == handle.generation
+        )
+
+    def get(self, handle: Handle):
+        """The entity handle refers to, or None if it has been destroyed."""
+        if not self.isAlive(handle):
+            return None
+        return self.objects[handle.index]
+
+    def destroy(self, handle: Handle) -> bool:
+        """Queues the entity for the next flush; False if it is stale or already queued."""
+        if not self.isAlive(handle) or self.dying[handle.index]:
+            return False
+        self.dying[handle.index] = True
+        self.pending.append(handle)
+        return True
+
+    def flush(self, onDestroy=None) -> int:
+        """Destroys every queued entity, calling onDestroy(obj) for each; returns how many."""
+        count = 0
+        # onDestroy may queue more entities, they go in the same flush
+        while self.pending:
+            pending, self.pending = self.pending, []
+            for index, _ in pending:
+                obj = self.objects[index]
+                self.objects[index] = None
+                self.generations[index] += 1
+                self.dying[index] = False
+                self.free.append(index)
+                if onDestroy is not None:
+                    onDestroy(obj)
+                count += 1
+        return count
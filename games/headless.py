@@ -0,0 +1,266 @@
+"""Headless simulation: runs the game logic with a null renderer and null audio.
+
+Useful for benchmarking, soak tests and profiling on machines without a
+display or sound card. Run from anywhere with:
+
+    python3 headless.py --frames 36000 --time-scale 2
+"""
+import argparse
+import os
+import sys
+import time
+
+import sdl3
+
+import game
+from game import (
+    Gamestate,
+    Resources,
+    SDLstate,
+    handleKeyInputs,
+    simulateFrame,
+    startRecording,
+    startWorld,
+)
+from recording import Recording, applyInputs, worldChecksum
+
+
+def createHeadlessState(render: bool = False):
+    """Sets up SDLstate and loads resources against the null audio backend.
+
+    With render=True a hidden window and software renderer are created on
+    SDL's offscreen video driver, so drawing code can run without a display.
+    Otherwise the null render backend is used and nothing can be drawn.
+    """
+    state = SDLstate(headless=True)
+    state.width = 1600
+    state.height = 900
+    state.logicalw = 640
+    state.logicalh = 320
+
+    if render and not createOffscreenRenderer(state):
+        raise RuntimeError("Failed to create offscreen renderer")
+    if not Resources.load(state):
+        raise RuntimeError("Failed to load resources")
+    return state
+
+
+def createOffscreenRenderer(state: SDLstate):
+    """Creates a hidden window with a software renderer on the offscreen video driver."""
+    sdl3.SDL_SetHint(sdl3.SDL_HINT_VIDEO_DRIVER, b"offscreen")
+    if not sdl3.SDL_Init(sdl3.SDL_INIT_VIDEO):
+        print("SDL_Init failed:", sdl3.SDL_GetError().decode())
+        return False
+    state.window = sdl3.SDL_CreateWindow(
+        b"headless", state.logicalw, state.logicalh, sdl3.SDL_WINDOW_HIDDEN
+    )
+    if not state.window:
+        print("Error creating offscreen window")
+        return False
+    state.renderer = sdl3.SDL_CreateRenderer(state.window, b"software")
+    if not state.renderer:
+        print("Error creating software renderer")
+        return False
+    sdl3.SDL_SetRenderLogicalPresentation(
+        state.renderer,
+        state.logicalw,
+        state.logicalh,
+        sdl3.SDL_LOGICAL_PRESENTATION_LETTERBOX,
+    )
+    return True
+
+
+def createWorld(state: SDLstate, maxBullets=None, weaponCooldown=None, seed=None):
+    """Builds a fresh Gamestate and generates the starting chunks."""
+    gs = Gamestate(state, maxBullets, weaponCooldown, seed)
+    startWorld(state, gs, Resources)
+    return gs
+
+
+def createHeadlessWorld(maxBullets=None, weaponCooldown=None, seed=None):
+    """Loads resources against the null backends and generates the starting chunks."""
+    state = createHeadlessState()
+    return state, createWorld(state, maxBullets, weaponCooldown, seed)
+
+
+def setKey(state: SDLstate, gs: Gamestate, scancode: int, down: bool):
+    """Updates the scripted keyboard state and forwards the key event like SDL would."""
+    was_down = state.keys[scancode]
+    state.keys[scancode] = down
+    if down and not was_down and gs.recorder is not None:
+        gs.recorder.keyDown(scancode)
+    if gs.player and was_down != down:
+        handleKeyInputs(state, gs, gs.player, scancode, down)
+
+
+class RunAndGun:
+    """Default input script: run right while shooting, jumping every so often."""
+
+    def __init__(self, jumpEvery: int = 90, shoot: bool = True):
+        self.jumpEvery = jumpEvery
+        self.shoot = shoot
+
+    def __call__(self, frame: int, state: SDLstate, gs: Gamestate):
+        setKey(state, gs, sdl3.SDL_SCANCODE_D, True)
+        setKey(state, gs, sdl3.SDL_SCANCODE_J, self.shoot)
+        jump = self.jumpEvery > 0 and frame % self.jumpEvery == 0
+        setKey(state, gs, sdl3.SDL_SCANCODE_K, jump)
+
+
+def runHeadless(
+    frames: int = 3600,
+    timeScale: float = 1.0,
+    tickRate: int = None,
+    script=None,
+    immortal: bool = False,
+    world=None,
+):
+    """Steps the simulation as fast as the CPU allows and returns run statistics.
+
+    Each frame advances the world by timeScale / tickRate seconds, so a time
+    scale of 2 simulates twice as much game time per step.
+    """
+    state, gs = world or createHeadlessWorld()
+    script = script or RunAndGun()
+    deltaTime = timeScale / (tickRate or game.TICK_RATE)
+
+    start = time.perf_counter()
+    frame = 0
+    while frame < frames:
+        script(frame, state, gs)
+        if immortal and gs.player:
+            gs.player.data.player.hp = gs.player.data.player.max_hp
+        if gs.recorder is not None:
+            gs.recorder.beginTick(state.keys)
+        simulateFrame(state, gs, Resources, deltaTime)
+        game.playQueuedSounds(gs, deltaTime)
+        if gs.recorder is not None:
+            gs.recorder.endTick(gs)
+        frame += 1
+        if gs.playerDead:
+            break
+    wall = time.perf_counter() - start
+
+    return {
+        "frames": frame,
+        "simulated_seconds": frame * deltaTime,
+        "wall_seconds": wall,
+        "frames_per_second": frame / wall if wall > 0 else 0.0,
+        "speedup": (frame * deltaTime) / wall if wall > 0 else 0.0,
+        "seed": gs.seed,
+        "chunks_generated": gs.generated_chunks,
+        "characters": len(gs.characters),
+        "entities": len(gs.registry),
+        "level_tiles": len(gs.levelIndex),
+        "resident_chunks": len(gs.tiles.chunks),
+        "stored_chunks": len(gs.chunkStore),
+        "dropped_chunks": gs.chunkStore.dropped,
+        "active_bullets": gs.bullets.activeCount,
+        "sounds_played": Resources.audio.played,
+        "sound_events": gs.sounds.stats(),
+        "activity": gs.activity.stats(),
+        "texture_bytes": Resources.textures.memoryBytes,
+        "load_seconds": Resources.loadSeconds,
+        "player_x": float(gs.player.position.x) if gs.player else 0.0,
+        "player_dead": gs.playerDead,
+    }
+
+
+def runReplay(path: str, check: bool = True, state: SDLstate = None):
+    """Replays a recording as fast as the CPU allows and returns run statistics.
+
+    With check, the world checksum is compared after every tick and the
+    replay stops at the first tick that differs from the recording.
+    Resources are loaded unless a state that has them is passed in.
+    """
+    recording = Recording.load(path)
+    state = state or createHeadlessState()
+    gs = createWorld(state, recording.maxBullets, recording.weaponCooldown, recording.levelSeed)
+    sdl3.SDL_srand(recording.randSeed)
+
+    diverged = None
+    start = time.perf_counter()
+    tick = 0
+    for mask, checksum in recording.ticks.tolist():
+        applyInputs(state, gs, mask, handleKeyInputs)
+        if recording.immortal and gs.player:
+            gs.player.data.player.hp = gs.player.data.player.max_hp
+        simulateFrame(state, gs, Resources, recording.dt)
+        game.playQueuedSounds(gs, recording.dt)
+        tick += 1
+        if check and worldChecksum(gs) != checksum:
+            diverged = tick - 1
+            break
+    wall = time.perf_counter() - start
+
+    return {
+        "ticks": tick,
+        "recorded_ticks": len(recording),
+        "simulated_seconds": tick * recording.dt,
+        "wall_seconds": wall,
+        "speedup": (tick * recording.dt) / wall if wall > 0 else 0.0,
+        "seed": recording.levelSeed,
+        "diverged_at": diverged,
+        "checksum": worldChecksum(gs),
+        "player_x": float(gs.player.position.x) if gs.player else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the game simulation headless.")
+    parser.add_argument("--frames", type=int, default=3600, help="frames to simulate")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="game seconds per nominal frame time")
+    parser.add_argument("--tick-rate", type=int, default=None, help="simulation ticks per game second (default: game.TICK_RATE)")
+    parser.add_argument("--max-bullets", type=int, default=None, help="active bullet cap")
+    parser.add_argument("--cooldown", type=float, default=None, help="weapon cooldown in seconds")
+    parser.add_argument("--no-shoot", action="store_true", help="don't hold the fire button")
+    parser.add_argument("--immortal", action="store_true", help="keep the player at full health")
+    parser.add_argument("--prefetch", action="store_true", help="generate chunk layouts in a worker process")
+    parser.add_argument("--seed", type=int, default=None, help="level seed (default: random)")
+    parser.add_argument("--record", metavar="PATH", help="record the run's inputs for replay")
+    parser.add_argument("--replay", metavar="PATH", help="replay a recording instead of the scripted run")
+    parser.add_argument("--no-check", action="store_true", help="don't compare world checksums while replaying")
+    parser.add_argument("--load-timeline", action="store_true", help="print where asset loading spent its time")
+    args = parser.parse_args(argv)
+    game.PRINT_LOAD_TIMELINE = game.PRINT_LOAD_TIMELINE or args.load_timeline
+
+    # paths on the command line are relative to where we were started
+    record = os.path.abspath(args.record) if args.record else None
+    replay = os.path.abspath(args.replay) if args.replay else None
+    # assets are loaded relative to the game directory
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    if replay:
+        stats = runReplay(replay, check=not args.no_check)
+        for key, value in stats.items():
+            print(f"{key}: {value}")
+        Resources.unload()
+        return 1 if stats["diverged_at"] is not None else 0
+
+    world = createHeadlessWorld(args.max_bullets, args.cooldown, args.seed)
+    state, gs = world
+    if args.prefetch:
+        gs.prefetch = game.startPrefetch(gs)
+    if record:
+        deltaTime = args.time_scale / (args.tick_rate or game.TICK_RATE)
+        startRecording(gs, record, deltaTime, args.immortal)
+    stats = runHeadless(
+        frames=args.frames,
+        timeScale=args.time_scale,
+        tickRate=args.tick_rate,
+        script=RunAndGun(shoot=not args.no_shoot),
+        immortal=args.immortal,
+        world=world,
+    )
+    for key, value in stats.items():
+        print(f"{key}: {value}")
+    if gs.prefetch is not None:
+        gs.prefetch.close()
+    gs.chunkStore.close()
+    if gs.recorder is not None:
+        gs.recorder.close()
+    Resources.unload()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
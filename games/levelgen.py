@@ -0,0 +1,236 @@
+"""Level chunk layouts and a worker process that prefetches them.
+
+A layout is three (rows, cols) uint8 arrays: the tile map (ground, panels,
+enemy and player spawns), the foreground decoration and the background
+decoration. Layouts only depend on the level seed and the chunk index, so
+they can be generated anywhere, including a separate process; the main
+loop then just turns ready layouts into objects. This module must not
+import SDL so worker processes stay light.
+"""
+import multiprocessing as mp
+import sys
+import types
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Tile ids used in layouts
+TILE_GROUND = 1
+TILE_PANEL = 2
+TILE_ENEMY = 3
+TILE_PLAYER = 4
+TILE_GRASS = 5
+TILE_BRICK = 6
+
+# (row, min_length, max_length)
+PLATFORM_TYPES = np.array([
+    (1, 4, 6),
+    (2, 3, 5),
+    (3, 2, 4),
+])
+
+# Uniform draws per platform attempt: place?, type, length, enemy?, enemy column, gap
+_ATTEMPT_DRAWS = 6
+
+
+class LevelGenerator:
+    """Seeded chunk layout generator, vectorized over batches of chunks.
+
+    Every chunk draws from its own numpy Generator seeded with (seed, index),
+    so a chunk's layout only depends on the seed and its index: any chunk can
+    be generated on its own, in any order, or as part of a batch, with the
+    same result.
+    """
+
+    def __init__(self, seed: int, rows: int, cols: int):
+        self.seed = seed
+        self.rows = rows
+        self.cols = cols
+
+    def draws(self, index: int):
+        """All random numbers chunk index needs, drawn in a fixed order."""
+        rng = np.random.default_rng([self.seed, index])
+        attempts = rng.random((self.cols, _ATTEMPT_DRAWS))
+        decorations = rng.random((3, self.cols))
+        return attempts, decorations
+
+    def layout(self, index: int, spawn_player: bool = False):
+        """Layout of a single chunk as (tile_map, foreground, background)."""
+        tile_map, foreground, background = self.generate([index], index if spawn_player else None)
+        return tile_map[0], foreground[0], background[0]
+
+    def generate(self, indices, spawnIndex: int = None):
+        """Layouts of many chunks at once as three (n, rows, cols) uint8 arrays."""
+        indices = np.asarray(indices, dtype=np.int64)
+        n, rows, cols = len(indices), self.rows, self.cols
+        draws = [self.draws(int(i)) for i in indices]
+        attempts = np.stack([d[0] for d in draws])  # (n, cols, draws)
+        decorations = np.stack([d[1] for d in draws])  # (n, 3, cols)
+
+        tile_map = np.zeros((n, rows, cols), dtype=np.uint8)
+        foreground = np.zeros((n, rows, cols), dtype=np.uint8)
+        background = np.zeros((n, rows, cols), dtype=np.uint8)
+        chunks = np.arange(n)
+        columns = np.arange(cols)
+
+        # Always having ground at the bottom
+        tile_map[:, rows - 1, :] = TILE_GROUND
+
+        # Platforms: every chunk walks its columns in lockstep, one attempt per step
+        x = np.zeros(n, dtype=np.int64)
+        for step in range(cols):
+            u = attempts[:, step]
+            walking = x < cols
+            if not walking.any():
+                break
+            place = walking & (u[:, 0] < 0.7) & (x < cols - 3)  # 70% chance to place platform
+            kind = PLATFORM_TYPES[np.minimum((u[:, 1] * 3).astype(np.int64), 2)]
+            row, min_len, max_len = kind[:, 0], kind[:, 1], kind[:, 2]
+            length = min_len + (u[:, 2] * (max_len - min_len + 1)).astype(np.int64)
+            # Making sure platform fits
+            length = np.where(x + length >= cols, cols - x - 1, length)
+
+            span = place[:, None] & (columns >= x[:, None]) & (columns < (x + length)[:, None])
+            hit, col = np.nonzero(span)
+            tile_map[hit, row[hit], col] = TILE_PANEL
+
+            enemy = place & (u[:, 3] < 0.4) & (length > 2)  # 40% chance for enemy
+            enemy_col = x + 1 + (u[:, 4] * (length - 1)).astype(np.int64)
+            tile_map[chunks[enemy], row[enemy] - 1, enemy_col[enemy]] = TILE_ENEMY
+
+            gap = 1 + (u[:, 5] * 3).astype(np.int64)  # Skiping some space
+            x = np.where(place, x + length + gap, np.where(walking, x + 1, x))
+
+        # Placing the player last so a platform can't overwrite the spawn tile
+        if spawnIndex is not None:
+            tile_map[indices == spawnIndex, 3, 1] = TILE_PLAYER
+
+        # Adding decorative elements: grass on free ground cells, bricks on even columns
+        grass = (decorations[:, 0] < 0.2) & (tile_map[:, 3, :] == 0)
+        foreground[:, 3, :][grass] = TILE_GRASS
+        brick = (decorations[:, 1] < 0.1) & (columns % 2 == 0)
+        hit, col = np.nonzero(brick)
+        background[hit, (decorations[hit, 2, col] * 3).astype(np.int64), col] = TILE_BRICK
+
+        return tile_map, foreground, background
+
+
+def _prefetchWorker(shmName, shape, free, ready, readyCount, seed, startIndex):
+    """Worker process: fills free slots with consecutive chunks until it receives None."""
+    shm = shared_memory.SharedMemory(name=shmName)
+    slots = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+    try:
+        generator = LevelGenerator(seed, shape[2], shape[3])
+        index = startIndex
+        while True:
+            slot = free.get()
+            if slot is None:
+                break
+            slots[slot] = generator.layout(index)
+            ready.put((slot, index))
+            index += 1
+            with readyCount.get_lock():
+                readyCount.value += 1
+    finally:
+        del slots
+        shm.close()
+
+
+def _startProcess(process):
+    """Starts a spawned process that imports this module and nothing else.
+
+    A spawned child first re-runs the parent's main script, which for the
+    game means loading SDL for nothing; a main module without a file is
+    left alone, so one stands in for the real one while the process starts.
+    """
+    main = sys.modules["__main__"]
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        process.start()
+    finally:
+        sys.modules["__main__"] = main
+
+
+class ChunkPrefetcher:
+    """Keeps up to depth upcoming chunk layouts ready, generated in a worker process.
+
+    Layouts travel through a shared memory block of depth slots; the queues
+    only pass slot numbers, so the bounded prefetch never copies arrays
+    between processes. take() never blocks: it returns None when the worker
+    hasn't caught up and the caller generates the chunk itself.
+
+    The worker runs the same LevelGenerator as the game, from chunk
+    startIndex onwards, so prefetched chunks are identical to ones the
+    game would have generated itself.
+    """
+
+    def __init__(self, seed: int, rows: int, cols: int, startIndex: int, depth: int = 4):
+        self.depth = depth
+        self.shape = (depth, 3, rows, cols)
+        self.shm = shared_memory.SharedMemory(create=True, size=int(np.prod(self.shape)))
+        self.slots = np.ndarray(self.shape, dtype=np.uint8, buffer=self.shm.buf)
+        # spawned, not forked: a fork would copy a process that already runs
+        # SDL, the mixer and the music and asset threads
+        context = mp.get_context("spawn")
+        self.free = context.Queue()
+        self.ready = context.Queue()
+        self.readyCount = context.Value("i", 0)
+        # layouts taken off the queue ahead of the chunk asked for
+        self.buffered = {}
+        self.closed = False
+        for slot in range(depth):
+            self.free.put(slot)
+        self.process = context.Process(
+            target=_prefetchWorker,
+            args=(self.shm.name, self.shape, self.free, self.ready, self.readyCount, seed, startIndex),
+            daemon=True,
+        )
+        try:
+            _startProcess(self.process)
+        except BaseException:
+            self._release()
+            raise
+
+    @property
+    def readyDepth(self) -> int:
+        """Layouts waiting in the queue."""
+        return self.readyCount.value + len(self.buffered)
+
+    def take(self, index: int):
+        """Returns chunk index's prefetched layout, or None if it isn't ready."""
+        if self.closed:
+            return None
+        while index not in self.buffered and self.readyCount.value > 0:
+            slot, slotIndex = self.ready.get()
+            with self.readyCount.get_lock():
+                self.readyCount.value -= 1
+            self.buffered[slotIndex] = tuple(a.copy() for a in self.slots[slot])
+            self.free.put(slot)
+        # chunks behind the one asked for won't be asked for again
+        for stale in [i for i in self.buffered if i < index]:
+            del self.buffered[stale]
+        layout = self.buffered.pop(index, None)
+        if layout is None and self.readyCount.value == 0 and not self.process.is_alive():
+            # the worker died: nothing more is coming, give the memory back now
+            print(f"Chunk prefetch worker exited with code {self.process.exitcode}")
+            self.close()
+        return layout
+
+    def close(self):
+        """Stops the worker and unlinks the shared memory block; safe to call twice."""
+        if self.closed:
+            return
+        try:
+            self.free.put(None)
+            self.process.join(timeout=1.0)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join(timeout=1.0)
+        finally:
+            self._release()
+
+    def _release(self):
+        self.closed = True
+        self.slots = None
+        self.shm.close()
+        self.shm.unlink()
@@ -0,0 +1,187 @@
+import queue
+import threading
+from collections import OrderedDict
+
+
+class MusicManager:
+    """Background music tracks, decoded on a worker thread and crossfaded.
+
+    Tracks are decoded into memory off the frame loop, so switching costs
+    the main thread nothing: the new track fades in on one reserved mixer
+    channel while the old one fades out on the other. Decoded tracks are
+    kept, least recently played first out, while they fit in memoryCap
+    bytes; the track after the current one is decoded ahead so the next
+    switch is instant. If the audio backend can't decode a track into
+    memory, it is streamed instead, without the crossfade.
+    """
+
+    def __init__(self, audio, paths, memoryCap: int, fadeMs: int = 1500, volume: int = 64):
+        self.audio = audio
+        self.paths = list(paths)
+        self.memoryCap = memoryCap
+        self.fadeMs = fadeMs
+        self.volume = volume
+        # path -> decoded track, least recently played first
+        self.decoded: OrderedDict = OrderedDict()
+        # path -> streamed track, for tracks that couldn't be decoded
+        self.streamed: dict = {}
+        self.decodedBytes = 0
+        self.requested: set = set()
+        # music channel -> path playing (or fading out) on it
+        self.channels = [None] * len(audio.MUSIC_CHANNELS)
+        self.current = None
+        self.pending = None
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        self.worker = threading.Thread(target=self._decodeTracks, name="music-decoder", daemon=True)
+        self.worker.start()
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def _decodeTracks(self):
+        """Worker thread: decodes requested paths until it receives None."""
+        while True:
+            path = self.requests.get()
+            if path is None:
+                break
+            track = self.audio.decode_music(path)
+            streamed = None
+            if track is None:
+                streamed = self.audio.load_music(path)
+            self.results.put((path, track, streamed))
+
+    def _request(self, path: str):
+        if path in self.decoded or path in self.streamed or path in self.requested:
+            return
+        self.requested.add(path)
+        self.requests.put(path)
+
+    def play(self, index: int):
+        """Switches to track index as soon as it is decoded."""
+        if not self.paths:
+            return
+        self.pending = index % len(self.paths)
+        self._request(self.paths[self.pending])
+        self.update()
+
+    def next(self):
+        """Switches to the track after the current (or the already requested) one."""
+        index = self.pending if self.pending is not None else self.current
+        self.play(0 if index is None else index + 1)
+
+    def update(self):
+        """Called once per frame: collects decoded tracks, starts a waiting switch and trims memory."""
+        while True:
+            try:
+                path, track, streamed = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.requested.discard(path)
+            if track is not None:
+                self.decoded[path] = track
+                self.decodedBytes += self.audio.sound_bytes(track)
+            elif streamed is not None:
+                self.streamed[path] = streamed
+            else:
+                print(f"Failed to load music: {path}")
+                if self.pending is not None and self.paths[self.pending] == path:
+                    self.pending = None
+
+        if self.pending is not None:
+            path = self.paths[self.pending]
+            if path in self.decoded or path in self.streamed:
+                self._switch(self.pending)
+                self.pending = None
+
+        self._trim()
+
+        # decode the next track ahead once the last switch has faded out
+        if self.current is not None and self.pending is None and not self._fading():
+            self._request(self.paths[(self.current + 1) % len(self.paths)])
+
+    def _switch(self, index: int):
+        audio = self.audio
+        path = self.paths[index]
+        self.current = index
+        if path in self.streamed:
+            # streamed music has a single mixer stream: stop the crossfade and fade in alone
+            for slot, playing in enumerate(self.channels):
+                if playing is not None:
+                    audio.stop_channel(audio.MUSIC_CHANNELS[slot])
+                    self.channels[slot] = None
+            audio.set_music_volume(self.volume)
+            audio.fade_in_music(self.streamed[path], self.fadeMs)
+            return
+
+        audio.halt_music()
+        track = self.decoded[path]
+        self.decoded.move_to_end(path)
+        # fade in on a free music channel, fade out whatever plays on the others
+        slot = self.channels.index(None) if None in self.channels else 0
+        for other, playing in enumerate(self.channels):
+            if other != slot and playing is not None:
+                audio.fade_out_channel(audio.MUSIC_CHANNELS[other], self.fadeMs)
+        channel = audio.MUSIC_CHANNELS[slot]
+        audio.stop_channel(channel)
+        audio.set_channel_volume(channel, self.volume)
+        audio.fade_in_channel(channel, track, self.fadeMs)
+        self.channels[slot] = path
+
+    def _fading(self) -> bool:
+        """True while a track other than the current one is still audible."""
+        current = self.paths[self.current] if self.current is not None else None
+        return any(
+            path is not None and path != current and self.audio.is_playing(self.audio.MUSIC_CHANNELS[slot])
+            for slot, path in enumerate(self.channels)
+        )
+
+    def _trim(self):
+        """Frees decoded tracks that aren't audible until the rest fit in memoryCap."""
+        audio = self.audio
+        for slot, path in enumerate(self.channels):
+            if path is not None and not audio.is_playing(audio.MUSIC_CHANNELS[slot]):
+                self.channels[slot] = None
+        current = self.paths[self.current] if self.current is not None else None
+        for path in list(self.decoded):
+            if self.decodedBytes <= self.memoryCap:
+                break
+            if path == current or path in self.channels:
+                continue
+            track = self.decoded.pop(path)
+            self.decodedBytes -= audio.sound_bytes(track)
+            audio.free_sound(track)
+
+    def stats(self) -> dict:
+        return {
+            "tracks": len(self.paths),
+            "current": self.current,
+            "decoded": len(self.decoded),
+            "decoded_bytes": self.decodedBytes,
+        }
+
+    def close(self):
+        """Stops the worker and frees every track."""
+        self.requests.put(None)
+        self.worker.join(timeout=5.0)
+        audio = self.audio
+        for channel in audio.MUSIC_CHANNELS:
+            audio.stop_channel(channel)
+        audio.halt_music()
+        # a decode still running when the worker was asked to stop lands here
+        while True:
+            try:
+                path, track, streamed = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if track is not None:
+                self.decoded.setdefault(path, track)
+            if streamed is not None:
+                self.streamed.setdefault(path, streamed)
+        for track in self.decoded.values():
+            audio.free_sound(track)
+        for streamed in self.streamed.values():
+            audio.free_music(streamed)
+        self.decoded.clear()
+        self.streamed.clear()
+        self.decodedBytes = 0
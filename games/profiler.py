@@ -0,0 +1,93 @@
+import csv
+import time
+
+import numpy as np
+
+# Main loop phases in the order they run
+PHASES = (
+    "events",
+    "chunks",
+    "entities",
+    "bullets",
+    "cleanup",
+    "background",
+    "tiles",
+    "draw",
+    "overlay",
+    "present",
+)
+
+
+class FrameProfiler:
+    """Per-phase frame timings kept in a fixed-size ring buffer.
+
+    Call beginFrame() at the top of the loop, lap(phase) after each phase to
+    charge the time since the previous lap to it, and endFrame() once the
+    frame is presented. A phase can be lapped several times per frame (one
+    simulation step after another); its times add up.
+    """
+
+    def __init__(self, capacity: int = 240):
+        self.capacity = capacity
+        self.phaseIndex = {name: i for i, name in enumerate(PHASES)}
+        # seconds per (frame slot, phase) and the matching frame numbers
+        self.times = np.zeros((capacity, len(PHASES)))
+        self.frames = np.zeros(capacity, dtype=np.int64)
+        self.count = 0  # frames recorded so far
+        self.current = np.zeros(len(PHASES))
+        self._last = time.perf_counter()
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def beginFrame(self):
+        self.current[:] = 0.0
+        self._last = time.perf_counter()
+
+    def lap(self, phase: str):
+        now = time.perf_counter()
+        self.current[self.phaseIndex[phase]] += now - self._last
+        self._last = now
+
+    def endFrame(self):
+        slot = self.count % self.capacity
+        self.times[slot] = self.current
+        self.frames[slot] = self.count
+        self.count += 1
+
+    def _order(self) -> np.ndarray:
+        """Ring slots holding recorded frames, oldest first."""
+        n = len(self)
+        start = self.count % self.capacity if self.count > self.capacity else 0
+        return (np.arange(n) + start) % self.capacity
+
+    def frameTimes(self) -> np.ndarray:
+        """Total time of each recorded frame in seconds, oldest first."""
+        return self.times[self._order()].sum(axis=1)
+
+    def averages(self) -> np.ndarray:
+        """Mean seconds per phase over the buffer."""
+        if not len(self):
+            return np.zeros(len(PHASES))
+        return self.times[: len(self)].mean(axis=0)
+
+    def worstFrame(self) -> np.ndarray:
+        """Phase breakdown of the slowest frame in the buffer."""
+        if not len(self):
+            return np.zeros(len(PHASES))
+        rows = self.times[: len(self)]
+        return rows[rows.sum(axis=1).argmax()]
+
+    def dumpCSV(self, filepath: str):
+        """Writes the buffer oldest first, one row per frame, times in milliseconds."""
+        order = self._order()
+        with open(filepath, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(("frame", "total_ms") + tuple(f"{p}_ms" for p in PHASES))
+            for slot in order:
+                row = self.times[slot] * 1000.0
+                writer.writerow(
+                    [int(self.frames[slot]), f"{row.sum():.4f}"]
+                    + [f"{v:.4f}" for v in row]
+                )
+        return len(order)
@@ -0,0 +1,121 @@
+class SoundEvent:
+    """A sound gameplay asked for this frame, merged with its duplicates."""
+
+    __slots__ = ("chunk", "volume", "priority", "count")
+
+    def __init__(self, chunk, volume: float, priority: int):
+        self.chunk = chunk
+        self.volume = volume
+        self.priority = priority
+        self.count = 1
+
+
+class Voice:
+    """A sound the queue started, until its length has played out."""
+
+    __slots__ = ("channel", "chunk", "priority", "endTime")
+
+    def __init__(self, channel: int, chunk, priority: int, endTime: float):
+        self.channel = channel
+        self.chunk = chunk
+        self.priority = priority
+        self.endTime = endTime
+
+
+class SoundQueue:
+    """Collects sound events during a frame and plays them in one go.
+
+    Events of the same sound in a frame are merged into one, at the
+    loudest requested volume. Events with a position are attenuated the
+    further outside the viewport they are, and dropped beyond
+    cullDistance. At most perSound voices of one sound and maxVoices in
+    total play at once; when every voice is busy a new sound replaces the
+    lowest priority voice playing, if it has a higher priority itself.
+    """
+
+    def __init__(self, maxVoices: int = 8, perSound: int = 2, cullDistance: float = 320.0):
+        self.maxVoices = maxVoices
+        self.perSound = perSound
+        self.cullDistance = cullDistance
+        # id(chunk) -> event, in the order sounds were first asked for
+        self.events: dict[int, SoundEvent] = {}
+        self.voices: list[Voice] = []
+        self.time = 0.0
+        # counters since the queue was created
+        self.requested = 0
+        self.merged = 0
+        self.culled = 0
+        self.limited = 0
+        self.stolen = 0
+        self.played = 0
+
+    def post(self, chunk, volume: float = 128, priority: int = 0, x: float = None, y: float = None, viewport=None):
+        """Asks for chunk to be played; with x, y and viewport it is attenuated by distance."""
+        if not chunk:
+            return
+        self.requested += 1
+        if viewport is not None and x is not None:
+            outside = max(
+                viewport.x - x,
+                x - (viewport.x + viewport.w),
+                viewport.y - y,
+                y - (viewport.y + viewport.h),
+                0.0,
+            )
+            if outside >= self.cullDistance:
+                self.culled += 1
+                return
+            volume *= 1.0 - outside / self.cullDistance
+        event = self.events.get(id(chunk))
+        if event is None:
+            self.events[id(chunk)] = SoundEvent(chunk, volume, priority)
+            return
+        event.count += 1
+        event.volume = max(event.volume, volume)
+        event.priority = max(event.priority, priority)
+        self.merged += 1
+
+    def flush(self, audio, elapsed: float):
+        """Plays this frame's events on audio, highest priority first; elapsed is the frame time."""
+        self.time += elapsed
+        now = self.time
+        self.voices = [v for v in self.voices if v.endTime > now]
+        if not self.events:
+            return
+        events = sorted(self.events.values(), key=lambda e: -e.priority)
+        self.events.clear()
+
+        for event in events:
+            same = sum(1 for v in self.voices if v.chunk is event.chunk)
+            if same >= self.perSound:
+                self.limited += 1
+                continue
+            if len(self.voices) >= self.maxVoices:
+                victim = min(self.voices, key=lambda v: (v.priority, v.endTime))
+                if victim.priority >= event.priority:
+                    self.limited += 1
+                    continue
+                audio.stop_channel(victim.channel)
+                self.voices.remove(victim)
+                self.stolen += 1
+            channel = audio.play_sound(event.chunk, int(event.volume))
+            if channel < 0:
+                continue
+            self.voices.append(
+                Voice(channel, event.chunk, event.priority, now + audio.sound_length(event.chunk))
+            )
+            self.played += 1
+
+    def clear(self):
+        self.events.clear()
+        self.voices.clear()
+
+    def stats(self) -> dict:
+        return {
+            "requested": self.requested,
+            "played": self.played,
+            "merged": self.merged,
+            "culled": self.culled,
+            "limited": self.limited,
+            "stolen": self.stolen,
+        }
@@ -0,0 +1,107 @@
+import math
+
+
+class SpatialHash:
+    """Uniform grid broadphase that buckets objects by the cell of their collider centre.
+
+    The cell size must be at least as large as the biggest collider stored in the
+    grid, so that any two overlapping objects always sit in the same or adjacent
+    cells.
+    """
+
+    def __init__(self, cellSize: float = 64.0):
+        self.cellSize = float(cellSize)
+        # cell key -> insertion ordered set of objects (dict keeps iteration deterministic)
+        self.cells: dict[tuple[int, int], dict] = {}
+        self.objectCells: dict = {}
+        # obj -> insertion sequence number, to hand query results back in a stable order
+        self.order: dict = {}
+        self._nextOrder = 0
+        # debug counters, reset once per frame
+        self.candidatePairs = 0
+        self.overlaps = 0
+
+    def cellAt(self, x: float, y: float) -> tuple[int, int]:
+        return (math.floor(x / self.cellSize), math.floor(y / self.cellSize))
+
+    def cellOf(self, obj) -> tuple[int, int]:
+        return self.cellAt(
+            obj.position.x + obj.collider.x + obj.collider.w / 2,
+            obj.position.y + obj.collider.y + obj.collider.h / 2,
+        )
+
+    def insert(self, obj):
+        key = self.cellOf(obj)
+        self.cells.setdefault(key, {})[obj] = None
+        self.objectCells[obj] = key
+        self.order[obj] = self._nextOrder
+        self._nextOrder += 1
+
+    def remove(self, obj):
+        key = self.objectCells.pop(obj, None)
+        if key is None:
+            return
+        del self.order[obj]
+        cell = self.cells[key]
+        del cell[obj]
+        if not cell:
+            del self.cells[key]
+
+    def move(self, obj):
+        """Re-buckets obj after it moved; cheap when it stays in the same cell."""
+        old = self.objectCells.get(obj)
+        if old is None:
+            return
+        key = self.cellOf(obj)
+        if key == old:
+            return
+        cell = self.cells[old]
+        del cell[obj]
+        if not cell:
+            del self.cells[old]
+        self.cells.setdefault(key, {})[obj] = None
+        self.objectCells[obj] = key
+
+    def __contains__(self, obj) -> bool:
+        return obj in self.objectCells
+
+    def __len__(self) -> int:
+        return len(self.objectCells)
+
+    def neighbours(self, obj):
+        """Yields every other object in obj's cell and the eight cells around it."""
+        cx, cy = self.cellOf(obj)
+        cells = self.cells
+        for x in (cx - 1, cx, cx + 1):
+            for y in (cy - 1, cy, cy + 1):
+                cell = cells.get((x, y))
+                if not cell:
+                    continue
+                # copy so collision responses can re-bucket objects while we iterate
+                for other in tuple(cell):
+                    if other is not obj:
+                        yield other
+
+    def query(self, x: float, y: float, w: float, h: float):
+        """Yields objects whose cell overlaps the given rectangle (grown by one cell)."""
+        x0, y0 = self.cellAt(x, y)
+        x1, y1 = self.cellAt(x + w, y + h)
+        cells = self.cells
+        for cx in range(x0 - 1, x1 + 2):
+            for cy in range(y0 - 1, y1 + 2):
+                cell = cells.get((cx, cy))
+                if cell:
+                    yield from tuple(cell)
+
+    def queryOrdered(self, x: float, y: float, w: float, h: float) -> list:
+        """Like query, but sorted by insertion order so overlapping sprites keep their layering."""
+        return sorted(self.query(x, y, w, h), key=self.order.__getitem__)
+
+    def resetCounters(self):
+        self.candidatePairs = 0
+        self.overlaps = 0
+
+    def clear(self):
+        self.cells.clear()
+        self.objectCells.clear()
+        self.order.clear()
@@ -0,0 +1,88 @@
+import ctypes
+from array import array
+
+import sdl3
+
+# Two triangles per quad over its corners, clockwise from top-left
+_QUAD_INDICES = (0, 1, 2, 2, 3, 0)
+WHITE = (1.0, 1.0, 1.0, 1.0)
+
+
+class SpriteBatch:
+    """Gathers textured quads and submits each run sharing a texture as one SDL_RenderGeometry call.
+
+    Sprites are AtlasRegions, so everything packed into the same atlas
+    lands in the same run. Quads are drawn in submission order: switching
+    texture flushes the pending run, so layering is the same as with one
+    SDL_RenderTexture call per sprite. Anything drawn straight through the
+    renderer between sprites must call flush() first.
+
+    Vertices are packed as SDL_Vertex (position, float colour, texture
+    coordinate), eight floats each, straight into a reusable float array.
+    """
+
+    def __init__(self):
+        self.renderer = None
+        self.texture = None
+        self.vertices = array("f")
+        self.indices = array("i")
+        self.quads = 0  # quads waiting in the current run
+        # per-frame counters for the debug overlay
+        self.sprites = 0
+        self.drawCalls = 0
+
+    def begin(self, renderer):
+        self.renderer = renderer
+        self.sprites = 0
+        self.drawCalls = 0
+
+    def end(self):
+        self.flush()
+        self.texture = None
+
+    def draw(self, region, x, y, w, h, src=None, flip=False, color=WHITE):
+        """Queues a quad at (x, y, w, h) showing src (sx, sy, sw, sh) of region, or all of it if None."""
+        if region.texture is not self.texture:
+            self.flush()
+            self.texture = region.texture
+        if src is None:
+            sx, sy, sw, sh = region.x, region.y, region.w, region.h
+        else:
+            sx, sy, sw, sh = src
+            sx += region.x
+            sy += region.y
+        u0 = sx * region.u
+        v0 = sy * region.v
+        u1 = (sx + sw) * region.u
+        v1 = (sy + sh) * region.v
+        if flip:
+            u0, u1 = u1, u0
+        x0, y0 = x, y
+        x1, y1 = x + w, y + h
+        r, g, b, a = color
+        self.vertices.extend((
+            x0, y0, r, g, b, a, u0, v0,
+            x1, y0, r, g, b, a, u1, v0,
+            x1, y1, r, g, b, a, u1, v1,
+            x0, y1, r, g, b, a, u0, v1,
+        ))
+        self.quads += 1
+        self.sprites += 1
+
+    def flush(self):
+        """Submits the pending run of quads."""
+        if not self.quads:
+            return
+        count = self.quads
+        if len(self.indices) < count * 6:
+            self.indices.extend(
+                base + i
+                for base in range(len(self.indices) // 6 * 4, count * 4, 4)
+                for i in _QUAD_INDICES
+            )
+        vertices = ctypes.cast(self.vertices.buffer_info()[0], ctypes.POINTER(sdl3.SDL_Vertex))
+        indices = ctypes.cast(self.indices.buffer_info()[0], ctypes.POINTER(ctypes.c_int))
+        sdl3.SDL_RenderGeometry(self.renderer, self.texture, vertices, count * 4, indices, count * 6)
+        self.drawCalls += 1
+        del self.vertices[:]
+        self.quads = 0
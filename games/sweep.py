@@ -0,0 +1,85 @@
+"""Swept box tests for fast movers.
+
+A box moving along a segment is tested against other boxes and the solid
+cells of a TileGrid, reporting the first thing it touches and the time of
+impact as a fraction of the segment. Unlike testing the end position only,
+nothing thinner than one step's motion can be skipped over.
+Like levelgen, this module must not import SDL.
+"""
+import math
+
+from tilegrid import TILE_EMPTY
+
+
+def sweepBox(x: float, y: float, w: float, h: float, dx: float, dy: float,
+             bx: float, by: float, bw: float, bh: float):
+    """Time in [0, 1) at which box (x, y, w, h) moving by (dx, dy) first overlaps box b, or None.
+
+    Boxes that already overlap at the start hit at 0; touching edges don't count.
+    """
+    # the moving box's corner against b grown by the moving box's size
+    tEnter = 0.0
+    tExit = 1.0
+    for p, d, lo, hi in ((x, dx, bx - w, bx + bw), (y, dy, by - h, by + bh)):
+        if d == 0.0:
+            if p <= lo or p >= hi:
+                return None
+            continue
+        t0 = (lo - p) / d
+        t1 = (hi - p) / d
+        if t0 > t1:
+            t0, t1 = t1, t0
+        tEnter = max(tEnter, t0)
+        tExit = min(tExit, t1)
+        if tEnter >= tExit:
+            return None
+    return tEnter
+
+
+def castTiles(tiles, x: float, y: float, w: float, h: float, dx: float, dy: float):
+    """First solid cell box (x, y, w, h) runs into moving by (dx, dy), as (t, col, row), or None.
+
+    Walks the cells under the box's top-left corner with a DDA and tests
+    the solid cells the box covers while the corner is in each one, so a
+    step costs a few cell visits however long the segment is.
+    """
+    ts = tiles.tileSize
+    oy = tiles.originY
+    col = math.floor(x / ts)
+    row = math.floor((y - oy) / ts)
+    # segment time at which the corner crosses the next column / row line
+    tMaxX = ((col + (dx > 0)) * ts - x) / dx if dx else math.inf
+    tMaxY = ((row + (dy > 0)) * ts + oy - y) / dy if dy else math.inf
+    tDeltaX = ts / abs(dx) if dx else math.inf
+    tDeltaY = ts / abs(dy) if dy else math.inf
+
+    best = None
+    visited = set()
+    tStart = 0.0
+    while True:
+        tEnd = min(tMaxX, tMaxY, 1.0)
+        # cells the box covers while the corner moves from tStart to tEnd
+        xa, xb = sorted((x + dx * tStart, x + dx * tEnd))
+        ya, yb = sorted((y + dy * tStart, y + dy * tEnd))
+        c0 = math.floor(xa / ts)
+        c1 = math.floor((xb + w) / ts)
+        r0 = max(math.floor((ya - oy) / ts), 0)
+        r1 = min(math.floor((yb + h - oy) / ts), tiles.rows - 1)
+        for r in range(r0, r1 + 1):
+            for c in range(c0, c1 + 1):
+                if (c, r) in visited:
+                    continue
+                visited.add((c, r))
+                if tiles.tileAt(c, r) == TILE_EMPTY:
+                    continue
+                t = sweepBox(x, y, w, h, dx, dy, c * ts, oy + r * ts, ts, ts)
+                if t is not None and (best is None or t < best[0]):
+                    best = (t, c, r)
+        # cells covered later can only be hit later than this step ends
+        if tEnd >= 1.0 or (best is not None and best[0] <= tEnd):
+            return best
+        tStart = tEnd
+        if tMaxX < tMaxY:
+            tMaxX += tDeltaX
+        else:
+            tMaxY += tDeltaY
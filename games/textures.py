@@ -0,0 +1,146 @@
+import ctypes
+
+import sdl3
+import sdl3.SDL_image as sdlimage
+
+from backends import NullTexture
+
+# Textures are uploaded as 32-bit RGBA
+BYTES_PER_PIXEL = 4
+
+
+class TextureInfo:
+    """Metadata kept for a texture so nothing needs to ask SDL for it again."""
+
+    __slots__ = ("handle", "key", "cacheKey", "width", "height", "scaleMode", "path", "refs")
+
+    def __init__(self, handle, key, width: float, height: float, scaleMode, path: str, refs: int):
+        self.handle = handle
+        self.key = key
+        self.cacheKey = None
+        self.width = width
+        self.height = height
+        self.scaleMode = scaleMode
+        self.path = path
+        self.refs = refs
+
+    @property
+    def bytes(self) -> int:
+        return int(self.width * self.height) * BYTES_PER_PIXEL
+
+    def __repr__(self):
+        return f"TextureInfo({self.path!r}, {self.width}x{self.height}, refs={self.refs})"
+
+
+def handleKey(handle):
+    """Address of the SDL object, the same for every pointer object to it."""
+    if handle is None:
+        return None
+    if isinstance(handle, NullTexture):
+        return id(handle)
+    return ctypes.cast(handle, ctypes.c_void_p).value
+
+
+class TextureRegistry:
+    """Owns every texture the game creates.
+
+    Loaded files are cached by path, so loading one again shares the
+    texture, and they stay until clear(): Resources holds every file for the
+    whole session, so they aren't reference counted. Generated textures
+    (atlases, render targets) are added with register() and destroyed by
+    release() when their last reference goes.
+    """
+
+    def __init__(self):
+        self.byKey: dict = {}
+        # (renderer, path) -> loaded file; textures belong to the renderer that made them
+        self.byPath: dict[tuple, TextureInfo] = {}
+        self.memoryBytes = 0
+
+    def __len__(self) -> int:
+        return len(self.byKey)
+
+    def __iter__(self):
+        return iter(self.byKey.values())
+
+    def load(self, renderer, path: str, scaleMode=sdl3.SDL_SCALEMODE_NEAREST, surface=None):
+        """Returns path's texture, loading it on first use. None if it can't be loaded.
+
+        surface, if given, is path already decoded; it is uploaded instead of
+        reading the file again and destroyed either way.
+        """
+        cacheKey = (handleKey(renderer), path)
+        info = self.byPath.get(cacheKey)
+        if info is not None:
+            if surface is not None:
+                sdl3.SDL_DestroySurface(surface)
+            return info
+        if renderer is None:
+            # null render backend: only the size is needed
+            handle = NullTexture.from_file(path)
+        elif surface is not None:
+            handle = sdl3.SDL_CreateTextureFromSurface(renderer, surface)
+            sdl3.SDL_DestroySurface(surface)
+            if not handle:
+                print(f"Failed to create texture: {path}")
+                return None
+        else:
+            handle = sdlimage.IMG_LoadTexture(renderer, path.encode("utf-8"))
+            if not handle:
+                print(f"Failed to load texture: {path}")
+                return None
+        info = self.register(handle, path=path, scaleMode=scaleMode)
+        info.cacheKey = cacheKey
+        self.byPath[cacheKey] = info
+        return info
+
+    def register(self, handle, width: float = None, height: float = None, path: str = None, scaleMode=sdl3.SDL_SCALEMODE_NEAREST):
+        """Takes ownership of a texture created elsewhere, holding one reference."""
+        if isinstance(handle, NullTexture):
+            width, height = handle.width, handle.height
+        else:
+            if width is None or height is None:
+                w = ctypes.c_float()
+                h = ctypes.c_float()
+                sdl3.SDL_GetTextureSize(handle, ctypes.byref(w), ctypes.byref(h))
+                width, height = w.value, h.value
+            sdl3.SDL_SetTextureScaleMode(handle, scaleMode)
+        info = TextureInfo(handle, handleKey(handle), width, height, scaleMode, path, 1)
+        self.byKey[info.key] = info
+        self.memoryBytes += info.bytes
+        return info
+
+    def info(self, handle) -> TextureInfo:
+        return self.byKey.get(handleKey(handle))
+
+    def release(self, info: TextureInfo):
+        """Drops a reference to a generated texture, destroying it with the last one.
+
+        Loaded files aren't counted and stay until clear().
+        """
+        if info.path is not None:
+            return
+        info.refs -= 1
+        if info.refs <= 0:
+            self.destroy(info)
+
+    def destroy(self, info: TextureInfo):
+        if self.byKey.pop(info.key, None) is None:
+            return
+        self.memoryBytes -= info.bytes
+        if info.cacheKey is not None:
+            self.byPath.pop(info.cacheKey, None)
+        if not isinstance(info.handle, NullTexture):
+            sdl3.SDL_DestroyTexture(info.handle)
+
+    def clear(self):
+        for info in list(self.byKey.values()):
+            self.destroy(info)
+
+    def stats(self) -> dict:
+        """Counts and memory for telemetry."""
+        return {
+            "textures": len(self.byKey),
+            "referenced": sum(1 for info in self.byKey.values() if info.refs > 0),
+            "bytes": self.memoryBytes,  # estimated at 4 bytes per pixel
+        }
@@ -0,0 +1,208 @@
+import math
+from collections import deque
+
+import numpy as np
+
+TILE_EMPTY = 0
+
+
+class Chunk:
+    """Static tile occupancy of one generated level chunk."""
+
+    def __init__(self, index: int, startX: float, width: float, rows: int, cols: int):
+        self.index = index
+        self.startX = startX
+        self.endX = startX + width
+        # tile id per cell, 0 means empty
+        self.tiles = np.zeros((rows, cols), dtype=np.uint8)
+        # (row, col) -> level GameObject occupying that cell
+        self.objects = {}
+        # decorative tiles drawn behind and in front of the characters
+        self.background = []
+        self.foreground = []
+        # render-target textures the static tiles are baked into, None until drawn
+        self.backLayer = None
+        self.frontLayer = None
+
+
+class TileGrid:
+    """World level index of static level tiles, answering queries by index math.
+
+    Rectangle queries treat touching edges as overlapping, the same way
+    SDL_HasRectIntersectionFloat does for the sensors they replace.
+    """
+
+    def __init__(self, tileSize: int, rows: int, cols: int, originY: float):
+        self.tileSize = tileSize
+        self.rows = rows
+        self.cols = cols
+        self.originY = originY
+        self.chunkWidth = cols * tileSize
+        self.chunks: dict[int, Chunk] = {}
+        # resident chunks left to right; they are only ever added and evicted at the ends
+        self.order: deque[Chunk] = deque()
+
+    # Chunk management
+    def chunkIndexAt(self, x: float) -> int:
+        return math.floor(x / self.chunkWidth)
+
+    def createChunk(self, startX: float) -> Chunk:
+        chunk = Chunk(
+            self.chunkIndexAt(startX), startX, self.chunkWidth, self.rows, self.cols
+        )
+        order = self.order
+        if not order or chunk.index > order[-1].index:
+            order.append(chunk)
+        elif chunk.index < order[0].index:
+            order.appendleft(chunk)
+        else:
+            order.insert(sum(1 for c in order if c.index < chunk.index), chunk)
+        self.chunks[chunk.index] = chunk
+        return chunk
+
+    def removeChunksBefore(self, min_x: float) -> list:
+        """Drops every chunk whose right edge is left of min_x and returns them."""
+        removed = []
+        while self.order and self.order[0].endX < min_x:
+            chunk = self.order.popleft()
+            del self.chunks[chunk.index]
+            removed.append(chunk)
+        return removed
+
+    def removeChunksAfter(self, max_x: float) -> list:
+        """Drops every chunk whose left edge is right of max_x and returns them."""
+        removed = []
+        while self.order and self.order[-1].startX > max_x:
+            chunk = self.order.pop()
+            del self.chunks[chunk.index]
+            removed.append(chunk)
+        return removed
+
+    def setTile(self, col: int, row: int, tile: int, obj=None):
+        chunk = self.chunks.get(col // self.cols)
+        if chunk is None or not 0 <= row < self.rows:
+            return
+        c = col % self.cols
+        chunk.tiles[row, c] = tile
+        if obj is not None:
+            chunk.objects[(row, c)] = obj
+        else:
+            chunk.objects.pop((row, c), None)
+
+    def removeObject(self, obj):
+        """Clears the cell occupied by a level object."""
+        col, row = self.cellAt(obj.position.x, obj.position.y)
+        self.setTile(col, row, TILE_EMPTY)
+
+    # Cell math
+    def cellAt(self, x: float, y: float) -> tuple[int, int]:
+        return (
+            math.floor(x / self.tileSize),
+            math.floor((y - self.originY) / self.tileSize),
+        )
+
+    def cellTop(self, row: int) -> float:
+        return self.originY + row * self.tileSize
+
+    def cellLeft(self, col: int) -> float:
+        return col * self.tileSize
+
+    def tileAt(self, col: int, row: int) -> int:
+        if not 0 <= row < self.rows:
+            return TILE_EMPTY
+        chunk = self.chunks.get(col // self.cols)
+        if chunk is None:
+            return TILE_EMPTY
+        return int(chunk.tiles[row, col % self.cols])
+
+    def objectAt(self, col: int, row: int):
+        chunk = self.chunks.get(col // self.cols)
+        if chunk is None:
+            return None
+        return chunk.objects.get((row, col % self.cols))
+
+    # Queries
+    def solidAt(self, x: float, y: float) -> bool:
+        col, row = self.cellAt(x, y)
+        return self.tileAt(col, row) != TILE_EMPTY
+
+    def cellsInRect(self, x: float, y: float, w: float, h: float):
+        """Yields (col, row) of every solid cell overlapping the rectangle."""
+        col0, row0 = self.cellAt(x, y)
+        col1, row1 = self.cellAt(x + w, y + h)
+        row0 = max(row0, 0)
+        row1 = min(row1, self.rows - 1)
+        for row in range(row0, row1 + 1):
+            for col in range(col0, col1 + 1):
+                if self.tileAt(col, row) != TILE_EMPTY:
+                    yield col, row
+
+    def firstSolidInRect(self, x: float, y: float, w: float, h: float):
+        """Returns (col, row) of the top-left-most solid cell in the rectangle, or None."""
+        return next(self.cellsInRect(x, y, w, h), None)
+
+    def solidInRect(self, x: float, y: float, w: float, h: float) -> bool:
+        return self.firstSolidInRect(x, y, w, h) is not None
+
+    def tilesAt(self, cols: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Tile ids of many cells at once; like tileAt, empty outside the rows or resident chunks."""
+        tiles = np.zeros(cols.shape, dtype=np.uint8)
+        inside = (rows >= 0) & (rows < self.rows)
+        chunkIndex = cols // self.cols
+        # one gather per chunk the cells fall in, usually a handful
+        for index in np.unique(chunkIndex[inside]).tolist():
+            chunk = self.chunks.get(index)
+            if chunk is None:
+                continue
+            cells = inside & (chunkIndex == index)
+            tiles[cells] = chunk.tiles[rows[cells], cols[cells] % self.cols]
+        return tiles
+
+    def solidInRects(self, x: np.ndarray, y: np.ndarray, w: float, h: float) -> np.ndarray:
+        """solidInRect for arrays of rectangles no bigger than a tile, as a bool array."""
+        ts = self.tileSize
+        col0 = np.floor(x / ts).astype(np.int64)
+        row0 = np.floor((y - self.originY) / ts).astype(np.int64)
+        col1 = np.floor((x + w) / ts).astype(np.int64)
+        row1 = np.floor((y + h - self.originY) / ts).astype(np.int64)
+        # a rectangle this small overlaps at most the cells at its four corners
+        corners = self.tilesAt(
+            np.concatenate((col0, col1, col0, col1)),
+            np.concatenate((row0, row0, row1, row1)),
+        )
+        return (corners.reshape(4, -1) != TILE_EMPTY).any(axis=0)
+
+    def objectsInRect(self, x: float, y: float, w: float, h: float):
+        """Yields the level objects occupying solid cells in the rectangle."""
+        for col, row in self.cellsInRect(x, y, w, h):
+            obj = self.objectAt(col, row)
+            if obj is not None:
+                yield obj
+
+    def rowSpan(self, row: int, col0: int, col1: int) -> np.ndarray:
+        """Tile ids of row between columns col0 and col1 (inclusive)."""
+        span = np.zeros(col1 - col0 + 1, dtype=np.uint8)
+        if not 0 <= row < self.rows:
+            return span
+        col = col0
+        while col <= col1:
+            chunkIndex = col // self.cols
+            start = col % self.cols
+            stop = min(self.cols, start + col1 - col + 1)
+            chunk = self.chunks.get(chunkIndex)
+            if chunk is not None:
+                span[col - col0 : col - col0 + stop - start] = chunk.tiles[row, start:stop]
+            col += stop - start
+        return span
+
+    def columnSpan(self, col: int, row0: int, row1: int) -> np.ndarray:
+        """Tile ids of column col between rows row0 and row1 (inclusive)."""
+        span = np.zeros(row1 - row0 + 1, dtype=np.uint8)
+        chunk = self.chunks.get(col // self.cols)
+        if chunk is None:
+            return span
+        lo = max(row0, 0)
+        hi = min(row1, self.rows - 1)
+        if lo <= hi:
+            span[lo - row0 : hi - row0 + 1] = chunk.tiles[lo : hi + 1, col % self.cols]
+        return span
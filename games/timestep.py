@@ -0,0 +1,29 @@
+class FixedTimestep:
+    """Turns variable frame times into a whole number of fixed simulation ticks.
+
+    Leftover time is carried to the next frame and exposed as alpha, the
+    fraction of a tick to interpolate rendering by. At most maxSteps ticks run
+    per frame; time beyond that is dropped so a slow frame can't snowball.
+    """
+
+    def __init__(self, tickRate: float = 60.0, maxSteps: int = 5):
+        self.tickRate = tickRate
+        self.dt = 1.0 / tickRate
+        self.maxSteps = maxSteps
+        self.accumulator = 0.0
+        self.droppedTime = 0.0
+
+    def advance(self, frameTime: float) -> int:
+        """Adds a frame's elapsed time and returns how many ticks to simulate."""
+        self.accumulator += frameTime
+        steps = int(self.accumulator / self.dt)
+        if steps > self.maxSteps:
+            self.droppedTime += self.accumulator - self.maxSteps * self.dt
+            self.accumulator = 0.0
+            return self.maxSteps
+        self.accumulator -= steps * self.dt
+        return steps
+
+    @property
+    def alpha(self) -> float:
+        return self.accumulator / self.dt
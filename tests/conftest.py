@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+# the game is a flat set of modules run from games/, with asset paths relative to it
+GAMES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "games")
+sys.path.insert(0, GAMES_DIR)
+
+
+@pytest.fixture(scope="session")
+def headlessState():
+    """SDLstate with resources loaded against the null backends, shared by the session."""
+    sdl3 = pytest.importorskip("sdl3")
+    if not sdl3.SDL_GetVersion():
+        pytest.skip("SDL3 libraries not available")
+    cwd = os.getcwd()
+    os.chdir(GAMES_DIR)
+    import headless
+
+    state = headless.createHeadlessState()
+    yield state
+    headless.Resources.unload()
+    os.chdir(cwd)
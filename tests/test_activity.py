@@ -0,0 +1,119 @@
+import numpy as np
+from pyglm import glm
+
+from activity import ActivityScheduler
+from entitystore import EntityStore
+from gameobject import GameObject
+from handles import EntityRegistry
+
+DT = 0.125
+
+
+class Point:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+class Rect:
+    def __init__(self, x, y, w, h):
+        self.x, self.y, self.w, self.h = x, y, w, h
+
+
+class Entity:
+    def __init__(self, registry, x):
+        self.position = Point(x, 50.0)
+        self.handle = registry.create(self)
+
+
+VIEWPORT = Rect(0.0, 0.0, 100.0, 100.0)
+
+
+def scheduler(store=None) -> ActivityScheduler:
+    return ActivityScheduler(activeMargin=50.0, reducedMargin=200.0, reducedEvery=4, wakeTime=0.5, store=store)
+
+
+def storedAt(store, x) -> int:
+    obj = GameObject()
+    obj.position = glm.vec2(x, 50.0)
+    return store.attach(obj), obj
+
+
+def test_entities_are_tiered_by_distance_from_the_viewport():
+    registry = EntityRegistry()
+    near, mid, far = Entity(registry, 120.0), Entity(registry, 250.0), Entity(registry, 1000.0)
+    activity = scheduler()
+    runs = {near: [], mid: [], far: []}
+    for _ in range(8):
+        due, steps = activity.schedule([near, mid, far], VIEWPORT, DT)
+        for obj, step in zip(due, steps):
+            runs[obj].append(step)
+    assert activity.stats() == {"active": 1, "reduced": 1, "sleeping": 1}
+    assert runs[near] == [DT] * 8
+    # every fourth frame, with the time saved up since its last turn
+    assert len(runs[mid]) == 2 and runs[mid][-1] == 4 * DT
+    assert runs[far] == []
+
+
+def test_woken_entities_run_every_frame_for_a_while():
+    registry = EntityRegistry()
+    far = Entity(registry, 1000.0)
+    activity = scheduler()
+    activity.wake(far)
+    due = [activity.schedule([far], VIEWPORT, DT)[0] for _ in range(6)]
+    assert due == [[far]] * 4 + [[]] * 2
+
+
+def test_a_reused_slot_does_not_inherit_saved_up_time():
+    registry = EntityRegistry()
+    mid = Entity(registry, 250.0)
+    activity = scheduler()
+    index = mid.handle.index
+    # stop right before its turn, with three frames of time saved up
+    while activity.frame < 3 or (index + activity.frame + 1) % 4:
+        activity.schedule([mid], VIEWPORT, DT)
+    registry.destroy(mid.handle)
+    registry.flush()
+    mid.handle = registry.create(mid)
+    assert mid.handle.index == index
+    assert activity.schedule([mid], VIEWPORT, DT) == ([mid], [DT])
+
+
+def test_entities_without_a_handle_always_run():
+    loose = Entity(EntityRegistry(), 1000.0)
+    loose.handle = None
+    activity = scheduler()
+    assert activity.schedule([loose], VIEWPORT, DT) == ([loose], [DT])
+    assert activity.stats()["active"] == 1
+
+
+def test_store_rows_are_tiered_on_the_store_arrays():
+    store = EntityStore(capacity=4)
+    (far, farObj), (near, _), (mid, _) = storedAt(store, 1000.0), storedAt(store, 120.0), storedAt(store, 250.0)
+    activity = scheduler(store)
+    rows = np.array([far, near, mid])
+    runs = {far: [], near: [], mid: []}
+    for _ in range(8):
+        due, steps = activity.scheduleRows(rows, VIEWPORT, DT)
+        # due rows keep the order they were given in
+        assert list(due) == [row for row in rows.tolist() if row in due]
+        for row, step in zip(due.tolist(), steps.tolist()):
+            runs[row].append(step)
+    assert activity.stats() == {"active": 1, "reduced": 1, "sleeping": 1}
+    assert runs[near] == [DT] * 8
+    assert len(runs[mid]) == 2 and runs[mid][-1] == 4 * DT
+    assert runs[far] == []
+
+    activity.wake(farObj)
+    assert activity.scheduleRows(rows, VIEWPORT, DT)[0].tolist() == [far, near]
+
+
+def test_a_reattached_row_starts_over():
+    store = EntityStore(capacity=1)
+    row, obj = storedAt(store, 1000.0)
+    activity = scheduler(store)
+    activity.wake(obj)
+    store.release(obj)
+    assert storedAt(store, 1000.0)[0] == row
+    # the wake belonged to the previous occupant
+    assert activity.scheduleRows(np.array([row]), VIEWPORT, DT)[0].tolist() == []
@@ -0,0 +1,21 @@
+from bulletpool import BulletPool
+
+
+class Bullet:
+    pass
+
+
+def test_pool_hands_out_each_bullet_once_until_released():
+    pool = BulletPool(3, Bullet)
+    taken = [pool.acquire() for _ in range(3)]
+    assert len(set(map(id, taken))) == 3
+    assert pool.acquire() is None
+    assert pool.activeCount == 3
+
+    pool.release(taken[0])
+    # releasing twice is harmless
+    pool.release(taken[0])
+    assert pool.activeCount == 2
+    assert set(map(id, pool)) == {id(taken[1]), id(taken[2])}
+    assert pool.acquire() is taken[0]
+    assert pool.acquire() is None
@@ -0,0 +1,57 @@
+import numpy as np
+
+from chunkstore import ENEMY_DTYPE, MAX_ENEMIES, ChunkStore
+
+ROWS, COLS = 5, 20
+
+
+def grids(seed: int):
+    rng = np.random.default_rng(seed)
+    return tuple(rng.integers(0, 7, (ROWS, COLS), dtype=np.uint8) for _ in range(3))
+
+
+def test_round_trip_is_exact_far_into_a_run():
+    store = ChunkStore(ROWS, COLS, capacity=4)
+    # float32 would round these positions to a multiple of 0.125
+    enemies = [
+        (1_000_000.123456789, 96.000001, -50.0, 12.345678901, 0.0166666667, 17, -1, 1),
+        (1_000_320.987654321, 128.5, 50.0, 0.0, 0.0, 30, 1, 0),
+    ]
+    tiles, foreground, background = grids(1)
+    assert store.save(1562, tiles, foreground, background, enemies) == 2
+    store.addEnemies(1562, [(1_000_100.000000001, 64.25, 0.0, 3.3, 0.5, 5, 1, 1)])
+
+    rTiles, rForeground, rBackground, rEnemies = store.load(1562)
+    assert (rTiles == tiles).all()
+    assert (rForeground == foreground).all()
+    assert (rBackground == background).all()
+    assert rEnemies.dtype == ENEMY_DTYPE
+    assert rEnemies.tolist() == enemies + [(1_000_100.000000001, 64.25, 0.0, 3.3, 0.5, 5, 1, 1)]
+    assert 1562 not in store
+    store.close()
+
+
+def test_enemies_past_the_limit_are_dropped():
+    store = ChunkStore(ROWS, COLS, capacity=2)
+    enemies = [(float(i), 0.0, 0.0, 0.0, 0.0, 30, 1, 0) for i in range(MAX_ENEMIES + 5)]
+    assert store.save(0, *grids(0), enemies) == MAX_ENEMIES
+    assert store.addEnemies(0, enemies) == 0
+    assert len(store.load(0)[3]) == MAX_ENEMIES
+    store.close()
+
+
+def test_store_is_bounded_and_drops_oldest():
+    store = ChunkStore(ROWS, COLS, capacity=3)
+    fileBytes = store.fileBytes
+    for index in range(10):
+        store.save(index, *grids(index))
+    assert len(store) == 3
+    assert store.dropped == 7
+    assert store.fileBytes == fileBytes
+    assert [i for i in range(10) if i in store] == [7, 8, 9]
+    assert (store.load(8)[0] == grids(8)[0]).all()
+    # the freed slot is reused without dropping anything
+    store.save(10, *grids(10))
+    assert store.dropped == 7
+    assert [i for i in range(11) if i in store] == [7, 9, 10]
+    store.close()
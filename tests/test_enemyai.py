@@ -0,0 +1,50 @@
+import math
+import random
+
+import numpy as np
+
+from enemyai import steerShamblers
+from tilegrid import TileGrid
+
+TILE = 32
+ORIGIN_Y = 160
+AGGRO_MIN = 10.0
+AGGRO_MAX = 400.0
+SPEED = 60.0
+
+
+def steerOne(x, y, collider, direction, playerPos, tiles):
+    """One enemy at a time, the way shamblers were steered before."""
+    distance = math.hypot(playerPos[0] - x, playerPos[1] - y)
+    if not AGGRO_MIN < distance < AGGRO_MAX:
+        return direction, 0.0
+    cx, cy, cw, ch = collider
+    if tiles.solidInRect(x + cx + (cw / 2) * direction, y + cy + ch + 1, 1.0, 1.0):
+        direction = 1.0 if playerPos[0] - x > 0 else -1.0
+    else:
+        direction = -direction
+    return direction, SPEED * direction
+
+
+def test_vectorised_steering_matches_one_enemy_at_a_time():
+    rng = random.Random(11)
+    tiles = TileGrid(TILE, 5, 20, ORIGIN_Y)
+    tiles.createChunk(0)
+    tiles.createChunk(20 * TILE)
+    # ground on the bottom row with gaps to turn around at
+    for col in range(40):
+        if col % 7:
+            tiles.setTile(col, 4, 2)
+
+    count = 200
+    position = np.array([[rng.uniform(0, 40 * TILE - 32), ORIGIN_Y + 3 * TILE] for _ in range(count)])
+    collider = np.tile([0.0, 0.0, 24.0, 32.0], (count, 1))
+    direction = np.array([rng.choice((-1.0, 1.0)) for _ in range(count)])
+    playerPos = (20 * TILE, ORIGIN_Y + 3 * TILE)
+
+    newDirection, vx = steerShamblers(position, collider, direction, playerPos, tiles, AGGRO_MIN, AGGRO_MAX, SPEED)
+    for i in range(count):
+        expected = steerOne(position[i, 0], position[i, 1], collider[i], direction[i], playerPos, tiles)
+        assert (newDirection[i], vx[i]) == expected
+    # the sample covers every branch
+    assert (vx == 0).any() and (newDirection != direction).any() and (newDirection == direction).any()
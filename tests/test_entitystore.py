@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from pyglm import glm
+
+from entitystore import EntityStore
+from gameobject import GameObject
+
+
+def falling(x: float, vx: float, maxSpeedX: float = 100.0) -> GameObject:
+    obj = GameObject()
+    obj.position = glm.vec2(x, 0.0)
+    obj.velocity = glm.vec2(vx, 0.0)
+    obj.maxSpeedX = maxSpeedX
+    obj.dynamic = True
+    return obj
+
+
+def test_integrate_matches_one_object_at_a_time():
+    store = EntityStore(capacity=2, gravity=500.0)
+    objects = [falling(10.0, 40.0), falling(-5.0, -300.0), falling(0.0, 0.0)]
+    for obj in objects:
+        store.attach(obj)
+    objects[2].grounded = True
+    store.integrate(0.5)
+
+    # gravity while airborne, speed clamped to maxSpeedX, then semi-implicit Euler
+    assert (objects[0].position.x, objects[0].position.y) == pytest.approx((30.0, 125.0))
+    assert (objects[1].position.x, objects[1].position.y) == pytest.approx((-55.0, 125.0))
+    assert objects[1].velocity.x == pytest.approx(-100.0)
+    assert (objects[2].position.x, objects[2].position.y) == (0.0, 0.0)
+
+
+def test_per_row_steps_and_inactive_rows():
+    store = EntityStore(capacity=4)
+    a, b, c = falling(0.0, 10.0), falling(0.0, 10.0), falling(0.0, 10.0)
+    for obj in (a, b, c):
+        store.attach(obj)
+    store.setActive(c, False)
+    steps = np.zeros(store.capacity)
+    steps[a._row] = 1.0
+    store.integrate(steps)
+    assert a.position.x == pytest.approx(10.0)
+    assert b.position.x == 0.0 and c.position.x == 0.0
+
+    # rows outside the mask are left alone even with a step
+    steps[b._row] = 1.0
+    rows = np.zeros(store.capacity, dtype=bool)
+    rows[b._row] = True
+    store.integrate(steps, rows)
+    assert a.position.x == pytest.approx(10.0) and b.position.x == pytest.approx(10.0)
+
+
+def test_release_hands_state_back_and_reuses_the_row():
+    store = EntityStore(capacity=1)
+    a = falling(1.5, 2.0)
+    row = store.attach(a)
+    a.position.x = 7.25
+    serial = store.serial[row]
+    store.release(a)
+    assert not a.stored and a.position.x == 7.25 and a.maxSpeedX == 100.0
+
+    b = falling(3.0, 0.0)
+    assert store.attach(b) == row
+    assert b.position.x == 3.0
+    # a new occupant, so per row state keyed on the serial starts over
+    assert store.serial[row] > serial
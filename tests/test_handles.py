@@ -0,0 +1,36 @@
+from handles import EntityRegistry
+
+
+def test_destroy_is_deferred_until_flush():
+    registry = EntityRegistry()
+    a = registry.create("a")
+    assert registry.destroy(a)
+    assert not registry.destroy(a)
+    assert registry.get(a) == "a"
+
+    destroyed = []
+    assert registry.flush(destroyed.append) == 1
+    assert destroyed == ["a"]
+    assert registry.get(a) is None and len(registry) == 0
+
+
+def test_reused_slot_does_not_revive_stale_handles():
+    registry = EntityRegistry()
+    a = registry.create("a")
+    registry.destroy(a)
+    registry.flush()
+    b = registry.create("b")
+    assert b.index == a.index and b.generation != a.generation
+    assert registry.get(a) is None
+    assert not registry.destroy(a)
+    assert registry.get(b) == "b"
+
+
+def test_flush_takes_entities_queued_while_flushing():
+    registry = EntityRegistry()
+    parent = registry.create("parent")
+    child = registry.create("child")
+    registry.destroy(parent)
+    # destroying the parent takes its child with it in the same flush
+    assert registry.flush(lambda obj: obj == "parent" and registry.destroy(child)) == 2
+    assert registry.get(child) is None
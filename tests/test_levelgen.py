@@ -0,0 +1,37 @@
+import numpy as np
+
+from levelgen import TILE_GROUND, TILE_PLAYER, LevelGenerator
+
+ROWS, COLS = 5, 20
+
+
+def test_chunk_depends_only_on_seed_and_index():
+    first = LevelGenerator(1234, ROWS, COLS).layout(57)
+    # a new generator, after generating other chunks, gives the same chunk back
+    generator = LevelGenerator(1234, ROWS, COLS)
+    generator.generate(range(100))
+    again = generator.layout(57)
+    for a, b in zip(first, again):
+        assert a.dtype == np.uint8 and a.shape == (ROWS, COLS)
+        assert (a == b).all()
+
+
+def test_batches_match_single_chunks():
+    generator = LevelGenerator(99, ROWS, COLS)
+    indices = [12, 3, 40, 0, 7]
+    batch = generator.generate(indices)
+    for i, index in enumerate(indices):
+        for grids, single in zip(batch, generator.layout(index)):
+            assert (grids[i] == single).all()
+
+
+def test_seeds_give_different_levels():
+    a = LevelGenerator(1, ROWS, COLS).generate(range(8))[0]
+    b = LevelGenerator(2, ROWS, COLS).generate(range(8))[0]
+    assert not (a == b).all()
+
+
+def test_layout_has_ground_and_spawn():
+    tiles, _, _ = LevelGenerator(5, ROWS, COLS).layout(0, spawn_player=True)
+    assert (tiles[ROWS - 1] == TILE_GROUND).all()
+    assert tiles[3, 1] == TILE_PLAYER
@@ -0,0 +1,53 @@
+import struct
+
+import numpy as np
+import pytest
+
+import game
+from headless import RunAndGun, createWorld, runHeadless, runReplay
+from recording import HEADER, MAGIC, TICK_DTYPE, VERSION, Recording
+
+TICKS = 600
+
+
+@pytest.fixture
+def recorded(headlessState, tmp_path):
+    """Path of a recorded scripted run with its final stats."""
+    path = str(tmp_path / "run.srec")
+    state = headlessState
+    gs = createWorld(state, seed=4321)
+    game.startRecording(gs, path, 1.0 / game.TICK_RATE, immortal=True)
+    stats = runHeadless(TICKS, script=RunAndGun(jumpEvery=40), immortal=True, world=(state, gs))
+    gs.recorder.close()
+    gs.chunkStore.close()
+    return path, stats
+
+
+def test_replay_matches_every_recorded_checksum(headlessState, recorded):
+    path, stats = recorded
+    recording = Recording.load(path)
+    assert len(recording) == TICKS and recording.immortal
+
+    replay = runReplay(path, state=headlessState)
+    assert replay["ticks"] == TICKS
+    assert replay["diverged_at"] is None
+    assert replay["checksum"] == int(recording.ticks["checksum"][-1])
+    assert replay["player_x"] == stats["player_x"]
+
+
+def test_replay_stops_at_the_first_wrong_checksum(headlessState, recorded):
+    path, _ = recorded
+    data = bytearray(open(path, "rb").read())
+    ticks = np.frombuffer(data, dtype=TICK_DTYPE, offset=HEADER.size).copy()
+    ticks["checksum"][250] ^= 1
+    data[HEADER.size:] = ticks.tobytes()
+    open(path, "wb").write(data)
+
+    assert runReplay(path, state=headlessState)["diverged_at"] == 250
+
+
+def test_recordings_of_an_older_simulation_are_rejected(tmp_path):
+    path = tmp_path / "old.srec"
+    path.write_bytes(HEADER.pack(MAGIC, VERSION - 1, 1 / 60, 1, 2, 6, 0.1, 0) + struct.pack("<BI", 0, 0))
+    with pytest.raises(ValueError, match="older simulation"):
+        Recording.load(str(path))
@@ -0,0 +1,78 @@
+from soundqueue import SoundQueue
+
+
+class Rect:
+    def __init__(self, x, y, w, h):
+        self.x, self.y, self.w, self.h = x, y, w, h
+
+
+class RecordingAudio:
+    """Audio backend that records plays; every sound lasts one second."""
+
+    def __init__(self):
+        self.plays = []
+        self.stopped = []
+
+    def play_sound(self, chunk, volume=128):
+        self.plays.append((chunk, volume))
+        return len(self.plays)
+
+    def stop_channel(self, channel):
+        self.stopped.append(channel)
+
+    def sound_length(self, chunk) -> float:
+        return 1.0
+
+
+def test_repeats_in_a_frame_merge_at_the_loudest_volume():
+    queue = SoundQueue()
+    audio = RecordingAudio()
+    for volume in (30, 100, 60):
+        queue.post("shot", volume)
+    queue.post("hit", 50)
+    queue.flush(audio, 0.016)
+    assert audio.plays == [("shot", 100), ("hit", 50)]
+    assert queue.stats()["merged"] == 2
+
+
+def test_distant_sounds_fade_out_and_are_culled():
+    queue = SoundQueue(cullDistance=100.0)
+    audio = RecordingAudio()
+    viewport = Rect(0.0, 0.0, 200.0, 100.0)
+    queue.post("near", 128, x=100.0, y=50.0, viewport=viewport)
+    queue.post("half", 128, x=250.0, y=50.0, viewport=viewport)
+    queue.post("far", 128, x=-100.0, y=50.0, viewport=viewport)
+    queue.flush(audio, 0.016)
+    assert audio.plays == [("near", 128), ("half", 64)]
+    assert queue.culled == 1
+
+
+def test_voices_per_sound_are_limited_until_they_end():
+    queue = SoundQueue(perSound=2)
+    audio = RecordingAudio()
+    for _ in range(3):
+        queue.post("shot")
+        queue.flush(audio, 0.1)
+    assert len(audio.plays) == 2 and queue.limited == 1
+    # both voices have played out a second later
+    queue.post("shot")
+    queue.flush(audio, 1.0)
+    assert len(audio.plays) == 3
+
+
+def test_full_voices_are_stolen_only_by_higher_priorities():
+    queue = SoundQueue(maxVoices=2)
+    audio = RecordingAudio()
+    queue.post("step", priority=0)
+    queue.post("ambience", priority=1)
+    queue.flush(audio, 0.016)
+    queue.post("pickup", priority=0)
+    queue.flush(audio, 0.016)
+    assert queue.limited == 1 and not audio.stopped
+
+    queue.post("explosion", priority=2)
+    queue.flush(audio, 0.016)
+    # higher priorities play first, so the step went out second, on channel 2
+    assert audio.stopped == [2]
+    assert audio.plays[-1] == ("explosion", 128)
+    assert queue.stolen == 1
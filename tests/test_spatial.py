@@ -0,0 +1,62 @@
+import random
+
+from spatial import SpatialHash
+
+
+class Point:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+class Rect:
+    def __init__(self, x, y, w, h):
+        self.x, self.y, self.w, self.h = x, y, w, h
+
+
+class Box:
+    """The fields SpatialHash reads from a GameObject."""
+
+    def __init__(self, x, y, w=16.0, h=16.0):
+        self.position = Point(x, y)
+        self.collider = Rect(0.0, 0.0, w, h)
+
+
+def overlaps(a, b) -> bool:
+    return (
+        a.position.x < b.position.x + b.collider.w
+        and b.position.x < a.position.x + a.collider.w
+        and a.position.y < b.position.y + b.collider.h
+        and b.position.y < a.position.y + a.collider.h
+    )
+
+
+def test_neighbours_include_every_overlapping_box():
+    rng = random.Random(7)
+    grid = SpatialHash(64.0)
+    boxes = [Box(rng.uniform(-500, 500), rng.uniform(-200, 200), rng.uniform(4, 64), rng.uniform(4, 64)) for _ in range(300)]
+    for box in boxes:
+        grid.insert(box)
+    for box in boxes:
+        near = set(grid.neighbours(box))
+        assert box not in near
+        for other in boxes:
+            if other is not box and overlaps(box, other):
+                assert other in near
+
+
+def test_move_rebuckets_and_remove_forgets():
+    grid = SpatialHash(64.0)
+    a, b = Box(0.0, 0.0), Box(1000.0, 0.0)
+    grid.insert(a)
+    grid.insert(b)
+    assert b not in set(grid.neighbours(a))
+
+    b.position.x = 10.0
+    grid.move(b)
+    assert b in set(grid.neighbours(a))
+    assert grid.queryOrdered(-10.0, -10.0, 40.0, 40.0) == [a, b]
+
+    grid.remove(a)
+    assert a not in grid and len(grid) == 1
+    assert list(grid.query(-10.0, -10.0, 40.0, 40.0)) == [b]
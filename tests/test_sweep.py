@@ -0,0 +1,53 @@
+import pytest
+
+from sweep import castTiles, sweepBox
+from tilegrid import TileGrid
+
+TILE = 32
+ORIGIN_Y = 160
+
+
+def wallGrid(col: int) -> TileGrid:
+    """Two chunks of empty cells with a one tile thick wall at col."""
+    tiles = TileGrid(TILE, 5, 20, ORIGIN_Y)
+    tiles.createChunk(0)
+    tiles.createChunk(20 * TILE)
+    for row in range(5):
+        tiles.setTile(col, row, 2)
+    return tiles
+
+
+@pytest.mark.parametrize("dx", [40.0, 200.0, 1000.0])
+def test_fast_bullet_hits_a_one_tile_wall(dx):
+    tiles = wallGrid(10)
+    # bullet 8x8 starting left of the wall, moving far enough to end up past it
+    x, y = 10 * TILE - 20.0, ORIGIN_Y + 40.0
+    hit = castTiles(tiles, x, y, 8.0, 8.0, dx, 0.0)
+    assert hit is not None
+    t, col, row = hit
+    assert col == 10 and row == 1
+    # the time of impact puts the bullet's front edge on the wall
+    assert x + 8.0 + dx * t == pytest.approx(10 * TILE)
+
+
+def test_bullet_moving_left_hits_the_wall_from_the_right():
+    tiles = wallGrid(10)
+    x, y = 11 * TILE + 5.0, ORIGIN_Y + 70.0
+    t, col, row = castTiles(tiles, x, y, 8.0, 8.0, -500.0, 0.0)
+    assert (col, row) == (10, 2)
+    assert x - 500.0 * t == pytest.approx(11 * TILE)
+
+
+def test_miss_when_the_wall_is_out_of_reach():
+    tiles = wallGrid(10)
+    assert castTiles(tiles, 10 * TILE - 20.0, ORIGIN_Y + 40.0, 8.0, 8.0, 11.0, 0.0) is None
+    assert castTiles(tiles, 4 * TILE, ORIGIN_Y + 40.0, 8.0, 8.0, -100.0, 0.0) is None
+
+
+def test_sweep_box_does_not_skip_a_thin_enemy():
+    # 12 px wide enemy well inside one frame's motion
+    t = sweepBox(0.0, 0.0, 8.0, 8.0, 500.0, 0.0, 200.0, -4.0, 12.0, 20.0)
+    assert t == pytest.approx((200.0 - 8.0) / 500.0)
+    # moving away, or passing above it, never hits
+    assert sweepBox(0.0, 0.0, 8.0, 8.0, -500.0, 0.0, 200.0, -4.0, 12.0, 20.0) is None
+    assert sweepBox(0.0, -40.0, 8.0, 8.0, 500.0, 0.0, 200.0, -4.0, 12.0, 20.0) is None
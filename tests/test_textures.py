@@ -0,0 +1,28 @@
+import os
+
+from backends import NullTexture
+from textures import TextureRegistry
+
+BULLET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "games", "bullet.png")
+
+
+def test_loaded_files_are_shared_and_kept_until_clear():
+    registry = TextureRegistry()
+    info = registry.load(None, BULLET)
+    assert registry.load(None, BULLET) is info
+    assert info.width > 0 and registry.memoryBytes == info.bytes
+
+    registry.release(info)
+    assert len(registry) == 1
+    registry.clear()
+    assert len(registry) == 0 and registry.memoryBytes == 0
+
+
+def test_generated_textures_go_with_their_last_reference():
+    registry = TextureRegistry()
+    info = registry.register(NullTexture("layer", 64.0, 32.0))
+    info.refs += 1
+    registry.release(info)
+    assert registry.info(info.handle) is info
+    registry.release(info)
+    assert registry.info(info.handle) is None and registry.memoryBytes == 0
@@ -0,0 +1,22 @@
+import pytest
+
+from timestep import FixedTimestep
+
+
+def test_frame_time_becomes_whole_ticks_and_a_remainder():
+    # a tick of 0.25 s keeps every sum exact
+    step = FixedTimestep(tickRate=4.0)
+    assert step.advance(0.625) == 2
+    assert step.alpha == pytest.approx(0.5)
+    assert step.advance(0.125) == 1
+    assert step.alpha == 0.0
+    assert step.advance(0.125) == 0
+    assert step.alpha == pytest.approx(0.5)
+
+
+def test_slow_frames_are_capped_and_the_excess_dropped():
+    step = FixedTimestep(tickRate=4.0, maxSteps=5)
+    assert step.advance(3.0) == 5
+    assert step.droppedTime == pytest.approx(1.75)
+    assert step.alpha == 0.0
+    assert step.advance(0.25) == 1
@@ -0,0 +1,72 @@
+import game
+from chunkstore import ChunkStore
+from game import Resources
+from headless import createWorld
+
+
+def chunkEnemies(gs, index: int) -> list:
+    return [
+        game.enemyRecord(obj)
+        for obj in gs.characters
+        if obj.type.enemy and gs.tiles.chunkIndexAt(obj.position.x + obj.collider.x + obj.collider.w / 2) == index
+    ]
+
+
+def test_evicted_enemies_come_back_unchanged(headlessState):
+    state = headlessState
+    gs = createWorld(state, seed=1234)
+    startX = 2 * gs.chunk_width
+    for i, (dx, hp, direction) in enumerate(((100.123456789, 30, 1), (300.000000123, 12, -1), (517.5, 4, 1))):
+        enemy = game.spawnEnemy(gs, Resources, 0.0, 0.0)
+        # past the float32 precision spawnEnemy's glm vector has
+        enemy.position.x = startX + dx
+        enemy.position.y = 96.0 + i / 3
+        enemy.velocity.x = 50.0 * direction / 3
+        enemy.velocity.y = 7.0 / 3
+        enemy.direction = direction
+        enemy.data.enemy.hitPoints = hp
+    hit = enemy.data.enemy
+    hit.state = "damage"
+    hit.damageTimer.time = 0.1 / 3
+    before = chunkEnemies(gs, 2)
+
+    game.cleanupDistantObjects(gs, -1.0, startX - 1.0)
+    game.flushDestroyed(gs)
+    assert 2 not in gs.tiles.chunks and 2 in gs.chunkStore
+    assert chunkEnemies(gs, 2) == []
+
+    game.restoreChunks(gs, state, Resources, startX, startX)
+    assert 2 in gs.tiles.chunks and 2 not in gs.chunkStore
+    assert chunkEnemies(gs, 2) == before
+    gs.chunkStore.close()
+
+
+def test_chunks_dropped_from_the_store_are_regenerated(headlessState):
+    state = headlessState
+    gs = createWorld(state, seed=99)
+    gs.chunkStore.close()
+    gs.chunkStore = ChunkStore(gs.levelGen.rows, gs.levelGen.cols, capacity=1)
+    tiles = {index: gs.tiles.chunks[index].tiles.copy() for index in (1, 2)}
+
+    game.cleanupDistantObjects(gs, -1.0, gs.chunk_width - 1.0)
+    game.flushDestroyed(gs)
+    assert gs.chunkStore.dropped == 1 and 2 not in gs.chunkStore
+
+    game.restoreChunks(gs, state, Resources, gs.chunk_width, 3 * gs.chunk_width)
+    for index in (1, 2):
+        assert (gs.tiles.chunks[index].tiles == tiles[index]).all()
+    # nothing past the generated level is made up
+    assert 3 not in gs.tiles.chunks
+    gs.chunkStore.close()
+
+
+def test_the_player_is_looked_up_by_handle(headlessState):
+    gs = createWorld(headlessState, seed=99)
+    player = gs.player
+    assert player is not None and gs.registry.get(gs.playerHandle) is player
+
+    game.destroyEntity(gs, player)
+    assert gs.player is player
+    game.flushDestroyed(gs)
+    assert gs.player is None and player not in gs.characters
+    gs.chunkStore.close()